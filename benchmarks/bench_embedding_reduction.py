@@ -0,0 +1,274 @@
+"""
+Benchmarks reducing the sentence embeddings' dimension and precision before tiling.
+
+For every reduction method, dimension and precision, reports the time ClipFinder spends
+finding clips from the sentence embeddings (including the reduction), the memory used
+by the working embeddings, and how far the clip boundaries drift from tiling the full
+float32 embeddings: the F1 score of the first round TextTiling boundaries (with a
+tolerance of a few sentences) and the fraction of clips matched by ClipFinder's
+duplicate rule.
+
+Without a transcription file, synthetic documents with topical 1024 dimensional
+embeddings are tiled. With a transcription file its sentences are embedded once with
+the given model.
+
+Usage
+-----
+    python -m benchmarks.bench_embedding_reduction --num-sentences 2000 10000
+    python -m benchmarks.bench_embedding_reduction --transcription a.json --device cpu
+"""
+# standard library imports
+import argparse
+import json
+import time
+
+# current package imports
+from .compare_embedders import K_VALS, find_boundaries, match_clips, score_boundaries
+
+# local package imports
+from clipsai.clip.clipfinder import ClipFinder
+from clipsai.clip.texttiler import TextTiler
+
+# 3rd party imports
+import torch
+
+
+class SyntheticTranscription:
+    """
+    The parts of a Transcription ClipFinder uses, for sentences with known timings.
+    """
+
+    def __init__(self, sentences_info: list[dict]) -> None:
+        """
+        Parameters
+        ----------
+        sentences_info: list[dict]
+            sentence info in the format returned by Transcription.get_sentence_info()
+        """
+        self._sentences_info = sentences_info
+        self.end_time = sentences_info[-1]["end_time"]
+
+    def get_sentence_info(self) -> list[dict]:
+        return self._sentences_info
+
+    def get_char_info(self) -> list:
+        return [None] * self._sentences_info[-1]["end_char"]
+
+
+def make_document(
+    num_sentences: int, dim: int = 1024, seed: int = 0
+) -> tuple[SyntheticTranscription, torch.Tensor]:
+    """
+    Returns a synthetic transcription and sentence embeddings whose topic changes every
+    few dozen sentences. Like real sentence embeddings, every embedding shares a large
+    common component.
+
+    Parameters
+    ----------
+    num_sentences: int
+        number of sentences
+    dim: int
+        dimension of the embeddings
+    seed: int
+        random seed
+
+    Returns
+    -------
+    tuple[SyntheticTranscription, torch.Tensor]
+        the transcription and float32 embeddings of shape (num_sentences, dim). The
+        sentence info has an extra "topic" key with the sentence's topic number
+    """
+    generator = torch.Generator().manual_seed(seed)
+    topic_lengths = torch.randint(8, 60, (num_sentences,), generator=generator)
+    topic_ids = torch.repeat_interleave(torch.arange(num_sentences), topic_lengths)[
+        :num_sentences
+    ]
+    topics = torch.randn(num_sentences, dim, generator=generator)
+    common = torch.randn(dim, generator=generator)
+    embeddings = 2 * common + topics[topic_ids]
+    embeddings += 1.5 * torch.randn(num_sentences, dim, generator=generator)
+
+    durations = (torch.rand(num_sentences, generator=generator) * 8 + 1).tolist()
+    sentences_info = []
+    time_ = 0.0
+    for i, duration in enumerate(durations):
+        sentences_info.append(
+            {
+                "sentence": "",
+                "topic": int(topic_ids[i]),
+                "start_char": i * 60,
+                "end_char": i * 60 + 59,
+                "start_time": time_,
+                "end_time": time_ + duration,
+            }
+        )
+        time_ += duration
+    return SyntheticTranscription(sentences_info), embeddings
+
+
+def load_document(
+    transcription_path: str, model: str, device: str
+) -> tuple[object, torch.Tensor]:
+    """
+    Returns a transcription and the embeddings of its sentences.
+
+    Parameters
+    ----------
+    transcription_path: str
+        absolute path of the transcription json file
+    model: str
+        SentenceTransformer model or short name to embed the sentences with
+    device: str
+        PyTorch device to embed the sentences on
+
+    Returns
+    -------
+    tuple[Transcription, torch.Tensor]
+        the transcription and its sentence embeddings
+    """
+    from clipsai.clip.text_embedder import TextEmbedder
+    from clipsai.filesys.json_file import JSONFile
+    from clipsai.transcribe.transcription import Transcription
+
+    transcription = Transcription(JSONFile(transcription_path))
+    sentences = [info["sentence"] for info in transcription.get_sentence_info()]
+    embeddings = TextEmbedder(model_name=model, device=device).embed_sentences(
+        sentences
+    )
+    return transcription, embeddings
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    """
+    Tiles every document with every reduction setting and compares the clips with
+    those of the unreduced embeddings.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        parsed command line arguments
+
+    Returns
+    -------
+    list[dict]
+        one result per document and reduction setting
+    """
+    device = args.device or "cpu"
+    if args.transcription is not None:
+        documents = [load_document(args.transcription, args.model, device)]
+    else:
+        documents = [make_document(n, seed=n) for n in args.num_sentences]
+
+    settings = [(None, None, "float32")]
+    for precision in args.precisions:
+        if precision != "float32":
+            settings.append((None, None, precision))
+        for method in args.methods:
+            for dim in args.dims:
+                settings.append((method, dim, precision))
+
+    texttiler = TextTiler(device)
+    results = []
+    for transcription, embeddings in documents:
+        sentences_info = transcription.get_sentence_info()
+        reference = None
+        for method, dim, precision in settings:
+            clip_finder = ClipFinder(
+                device=device,
+                embedder="minilm",
+                embedding_reduction=method,
+                reduced_embedding_dim=dim or 256,
+                tiling_precision=precision,
+            )
+            seconds = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                clips = clip_finder._find_clips_from_embeddings(
+                    transcription, sentences_info, embeddings
+                )
+                seconds.append(time.perf_counter() - start)
+
+            working_embeddings = embeddings
+            if clip_finder._embedding_reducer is not None:
+                working_embeddings = clip_finder._embedding_reducer.reduce(embeddings)
+            boundaries = {
+                k: find_boundaries(texttiler, working_embeddings.float(), k)
+                for k in K_VALS
+                if k < len(embeddings)
+            }
+            if reference is None:
+                reference = {"clips": clips, "boundaries": boundaries}
+
+            scores = [
+                score_boundaries(reference["boundaries"][k], boundaries[k], 1)
+                for k in boundaries
+            ]
+            result = {
+                "num_sentences": len(embeddings),
+                "method": method,
+                "dim": working_embeddings.shape[1],
+                "precision": precision,
+                "seconds": min(seconds),
+                "embedding_mb": working_embeddings.element_size()
+                * working_embeddings.nelement()
+                / 2**20,
+                "boundary_f1": sum(s["f1"] for s in scores) / max(len(scores), 1),
+                "clip_match_rate": match_clips(reference["clips"], clips),
+                "num_clips": len(clips),
+            }
+            results.append(result)
+            print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result: dict) -> str:
+    """
+    Formats a result as one line of text.
+
+    Parameters
+    ----------
+    result: dict
+        the result
+
+    Returns
+    -------
+    str
+        the formatted result
+    """
+    return (
+        "N={:<6} {:<17} dim={:<5} {:<8} {:>7.3f} s {:>7.1f} MB  boundary f1 {:.3f}  "
+        "clips matched {:.3f} ({} clips)".format(
+            result["num_sentences"],
+            str(result["method"]),
+            result["dim"],
+            result["precision"],
+            result["seconds"],
+            result["embedding_mb"],
+            result["boundary_f1"],
+            result["clip_match_rate"],
+            result["num_clips"],
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--num-sentences", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--transcription", default=None)
+    parser.add_argument("--model", default="all-roberta-large-v1")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--methods", nargs="+", default=["pca", "random_projection"])
+    parser.add_argument("--dims", type=int, nargs="+", default=[64, 128, 256])
+    parser.add_argument("--precisions", nargs="+", default=["float32", "float16"])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="write results as json")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+"""
+Benchmarks ClipFinder's agglomerative segmentation against TextTiling on long
+transcripts.
+
+For every document and segmentation mode, reports the time spent finding clips from
+the sentence embeddings, the number of clips, and the fraction of its clips that
+ClipFinder's duplicate rule matches with a clip of the other mode. Synthetic documents
+know where their topics change, so for them the fraction of clips starting within a
+sentence of a topic change is reported as well.
+
+Usage
+-----
+    python -m benchmarks.bench_segmentation_modes --num-sentences 2000 10000 30000
+    python -m benchmarks.bench_segmentation_modes --transcription a.json --device cpu
+"""
+# standard library imports
+import argparse
+import json
+import time
+
+# current package imports
+from .bench_embedding_reduction import load_document, make_document
+from .compare_embedders import match_clips
+
+# local package imports
+from clipsai.clip.clipfinder import ClipFinder
+
+MODES = ["texttiling", "agglomerative"]
+
+
+def topic_start_precision(clips: list, sentences_info: list[dict]) -> float:
+    """
+    Returns the fraction of clips that start within one sentence of a topic change.
+
+    Parameters
+    ----------
+    clips: list[Clip]
+        the clips
+    sentences_info: list[dict]
+        sentence info with a "topic" key
+
+    Returns
+    -------
+    float
+        the fraction of clips starting at a topic change, ignoring clips starting at
+        the first sentence
+    """
+    topic_start_chars = set()
+    for i in range(1, len(sentences_info)):
+        if sentences_info[i]["topic"] != sentences_info[i - 1]["topic"]:
+            for j in range(max(i - 1, 1), min(i + 2, len(sentences_info))):
+                topic_start_chars.add(sentences_info[j]["start_char"])
+
+    start_chars = [clip.start_char for clip in clips if clip.start_char > 0]
+    if len(start_chars) == 0:
+        return 1.0
+    num_matched = sum(start_char in topic_start_chars for start_char in start_chars)
+    return num_matched / len(start_chars)
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    """
+    Finds the clips of every document with every segmentation mode.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        parsed command line arguments
+
+    Returns
+    -------
+    list[dict]
+        one result per document and segmentation mode
+    """
+    device = args.device or "cpu"
+    if args.transcription is not None:
+        documents = [load_document(args.transcription, args.model, device)]
+    else:
+        documents = [make_document(n, seed=n) for n in args.num_sentences]
+
+    results = []
+    for transcription, embeddings in documents:
+        sentences_info = transcription.get_sentence_info()
+        clips = {}
+        for mode in MODES:
+            clip_finder = ClipFinder(
+                device=device, embedder="minilm", segmentation_mode=mode
+            )
+            seconds = []
+            for _ in range(args.repeats):
+                start = time.perf_counter()
+                clips[mode] = clip_finder._find_clips_from_embeddings(
+                    transcription, sentences_info, embeddings
+                )
+                seconds.append(time.perf_counter() - start)
+
+            result = {
+                "num_sentences": len(embeddings),
+                "mode": mode,
+                "seconds": min(seconds),
+                "num_clips": len(clips[mode]),
+                "topic_start_precision": None,
+            }
+            if "topic" in sentences_info[0]:
+                result["topic_start_precision"] = topic_start_precision(
+                    clips[mode], sentences_info
+                )
+            results.append(result)
+
+        # clips of each mode matched by a clip of the other mode
+        results[-2]["clip_match_rate"] = match_clips(
+            clips["texttiling"], clips["agglomerative"]
+        )
+        results[-1]["clip_match_rate"] = match_clips(
+            clips["agglomerative"], clips["texttiling"]
+        )
+        for result in results[-2:]:
+            print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result: dict) -> str:
+    """
+    Formats a result as one line of text.
+
+    Parameters
+    ----------
+    result: dict
+        the result
+
+    Returns
+    -------
+    str
+        the formatted result
+    """
+    line = "N={:<6} {:<13} {:>8.3f} s {:>5} clips  matched by other mode {:.3f}".format(
+        result["num_sentences"],
+        result["mode"],
+        result["seconds"],
+        result["num_clips"],
+        result["clip_match_rate"],
+    )
+    if result["topic_start_precision"] is not None:
+        line += "  start at topic change {:.3f}".format(result["topic_start_precision"])
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--num-sentences", type=int, nargs="+", default=[2000, 10000, 30000]
+    )
+    parser.add_argument("--transcription", default=None)
+    parser.add_argument("--model", default="all-roberta-large-v1")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--repeats", type=int, default=1)
+    parser.add_argument("--output", default=None, help="write results as json")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
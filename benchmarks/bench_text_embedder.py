@@ -0,0 +1,169 @@
+"""
+Benchmarks the sentence embedding throughput of TextEmbedder.
+
+Reports the number of sentences embedded per second for each model precision.
+
+Usage
+-----
+    python -m benchmarks.bench_text_embedder --device cpu --num-sentences 2000
+    python -m benchmarks.bench_text_embedder --transcription path/to/transcription.json
+"""
+# standard library imports
+import argparse
+import json
+import random
+import time
+
+# local package imports
+from clipsai.clip.model_registry import ModelRegistry
+from clipsai.clip.text_embedder import TextEmbedder
+
+WORDS = (
+    "the a podcast episode guest host we you they think really know about people "
+    "market story idea question answer money time work company product music "
+    "science history game team year week today because actually basically"
+).split()
+
+
+def make_sentences(num_sentences: int, seed: int = 0) -> list[str]:
+    """
+    Returns random sentences with a long tailed length distribution similar to
+    conversational transcripts.
+
+    Parameters
+    ----------
+    num_sentences: int
+        number of sentences to create
+    seed: int
+        random seed
+
+    Returns
+    -------
+    list[str]
+        the sentences
+    """
+    rng = random.Random(seed)
+    sentences = []
+    for _ in range(num_sentences):
+        num_words = min(int(rng.expovariate(1 / 12)) + 1, 120)
+        words = [rng.choice(WORDS) for _ in range(num_words)]
+        sentences.append(" ".join(words).capitalize() + ".")
+    return sentences
+
+
+def load_sentences(transcription_path: str) -> list[str]:
+    """
+    Returns the sentences of a transcription stored as a json file.
+
+    Parameters
+    ----------
+    transcription_path: str
+        absolute path of the transcription json file
+
+    Returns
+    -------
+    list[str]
+        the sentences
+    """
+    from clipsai.filesys.json_file import JSONFile
+    from clipsai.transcribe.transcription import Transcription
+
+    transcription = Transcription(JSONFile(transcription_path))
+    return [info["sentence"] for info in transcription.get_sentence_info()]
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    """
+    Times embed_sentences() for every requested mode.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        parsed command line arguments
+
+    Returns
+    -------
+    list[dict]
+        one result per mode
+    """
+    if args.transcription is not None:
+        sentences = load_sentences(args.transcription)
+    else:
+        sentences = make_sentences(args.num_sentences)
+
+    registry = ModelRegistry(max_resident_models=1)
+    results = []
+    for precision in args.precisions:
+        result = {
+            "model": args.model,
+            "device": args.device,
+            "precision": precision,
+            "batch_size": args.batch_size,
+            "num_sentences": len(sentences),
+        }
+        try:
+            embedder = TextEmbedder(
+                model_name=args.model,
+                device=args.device,
+                model_registry=registry,
+                batch_size=args.batch_size,
+                precision=precision,
+            )
+            # load the model and run the first forward pass outside the timer
+            embedder.embed_sentences(sentences[: args.batch_size])
+            start = time.perf_counter()
+            embedder.embed_sentences(sentences)
+            seconds = time.perf_counter() - start
+            result["seconds"] = seconds
+            result["sentences_per_sec"] = len(sentences) / seconds
+        except Exception as e:
+            # e.g. float16 kernels missing on the cpu
+            result["error"] = str(e)
+        results.append(result)
+        print(format_result(result), flush=True)
+    return results
+
+
+def format_result(result: dict) -> str:
+    """
+    Formats a result as one line of text.
+
+    Parameters
+    ----------
+    result: dict
+        the result
+
+    Returns
+    -------
+    str
+        the formatted result
+    """
+    mode = "{:<9}".format(result["precision"])
+    if "error" in result:
+        return "{}  failed: {}".format(mode, result["error"])
+    return "{}  {:>9.1f} sentences/sec".format(mode, result["sentences_per_sec"])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--model", default="all-roberta-large-v1")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--num-sentences", type=int, default=1000)
+    parser.add_argument("--transcription", default=None)
+    parser.add_argument(
+        "--precisions",
+        nargs="+",
+        default=["float32", "float16", "bfloat16", "int8"],
+    )
+    parser.add_argument("--output", default=None, help="write results as json")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
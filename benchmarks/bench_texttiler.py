@@ -0,0 +1,241 @@
+"""
+Benchmarks the stages of TextTiling on synthetic embeddings, without any model.
+
+Synthetic documents have topic structured embeddings (a piecewise constant topic mean
+plus noise, see bench_embedding_reduction.make_document). For every document size and
+window size, reports the time spent in each stage of TextTiler.text_tile() (gap
+scores, smoothing, depth scores, boundaries and pooling), in the whole of
+TextTiler.text_tile(), and in ClipFinder._text_tile_multiple_rounds(). Every time is
+the minimum over the repeats, after one warm up run.
+
+Results are printed one json object per line, so they can be compared across commits
+with standard tools, and optionally written to a json file.
+
+Usage
+-----
+    python -m benchmarks.bench_texttiler --num-sentences 1000 10000 100000 200000
+    python -m benchmarks.bench_texttiler --device cuda --k 7 37 --output results.json
+"""
+# standard library imports
+from collections.abc import Callable
+import argparse
+import json
+import platform
+import time
+
+# current package imports
+from .bench_embedding_reduction import make_document
+
+# local package imports
+from clipsai.clip.clipfinder import ClipFinder
+from clipsai.clip.texttiler import TextTiler
+
+# 3rd party imports
+import torch
+
+
+def synchronize(device: str) -> None:
+    """
+    Waits for the queued work of 'device' to finish, so it is included in timings.
+
+    Parameters
+    ----------
+    device: str
+        PyTorch device
+
+    Returns
+    -------
+    None
+    """
+    if device.startswith("cuda"):
+        torch.cuda.synchronize()
+    elif device == "mps":
+        torch.mps.synchronize()
+
+
+def time_call(function: Callable, device: str, repeats: int) -> tuple[float, object]:
+    """
+    Returns the minimum time of calling 'function' 'repeats' times after a warm up
+    call, and the result of the last call.
+
+    Parameters
+    ----------
+    function: Callable
+        function without arguments
+    device: str
+        PyTorch device the function runs on
+    repeats: int
+        number of timed calls
+
+    Returns
+    -------
+    tuple[float, object]
+        the minimum time in seconds and the function's result
+    """
+    result = function()
+    synchronize(device)
+    seconds = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = function()
+        synchronize(device)
+        seconds.append(time.perf_counter() - start)
+    return min(seconds), result
+
+
+def bench_stages(
+    texttiler: TextTiler,
+    embeddings: torch.Tensor,
+    k: int,
+    args: argparse.Namespace,
+) -> dict:
+    """
+    Times each stage of TextTiler.text_tile() on 'embeddings', feeding every stage the
+    output of the previous one.
+
+    Parameters
+    ----------
+    texttiler: TextTiler
+        the TextTiler
+    embeddings: torch.Tensor
+        tensor of shape (N, E) on the TextTiler's device
+    k: int
+        the window size
+    args: argparse.Namespace
+        parsed command line arguments
+
+    Returns
+    -------
+    dict
+        seconds spent in each stage and the number of boundaries found
+    """
+    device = args.device
+    seconds = {}
+    seconds["calc_gap_scores"], gap_scores = time_call(
+        lambda: texttiler._calc_gap_scores(embeddings, k, args.window_pool_method),
+        device,
+        args.repeats,
+    )
+    seconds["smooth_scores"], smoothed_scores = time_call(
+        lambda: texttiler._smooth_scores(gap_scores, args.smoothing_width),
+        device,
+        args.repeats,
+    )
+    seconds["calc_depth_scores"], depth_scores = time_call(
+        lambda: texttiler._calc_depth_scores(smoothed_scores),
+        device,
+        args.repeats,
+    )
+    seconds["identify_boundaries"], boundaries = time_call(
+        lambda: texttiler._identify_boundaries(depth_scores, args.cutoff_policy),
+        device,
+        args.repeats,
+    )
+    seconds["pool_embedding_groups"], _ = time_call(
+        lambda: texttiler._pool_embedding_groups(
+            embeddings, boundaries, args.aggregation_pool_method
+        ),
+        device,
+        args.repeats,
+    )
+    return {"stage_seconds": seconds, "num_boundaries": int(boundaries.sum())}
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    """
+    Benchmarks every document size and window size.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        parsed command line arguments
+
+    Returns
+    -------
+    list[dict]
+        one result per document size and window size
+    """
+    texttiler = TextTiler(args.device)
+    clip_finder = ClipFinder(
+        device=args.device,
+        embedder="minilm",
+        embedding_aggregation_pool_method=args.aggregation_pool_method,
+        smoothing_width=args.smoothing_width,
+        window_compare_pool_method=args.window_pool_method,
+        cutoff_policy=args.cutoff_policy,
+    )
+    results = []
+    for num_sentences in args.num_sentences:
+        transcription, embeddings = make_document(
+            num_sentences, dim=args.dim, seed=num_sentences
+        )
+        sentences_info = transcription.get_sentence_info()
+        embeddings = embeddings.to(args.device)
+        for k in args.k:
+            result = {
+                "num_sentences": num_sentences,
+                "dim": args.dim,
+                "k": k,
+                "device": args.device,
+                "torch": torch.__version__,
+                "python": platform.python_version(),
+            }
+            result.update(bench_stages(texttiler, embeddings, k, args))
+            result["text_tile_seconds"], _ = time_call(
+                lambda: texttiler.text_tile(
+                    embeddings,
+                    k,
+                    args.window_pool_method,
+                    args.aggregation_pool_method,
+                    args.smoothing_width,
+                    args.cutoff_policy,
+                ),
+                args.device,
+                args.repeats,
+            )
+            result["multiple_rounds_seconds"], final_clips = time_call(
+                lambda: clip_finder._text_tile_multiple_rounds(
+                    sentences_info,
+                    embeddings,
+                    k,
+                    args.min_clip_duration,
+                    args.max_clip_duration,
+                ),
+                args.device,
+                args.repeats,
+            )
+            result["num_clips"] = len(final_clips)
+            results.append(result)
+            print(json.dumps(result), flush=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--num-sentences",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 50000, 100000, 200000],
+    )
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--k", type=int, nargs="+", default=[7, 37])
+    parser.add_argument("--device", default="cpu")
+    parser.add_argument("--window-pool-method", default="mean")
+    parser.add_argument("--aggregation-pool-method", default="max")
+    parser.add_argument("--smoothing-width", type=int, default=3)
+    parser.add_argument("--cutoff-policy", default="high")
+    parser.add_argument("--min-clip-duration", type=int, default=15)
+    parser.add_argument("--max-clip-duration", type=int, default=900)
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--output", default=None, help="write results as json")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,390 @@
+"""
+Compares the speed and segmentation quality of sentence embedders against the default.
+
+Every embedder embeds the same fixed set of transcripts. The TextTiling boundaries its
+embeddings produce are scored against the boundaries of the reference embedder
+(precision, recall and F1 with a tolerance of a few sentences), and when transcription
+files are given the clips found by ClipFinder are matched with the reference clips
+using ClipFinder's duplicate rule. Without transcription files a fixed set of
+synthetic transcripts is used, which only measures speed and boundary agreement.
+
+Embedders are given as 'model[:backend[:precision]]' where model is a short name from
+EMBEDDER_PRESETS or any SentenceTransformer model.
+
+Usage
+-----
+    python -m benchmarks.compare_embedders --embedders minilm minilm:onnx mpnet-base
+    python -m benchmarks.compare_embedders --transcriptions a.json b.json --device cpu
+"""
+# standard library imports
+import argparse
+import json
+import time
+
+# current package imports
+from .bench_text_embedder import load_sentences, make_sentences
+
+# local package imports
+from clipsai.clip.clipfinder import ClipFinder
+from clipsai.clip.model_registry import ModelRegistry
+from clipsai.clip.text_embedder import TextEmbedder
+from clipsai.clip.texttiler import TextTiler
+
+# 3rd party imports
+import torch
+
+# window sizes of the first TextTiling round of each clip duration range
+K_VALS = [5, 7, 11, 17, 37]
+
+
+def parse_embedder_spec(
+    spec: str, device: str, registry: ModelRegistry, batch_size: int
+) -> TextEmbedder:
+    """
+    Creates the embedder described by 'spec'.
+
+    Parameters
+    ----------
+    spec: str
+        'model[:backend[:precision]]'
+    device: str
+        PyTorch device to embed text on
+    registry: ModelRegistry
+        registry the model is loaded from
+    batch_size: int
+        number of sentences embedded per forward pass
+
+    Returns
+    -------
+    TextEmbedder
+        the embedder
+    """
+    model_name, backend, precision = (spec.split(":") + ["torch", "float32"])[:3]
+    return TextEmbedder(
+        model_name=model_name,
+        device=device,
+        model_registry=registry,
+        batch_size=batch_size,
+        precision=precision,
+        backend=backend,
+    )
+
+
+def load_transcripts(transcription_paths: list[str], num_synthetic: int) -> list:
+    """
+    Loads the transcripts embedders are compared on.
+
+    Parameters
+    ----------
+    transcription_paths: list[str]
+        absolute paths of transcription json files. If empty, a fixed set of synthetic
+        transcripts is used
+    num_synthetic: int
+        number of synthetic transcripts
+
+    Returns
+    -------
+    list[dict]
+        transcripts with the keys "name", "sentences" and "transcription" (None for
+        synthetic transcripts)
+    """
+    transcripts = []
+    if len(transcription_paths) == 0:
+        for seed in range(num_synthetic):
+            transcripts.append(
+                {
+                    "name": "synthetic-{}".format(seed),
+                    "sentences": make_sentences(400, seed=seed),
+                    "transcription": None,
+                }
+            )
+        return transcripts
+
+    from clipsai.filesys.json_file import JSONFile
+    from clipsai.transcribe.transcription import Transcription
+
+    for path in transcription_paths:
+        transcripts.append(
+            {
+                "name": path,
+                "sentences": load_sentences(path),
+                "transcription": Transcription(JSONFile(path)),
+            }
+        )
+    return transcripts
+
+
+def find_boundaries(
+    texttiler: TextTiler, embeddings: torch.Tensor, k: int
+) -> list[int]:
+    """
+    Returns the sentence indices of the first round TextTiling boundaries, using
+    ClipFinder's default settings.
+
+    Parameters
+    ----------
+    texttiler: TextTiler
+        the TextTiler
+    embeddings: torch.Tensor
+        sentence embeddings of shape (N, E)
+    k: int
+        window size
+
+    Returns
+    -------
+    list[int]
+        indices of the sentences ending a segment, excluding the last sentence
+    """
+    boundaries, _ = texttiler.text_tile(embeddings, k, "mean", "max", 3, "high")
+    boundaries = torch.stack(boundaries)[:-1]
+    return torch.nonzero(boundaries == 1).flatten().tolist()
+
+
+def score_boundaries(
+    reference: list[int], candidate: list[int], tolerance: int
+) -> dict:
+    """
+    Scores 'candidate' boundaries against 'reference' boundaries. A boundary matches if
+    a boundary of the other list is at most 'tolerance' sentences away.
+
+    Parameters
+    ----------
+    reference: list[int]
+        reference boundary indices
+    candidate: list[int]
+        candidate boundary indices
+    tolerance: int
+        maximum distance in sentences between matching boundaries
+
+    Returns
+    -------
+    dict
+        dictionary with the keys "precision", "recall" and "f1"
+    """
+
+    def num_matched(boundaries: list[int], others: list[int]) -> int:
+        return sum(
+            any(abs(boundary - other) <= tolerance for other in others)
+            for boundary in boundaries
+        )
+
+    precision = num_matched(candidate, reference) / max(len(candidate), 1)
+    recall = num_matched(reference, candidate) / max(len(reference), 1)
+    if len(reference) == 0 and len(candidate) == 0:
+        precision = recall = 1.0
+    f1 = 0.0
+    if precision + recall > 0:
+        f1 = 2 * precision * recall / (precision + recall)
+    return {"precision": precision, "recall": recall, "f1": f1}
+
+
+def match_clips(reference_clips: list, candidate_clips: list) -> float:
+    """
+    Returns the fraction of 'reference_clips' that ClipFinder would consider a
+    duplicate of some clip in 'candidate_clips'.
+
+    Parameters
+    ----------
+    reference_clips: list[Clip]
+        clips found with the reference embedder
+    candidate_clips: list[Clip]
+        clips found with the candidate embedder
+
+    Returns
+    -------
+    float
+        the fraction of matched reference clips
+    """
+    if len(reference_clips) == 0:
+        return 1.0
+    num_matched = 0
+    for ref in reference_clips:
+        for clip in candidate_clips:
+            diff = abs(ref.start_time - clip.start_time)
+            diff += abs(ref.end_time - clip.end_time)
+            if diff < 15:
+                num_matched += 1
+                break
+    return num_matched / len(reference_clips)
+
+
+def embed(embedder: TextEmbedder, sentences: list[str]) -> tuple[torch.Tensor, float]:
+    """
+    Embeds 'sentences' and times it.
+
+    Parameters
+    ----------
+    embedder: TextEmbedder
+        the embedder
+    sentences: list[str]
+        the sentences
+
+    Returns
+    -------
+    tuple[torch.Tensor, float]
+        the embeddings and the number of seconds embedding took
+    """
+    start = time.perf_counter()
+    embeddings = embedder.embed_sentences(sentences)
+    return embeddings, time.perf_counter() - start
+
+
+def run(args: argparse.Namespace) -> list[dict]:
+    """
+    Compares every requested embedder against the reference embedder.
+
+    Parameters
+    ----------
+    args: argparse.Namespace
+        parsed command line arguments
+
+    Returns
+    -------
+    list[dict]
+        one result per embedder
+    """
+    transcripts = load_transcripts(args.transcriptions, args.num_synthetic)
+    registry = ModelRegistry(max_resident_models=2)
+    texttiler = TextTiler(args.device or "cpu")
+
+    specs = [args.reference] + [s for s in args.embedders if s != args.reference]
+    reference = None
+    results = []
+    for spec in specs:
+        result = {"embedder": spec}
+        try:
+            embedder = parse_embedder_spec(spec, args.device, registry, args.batch_size)
+            # load the model and run the first forward pass outside the timer
+            embedder.embed_sentences(transcripts[0]["sentences"][: args.batch_size])
+
+            outputs = []
+            num_sentences = 0
+            seconds = 0
+            for transcript in transcripts:
+                embeddings, secs = embed(embedder, transcript["sentences"])
+                num_sentences += len(transcript["sentences"])
+                seconds += secs
+                output = {
+                    "boundaries": {
+                        k: find_boundaries(texttiler, embeddings, k)
+                        for k in K_VALS
+                        if k < len(embeddings)
+                    },
+                    "clips": None,
+                }
+                if transcript["transcription"] is not None:
+                    clip_finder = ClipFinder(device=args.device, embedder=embedder)
+                    transcription = transcript["transcription"]
+                    output["clips"] = clip_finder._find_clips_from_embeddings(
+                        transcription, transcription.get_sentence_info(), embeddings
+                    )
+                outputs.append(output)
+            embedder.unload()
+        except Exception as e:
+            # e.g. the onnx extra isn't installed
+            result["error"] = str(e)
+            results.append(result)
+            print(format_result(result), flush=True)
+            if reference is None:
+                raise
+            continue
+
+        result["sentences_per_sec"] = num_sentences / seconds
+        if reference is None:
+            reference = outputs
+        result.update(compare_outputs(reference, outputs, args.tolerance))
+        results.append(result)
+        print(format_result(result), flush=True)
+
+    return results
+
+
+def compare_outputs(reference: list[dict], outputs: list[dict], tolerance: int) -> dict:
+    """
+    Averages the boundary scores and clip match rates of 'outputs' against
+    'reference' over every transcript and window size.
+
+    Parameters
+    ----------
+    reference: list[dict]
+        boundaries and clips of the reference embedder, one per transcript
+    outputs: list[dict]
+        boundaries and clips of the compared embedder, one per transcript
+    tolerance: int
+        maximum distance in sentences between matching boundaries
+
+    Returns
+    -------
+    dict
+        dictionary with the keys "boundary_precision", "boundary_recall",
+        "boundary_f1" and "clip_match_rate" (None without transcription files)
+    """
+    scores = []
+    clip_match_rates = []
+    for ref_output, output in zip(reference, outputs):
+        for k, ref_boundaries in ref_output["boundaries"].items():
+            scores.append(
+                score_boundaries(ref_boundaries, output["boundaries"][k], tolerance)
+            )
+        if ref_output["clips"] is not None:
+            clip_match_rates.append(match_clips(ref_output["clips"], output["clips"]))
+
+    comparison = {}
+    for metric in ["precision", "recall", "f1"]:
+        comparison["boundary_" + metric] = sum(s[metric] for s in scores) / max(
+            len(scores), 1
+        )
+    comparison["clip_match_rate"] = None
+    if len(clip_match_rates) > 0:
+        comparison["clip_match_rate"] = sum(clip_match_rates) / len(clip_match_rates)
+    return comparison
+
+
+def format_result(result: dict) -> str:
+    """
+    Formats a result as one line of text.
+
+    Parameters
+    ----------
+    result: dict
+        the result
+
+    Returns
+    -------
+    str
+        the formatted result
+    """
+    if "error" in result:
+        return "{:<28} failed: {}".format(result["embedder"], result["error"])
+    line = "{:<28} {:>9.1f} sentences/sec  boundary f1 {:.3f}".format(
+        result["embedder"], result["sentences_per_sec"], result["boundary_f1"]
+    )
+    if result["clip_match_rate"] is not None:
+        line += "  clips matched {:.3f}".format(result["clip_match_rate"])
+    return line
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--reference", default="roberta-large")
+    parser.add_argument(
+        "--embedders",
+        nargs="+",
+        default=["mpnet-base", "minilm", "minilm:onnx", "roberta-large:torch:int8"],
+    )
+    parser.add_argument("--transcriptions", nargs="*", default=[])
+    parser.add_argument("--num-synthetic", type=int, default=3)
+    parser.add_argument("--tolerance", type=int, default=1, help="in sentences")
+    parser.add_argument("--device", default=None)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--output", default=None, help="write results as json")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output is not None:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,6 @@
 # Functions
 from .clip.clipfinder import ClipFinder
+from .clip.incremental_clipfinder import IncrementalClipFinder
 from .media.audio_file import AudioFile
 from .media.audiovideo_file import AudioVideoFile
 from .media.editor import MediaEditor
@@ -9,6 +10,8 @@ from .transcribe.transcriber import Transcriber
 
 # Types
 from .clip.clip import Clip
+from .clip.clip_search_index import ClipSearchIndex
+from .clip.clip_set import ClipSet
 from .resize.crops import Crops
 from .resize.segment import Segment
 from .transcribe.transcription import Transcription
@@ -20,7 +23,10 @@ __all__ = [
     "Character",
     "ClipFinder",
     "Clip",
+    "ClipSearchIndex",
+    "ClipSet",
     "Crops",
+    "IncrementalClipFinder",
     "MediaEditor",
     "Segment",
     "Sentence",
@@ -0,0 +1,304 @@
+"""
+Segmenting sentence embeddings with adjacency constrained agglomerative clustering.
+
+Notes
+-----
+- Starting from one segment per sentence, the two adjacent segments whose merge least
+increases the within segment variance of the unit sentence embeddings (Ward's
+criterion) are merged until one segment is left. The merges form a binary tree whose
+nodes are contiguous runs of sentences, so the segments of every scale are read from
+one tree instead of tiling the embeddings again for every window size.
+- The merge costs of adjacent segments are kept in a heap. A merge removes two
+segments and adds the costs of merging the new segment with its two neighbours, so
+building the tree takes N - 1 merges of O(log N + E) each. Heap entries of segments
+that were merged since are skipped when popped.
+"""
+# standard library imports
+import heapq
+
+# 3rd party imports
+import numpy as np
+import torch
+
+
+class MergeTree:
+    """
+    The binary tree of merges of an agglomerative segmentation. Nodes 0 to N-1 are the
+    sentences and node N+i is the segment created by the i-th merge, so the root is
+    node 2N-2.
+
+    Attributes
+    ----------
+    starts (np.ndarray): index of the first sentence of each node.
+    ends (np.ndarray): index of the last sentence of each node.
+    children (np.ndarray): (N-1, 2) left and right child of each merged node.
+    similarities (np.ndarray): cosine similarity of the mean embeddings of the children
+    of each merged node.
+    norms (np.ndarray): L2 norm of the mean embedding of each node.
+    """
+
+    def __init__(
+        self,
+        starts: np.ndarray,
+        ends: np.ndarray,
+        children: np.ndarray,
+        similarities: np.ndarray,
+        norms: np.ndarray,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        starts: np.ndarray
+            index of the first sentence of each node
+        ends: np.ndarray
+            index of the last sentence of each node
+        children: np.ndarray
+            (N-1, 2) left and right child of each merged node
+        similarities: np.ndarray
+            cosine similarity of the mean embeddings of the children of each merged
+            node
+        norms: np.ndarray
+            L2 norm of the mean embedding of each node
+        """
+        self.starts = starts
+        self.ends = ends
+        self.children = children
+        self.similarities = similarities
+        self.norms = norms
+        # parent of each node and similarity of the node with its sibling, -1 and
+        # -inf for the root
+        self._parents = np.full(len(starts), -1, dtype=np.int64)
+        self._sibling_similarities = np.full(len(starts), -np.inf)
+        num_sentences = len(children) + 1
+        for merge, (left, right) in enumerate(children):
+            self._parents[[left, right]] = num_sentences + merge
+            self._sibling_similarities[[left, right]] = similarities[merge]
+
+    @property
+    def num_sentences(self) -> int:
+        """
+        The number of sentences (leaves) of the tree.
+        """
+        return len(self.children) + 1
+
+    @property
+    def root(self) -> int:
+        """
+        The node spanning every sentence.
+        """
+        return len(self.starts) - 1
+
+    def get_children(self, node: int) -> tuple[int, int] or None:
+        """
+        Returns the left and right child of 'node', or None if 'node' is a sentence.
+
+        Parameters
+        ----------
+        node: int
+            the node
+
+        Returns
+        -------
+        tuple[int, int] or None
+            the children of the node
+        """
+        if node < self.num_sentences:
+            return None
+        left, right = self.children[node - self.num_sentences]
+        return int(left), int(right)
+
+    def find_band_segments(
+        self,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+        duration_bands: list[tuple[float, float]],
+    ) -> list[list[int]]:
+        """
+        Finds the segments of every duration band in one traversal of the tree. The
+        segments of a band are the largest nodes whose duration is within the band,
+        i.e. nodes within the band whose parent isn't, so they don't overlap. A node
+        is only a segment if it is at most as similar to its sibling as its parent is
+        to its own sibling, which drops the halves of a topic that is too long for
+        the band.
+
+        Parameters
+        ----------
+        start_times: np.ndarray
+            start time of each sentence in seconds
+        end_times: np.ndarray
+            end time of each sentence in seconds
+        duration_bands: list[tuple[float, float]]
+            (minimum, maximum) duration in seconds of each band, in increasing order
+            and not overlapping. A duration equal to the maximum of a band and the
+            minimum of the next belongs to the next band
+
+        Returns
+        -------
+        list[list[int]]
+            the nodes of each band, ordered by their first sentence
+        """
+        band_segments = [[] for _ in duration_bands]
+        if len(duration_bands) == 0:
+            return band_segments
+        min_duration = duration_bands[0][0]
+
+        def get_band(duration: float) -> int:
+            for i, (band_min, band_max) in enumerate(duration_bands):
+                if duration < band_min:
+                    return -1
+                if duration < band_max or (
+                    i == len(duration_bands) - 1 and duration == band_max
+                ):
+                    return i
+            return -1
+
+        # depth first, right child pushed first, so nodes are visited by start
+        stack = [(self.root, -1)]
+        while len(stack) > 0:
+            node, parent_band = stack.pop()
+            duration = end_times[self.ends[node]] - start_times[self.starts[node]]
+            if duration < min_duration:
+                # every descendant is shorter
+                continue
+            band = get_band(duration)
+            if band != -1 and band != parent_band and self._splits_topic(node):
+                band_segments[band].append(node)
+            children = self.get_children(node)
+            if children is not None:
+                stack.append((children[1], band))
+                stack.append((children[0], band))
+
+        return band_segments
+
+    def _splits_topic(self, node: int) -> bool:
+        """
+        Returns True if 'node' is at most as similar to its sibling as its parent is
+        to its parent's sibling.
+
+        Parameters
+        ----------
+        node: int
+            the node
+
+        Returns
+        -------
+        bool
+            True if the split of 'node' from its sibling is at least as strong as the
+            split of its parent, False otherwise
+        """
+        parent = self._parents[node]
+        if parent == -1 or self._parents[parent] == -1:
+            return True
+        return self._sibling_similarities[node] <= self._sibling_similarities[parent]
+
+
+class AgglomerativeSegmenter:
+    """
+    Builds the adjacency constrained merge tree of sentence embeddings.
+    """
+
+    def build_merge_tree(self, embeddings: torch.Tensor) -> MergeTree:
+        """
+        Merges the adjacent segments of 'embeddings' whose merge least increases the
+        within segment variance (Ward's criterion) until a single segment is left.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+
+        Returns
+        -------
+        MergeTree
+            the tree of merges
+        """
+        # a python loop of N merges; numpy keeps the per merge overhead low
+        sums = embeddings.detach().cpu().float().numpy().astype(np.float64)
+        num_sentences = len(sums)
+        # unit embeddings, so the variance is measured with the cosine distance
+        sentence_norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        sums /= np.where(sentence_norms == 0, 1, sentence_norms)
+
+        num_nodes = max(2 * num_sentences - 1, 0)
+        starts = np.empty(num_nodes, dtype=np.int64)
+        ends = np.empty(num_nodes, dtype=np.int64)
+        norms = np.empty(num_nodes, dtype=np.float64)
+        children = np.empty((max(num_sentences - 1, 0), 2), dtype=np.int64)
+        similarities = np.empty(max(num_sentences - 1, 0), dtype=np.float64)
+        starts[:num_sentences] = ends[:num_sentences] = np.arange(num_sentences)
+        norms[:num_sentences] = np.linalg.norm(sums, axis=1)
+
+        # a segment is stored in the row of its first sentence
+        sizes = np.ones(num_sentences, dtype=np.int64)
+        segment_ends = np.arange(num_sentences)
+        prev_segments = np.arange(-1, num_sentences - 1)
+        node_ids = np.arange(num_sentences)
+        # changes every time a segment is merged so stale heap entries are detected
+        versions = np.zeros(num_sentences, dtype=np.int64)
+
+        def merge_cost(left: int, right: int) -> float:
+            # increase of the sum of squared distances to the segment means
+            diff = sums[left] / sizes[left] - sums[right] / sizes[right]
+            size = sizes[left] * sizes[right] / (sizes[left] + sizes[right])
+            return float(size * np.dot(diff, diff))
+
+        heap = [
+            (merge_cost(i, i + 1), i, 0, i + 1, 0) for i in range(num_sentences - 1)
+        ]
+        heapq.heapify(heap)
+
+        for merge in range(num_sentences - 1):
+            while True:
+                _, left, left_version, right, right_version = heapq.heappop(heap)
+                if versions[left] == left_version and versions[right] == right_version:
+                    break
+
+            left_norm = np.linalg.norm(sums[left])
+            right_norm = np.linalg.norm(sums[right])
+            similarities[merge] = 0.0
+            if left_norm > 0 and right_norm > 0:
+                similarities[merge] = np.dot(sums[left], sums[right]) / (
+                    left_norm * right_norm
+                )
+
+            # merge the right segment into the left one
+            node = num_sentences + merge
+            children[merge] = (node_ids[left], node_ids[right])
+            sums[left] += sums[right]
+            sizes[left] += sizes[right]
+            segment_ends[left] = segment_ends[right]
+            versions[left] += 1
+            # the right segment is never popped again
+            versions[right] = -1
+            node_ids[left] = node
+            starts[node] = left
+            ends[node] = segment_ends[left]
+            norms[node] = np.linalg.norm(sums[left]) / sizes[left]
+
+            next_segment = segment_ends[left] + 1
+            if next_segment < num_sentences:
+                prev_segments[next_segment] = left
+                heapq.heappush(
+                    heap,
+                    (
+                        merge_cost(left, next_segment),
+                        left,
+                        versions[left],
+                        next_segment,
+                        versions[next_segment],
+                    ),
+                )
+            prev_segment = prev_segments[left]
+            if prev_segment >= 0:
+                heapq.heappush(
+                    heap,
+                    (
+                        merge_cost(prev_segment, left),
+                        prev_segment,
+                        versions[prev_segment],
+                        left,
+                        versions[left],
+                    ),
+                )
+
+        return MergeTree(starts, ends, children, similarities, norms)
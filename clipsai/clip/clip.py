@@ -15,6 +15,8 @@ class Clip:
     end_char (int): The end character in the transcription of the clip.
     """
 
+    __slots__ = ("_start_time", "_end_time", "_start_char", "_end_char")
+
     def __init__(
         self,
         start_time: float,
@@ -0,0 +1,94 @@
+"""
+An index of clips sorted by start time for finding duplicate clips.
+
+Notes
+-----
+- Two clips are duplicates when the sum of the differences between their start times
+and their end times is less than a maximum distance, so a duplicate of a clip must
+start less than that distance away from it. Only the clips starting within that range
+are compared instead of every clip.
+"""
+# standard library imports
+import bisect
+
+
+class ClipIndex:
+    """
+    A collection of clip dictionaries that remembers the order clips were added in and
+    keeps their start and end times sorted by start time.
+    """
+
+    def __init__(self, clips: list[dict] = None) -> None:
+        """
+        Parameters
+        ----------
+        clips: list[dict]
+            clips to add to the index. Each clip has a "start_time" and an "end_time"
+            key. Default is None (an empty index)
+        """
+        # clips in the order they were added
+        self._clips = []
+        # start and end times ordered by start time
+        self._start_times = []
+        self._end_times = []
+        if clips is not None:
+            self.add(clips)
+
+    @property
+    def clips(self) -> list[dict]:
+        """
+        The clips in the order they were added.
+        """
+        return self._clips
+
+    def __len__(self) -> int:
+        return len(self._clips)
+
+    def add(self, clips: list[dict]) -> None:
+        """
+        Adds 'clips' to the index.
+
+        Parameters
+        ----------
+        clips: list[dict]
+            the clips to add
+
+        Returns
+        -------
+        None
+        """
+        for clip in clips:
+            idx = bisect.bisect_right(self._start_times, clip["start_time"])
+            self._start_times.insert(idx, clip["start_time"])
+            self._end_times.insert(idx, clip["end_time"])
+            self._clips.append(clip)
+
+    def has_duplicate(self, clip: dict, max_distance: float = 15) -> bool:
+        """
+        Checks if the index holds a clip whose start time difference plus end time
+        difference with 'clip' is less than 'max_distance'.
+
+        Parameters
+        ----------
+        clip: dict
+            the clip to check
+        max_distance: float
+            sum of the start and end time differences in seconds below which two clips
+            are duplicates
+
+        Returns
+        -------
+        bool
+            True if the index holds a duplicate of 'clip', False otherwise.
+        """
+        start_time = clip["start_time"]
+        end_time = clip["end_time"]
+        lo = bisect.bisect_left(self._start_times, start_time - max_distance)
+        hi = bisect.bisect_right(self._start_times, start_time + max_distance)
+        for i in range(lo, hi):
+            start_time_diff = abs(start_time - self._start_times[i])
+            end_time_diff = abs(end_time - self._end_times[i])
+            if (start_time_diff + end_time_diff) < max_distance:
+                return True
+
+        return False
@@ -0,0 +1,700 @@
+"""
+A persistent index of clip embeddings for searching the clips of many media files.
+
+Notes
+-----
+- ClipFinder.find_clips_with_embeddings() pools the sentence embeddings of every clip.
+The index stores these embeddings L2 normalized in a memory-mapped float32 matrix with
+one row per clip, so clips about a topic are found across a library without embedding
+it again.
+- The media file, times and characters of the clips are memory-mapped .npy columns
+next to the matrix. Adding clips only writes their rows, the media id of a new media
+file is appended to a text file, and the JSON metadata only holds a few counts, so
+indexing a library takes time linear in its number of clips. The rows of a media file
+are contiguous; removing them moves the rows after them up.
+- Searching is brute force by default: the query is compared with every row, in chunks
+so the matrix is never loaded into memory at once. After build_ivf(), the rows are
+partitioned by their closest k-means centroid (an inverted file) and a search with
+'nprobe' only compares the query with the rows of its 'nprobe' closest centroids.
+"""
+# standard library imports
+import json
+import logging
+import os
+import threading
+
+# current package imports
+from .clip import Clip
+from .exceptions import ClipSearchIndexError
+
+# 3rd party imports
+import numpy as np
+import torch
+
+# number of rows compared with a query at once by a brute force search
+SEARCH_CHUNK_SIZE = 65536
+
+# the columns stored for every row, each in its own .npy file
+ROW_COLUMNS = {
+    "media_numbers": np.int64,
+    "start_times": np.float64,
+    "end_times": np.float64,
+    "start_chars": np.int64,
+    "end_chars": np.int64,
+    "list_ids": np.int64,
+}
+
+
+class ClipSearchIndex:
+    """
+    A persistent, brute force or inverted file index of normalized clip embeddings.
+    """
+
+    def __init__(self, index_dir: str, initial_capacity: int = 1024) -> None:
+        """
+        Parameters
+        ----------
+        index_dir: str
+            absolute path of the directory the index is stored in; created if it
+            doesn't exist. An existing index in the directory is loaded
+        initial_capacity: int
+            number of rows the embedding matrix and the row columns are created with.
+            They double in size whenever they are full
+        """
+        if isinstance(initial_capacity, int) is False or initial_capacity < 1:
+            err = "initial_capacity must be an integer greater than 0, not '{}'".format(
+                initial_capacity
+            )
+            logging.error(err)
+            raise ClipSearchIndexError(err)
+
+        os.makedirs(index_dir, exist_ok=True)
+        self._index_dir = index_dir
+        self._initial_capacity = initial_capacity
+        self._lock = threading.Lock()
+        self._dim = None
+        self._num_vectors = 0
+        # the (capacity, dim) "clip_embeddings" matrix and the (capacity,) row columns
+        self._arrays = {}
+        # media ids by media number, the number of each media id and the first row
+        # and number of rows of each indexed media id, in row order
+        self._media_ids = []
+        self._media_numbers = {}
+        self._media_rows = {}
+        # inverted file: (L, dim) centroids
+        self._centroids = None
+        # rows sorted by list and the offset of each list in them, built on demand
+        self._list_rows = None
+        self._list_offsets = None
+        self._load()
+
+    @property
+    def index_dir(self) -> str:
+        """
+        The directory the index is stored in.
+        """
+        return self._index_dir
+
+    @property
+    def dim(self) -> int or None:
+        """
+        The dimension of the indexed embeddings, None if the index is empty and was
+        never added to.
+        """
+        return self._dim
+
+    @property
+    def num_lists(self) -> int:
+        """
+        The number of inverted lists, 0 if build_ivf() wasn't called.
+        """
+        return 0 if self._centroids is None else len(self._centroids)
+
+    def __len__(self) -> int:
+        return self._num_vectors
+
+    def get_media_ids(self) -> list[str]:
+        """
+        Returns the ids of the media files whose clips are indexed.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[str]
+            the media ids in the order their clips were last added
+        """
+        with self._lock:
+            return list(self._media_rows.keys())
+
+    def add(
+        self,
+        media_id: str,
+        clips: list[Clip],
+        embeddings: torch.Tensor or np.ndarray,
+    ) -> None:
+        """
+        Adds the clips of a media file and their embeddings to the index and persists
+        the index to disk. Clips of 'media_id' already in the index are replaced.
+        Adding no clips does nothing.
+
+        Parameters
+        ----------
+        media_id: str
+            id of the media file the clips were found in
+        clips: list[Clip]
+            the clips
+        embeddings: torch.Tensor or np.ndarray
+            array of shape (M, E) where row i is the embedding of clips[i], as
+            returned by ClipFinder.find_clips_with_embeddings()
+
+        Returns
+        -------
+        None
+        """
+        vectors = self._normalize(embeddings)
+        if len(clips) == 0 and vectors.size == 0:
+            return
+        if vectors.ndim != 2 or len(vectors) != len(clips):
+            err = "embeddings must have shape ({}, E), not {}".format(
+                len(clips), tuple(vectors.shape)
+            )
+            logging.error(err)
+            raise ClipSearchIndexError(err)
+
+        with self._lock:
+            if self._dim is None:
+                self._dim = vectors.shape[1]
+            if vectors.shape[1] != self._dim:
+                err = "Indexed embeddings have dimension {}, not {}".format(
+                    self._dim, vectors.shape[1]
+                )
+                logging.error(err)
+                raise ClipSearchIndexError(err)
+
+            self._remove_media(media_id)
+            media_number = self._get_media_number(media_id)
+            self._reserve(self._num_vectors + len(vectors))
+            rows = slice(self._num_vectors, self._num_vectors + len(vectors))
+            self._arrays["clip_embeddings"][rows] = vectors
+            self._arrays["media_numbers"][rows] = media_number
+            self._arrays["start_times"][rows] = [clip.start_time for clip in clips]
+            self._arrays["end_times"][rows] = [clip.end_time for clip in clips]
+            self._arrays["start_chars"][rows] = [clip.start_char for clip in clips]
+            self._arrays["end_chars"][rows] = [clip.end_char for clip in clips]
+            self._arrays["list_ids"][rows] = (
+                -1 if self._centroids is None else self._assign_lists(vectors)
+            )
+            self._media_rows[media_id] = (self._num_vectors, len(vectors))
+            self._num_vectors += len(vectors)
+            self._list_rows = None
+            self._flush()
+
+    def remove(self, media_id: str) -> int:
+        """
+        Removes the clips of a media file from the index and persists the index to
+        disk.
+
+        Parameters
+        ----------
+        media_id: str
+            id of the media file whose clips are removed
+
+        Returns
+        -------
+        int
+            the number of removed clips
+        """
+        with self._lock:
+            num_removed = self._remove_media(media_id)
+            if num_removed > 0:
+                self._flush()
+            return num_removed
+
+    def build_ivf(
+        self,
+        num_lists: int = None,
+        num_iters: int = 20,
+        seed: int = 0,
+    ) -> None:
+        """
+        Clusters the indexed embeddings with spherical k-means and assigns every row to
+        the list of its closest centroid, so searches with 'nprobe' only compare the
+        query with a few lists. Clips added later are assigned to the existing
+        centroids; call build_ivf() again after adding many clips.
+
+        Parameters
+        ----------
+        num_lists: int
+            number of centroids. Default is None (the square root of the number of
+            indexed clips)
+        num_iters: int
+            number of k-means iterations
+        seed: int
+            seed of the centroid initialization and of the training sample
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if self._num_vectors == 0:
+                err = "Can't build the inverted file of an empty index"
+                logging.error(err)
+                raise ClipSearchIndexError(err)
+            if num_lists is None:
+                num_lists = max(int(self._num_vectors**0.5), 1)
+            if isinstance(num_lists, int) is False or num_lists < 1:
+                err = "num_lists must be an integer greater than 0, not '{}'".format(
+                    num_lists
+                )
+                logging.error(err)
+                raise ClipSearchIndexError(err)
+            num_lists = min(num_lists, self._num_vectors)
+
+            # k-means converges on a sample of a few hundred rows per centroid
+            rng = np.random.default_rng(seed)
+            num_samples = min(self._num_vectors, 256 * num_lists)
+            sample_rows = np.sort(
+                rng.choice(self._num_vectors, num_samples, replace=False)
+            )
+            sample = np.array(self._arrays["clip_embeddings"][sample_rows])
+            centroids = sample[rng.choice(num_samples, num_lists, replace=False)]
+            for _ in range(num_iters):
+                assignments = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, assignments, sample)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # a centroid without rows keeps its position
+                centroids = np.where(
+                    norms > 0, sums / np.maximum(norms, 1e-12), centroids
+                )
+
+            self._centroids = centroids.astype(np.float32)
+            for first_row in range(0, self._num_vectors, SEARCH_CHUNK_SIZE):
+                rows = slice(
+                    first_row, min(first_row + SEARCH_CHUNK_SIZE, self._num_vectors)
+                )
+                self._arrays["list_ids"][rows] = self._assign_lists(
+                    self._arrays["clip_embeddings"][rows]
+                )
+            self._list_rows = None
+
+            centroids_path = self._get_path("centroids.npy")
+            with open(centroids_path + ".tmp", "wb") as f:
+                np.save(f, self._centroids)
+            os.replace(centroids_path + ".tmp", centroids_path)
+            self._flush()
+
+    def search(
+        self,
+        query: torch.Tensor or np.ndarray,
+        k: int = 10,
+        nprobe: int = None,
+    ) -> list[dict]:
+        """
+        Finds the clips whose embeddings are most similar to 'query'.
+
+        Parameters
+        ----------
+        query: torch.Tensor or np.ndarray
+            embedding of shape (E,) of the query, e.g. as returned by
+            ClipFinder.embed_query()
+        k: int
+            number of clips returned
+        nprobe: int
+            number of inverted lists searched. Default is None (every clip is compared
+            with the query). Ignored if build_ivf() wasn't called
+
+        Returns
+        -------
+        list[dict]
+            the at most 'k' most similar clips, most similar first, with the keys
+            "media_id", "start_time", "end_time", "start_char", "end_char" and
+            "score" (the cosine similarity of the clip and the query)
+        """
+        query = self._normalize(query)
+        if query.ndim != 1 or (self._dim is not None and len(query) != self._dim):
+            err = "query must have shape ({},), not {}".format(
+                self._dim, tuple(query.shape)
+            )
+            logging.error(err)
+            raise ClipSearchIndexError(err)
+        if isinstance(k, int) is False or k < 1:
+            err = "k must be an integer greater than 0, not '{}'".format(k)
+            logging.error(err)
+            raise ClipSearchIndexError(err)
+
+        with self._lock:
+            if self._num_vectors == 0:
+                return []
+            if nprobe is None or self._centroids is None:
+                rows, scores = self._search_all(query, k)
+            else:
+                rows, scores = self._search_lists(query, k, nprobe)
+
+            columns = self._arrays
+            return [
+                {
+                    "media_id": self._media_ids[columns["media_numbers"][row]],
+                    "start_time": float(columns["start_times"][row]),
+                    "end_time": float(columns["end_times"][row]),
+                    "start_char": int(columns["start_chars"][row]),
+                    "end_char": int(columns["end_chars"][row]),
+                    "score": float(score),
+                }
+                for row, score in zip(rows, scores)
+            ]
+
+    def _search_all(self, query: np.ndarray, k: int) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compares 'query' with every indexed embedding, one chunk of rows at a time.
+        Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        query: np.ndarray
+            normalized query embedding of shape (E,)
+        k: int
+            number of rows returned
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            the rows of the most similar embeddings and their scores, most similar
+            first
+        """
+        best_rows = np.empty(0, dtype=np.int64)
+        best_scores = np.empty(0, dtype=np.float32)
+        for first_row in range(0, self._num_vectors, SEARCH_CHUNK_SIZE):
+            last_row = min(first_row + SEARCH_CHUNK_SIZE, self._num_vectors)
+            scores = self._arrays["clip_embeddings"][first_row:last_row] @ query
+            rows = np.arange(first_row, last_row)
+            best_rows, best_scores = self._top_k(
+                np.concatenate([best_rows, rows]),
+                np.concatenate([best_scores, scores]),
+                k,
+            )
+        return best_rows, best_scores
+
+    def _search_lists(
+        self, query: np.ndarray, k: int, nprobe: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compares 'query' with the embeddings in the 'nprobe' inverted lists whose
+        centroids are most similar to it. Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        query: np.ndarray
+            normalized query embedding of shape (E,)
+        k: int
+            number of rows returned
+        nprobe: int
+            number of inverted lists searched
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            the rows of the most similar embeddings and their scores, most similar
+            first
+        """
+        if isinstance(nprobe, int) is False or nprobe < 1:
+            err = "nprobe must be an integer greater than 0, not '{}'".format(nprobe)
+            logging.error(err)
+            raise ClipSearchIndexError(err)
+
+        if self._list_rows is None:
+            list_ids = self._arrays["list_ids"][: self._num_vectors]
+            self._list_rows = np.argsort(list_ids, kind="stable")
+            list_sizes = np.bincount(list_ids, minlength=len(self._centroids))
+            self._list_offsets = np.concatenate([[0], np.cumsum(list_sizes)])
+
+        centroid_scores = self._centroids @ query
+        probed_lists = np.argsort(-centroid_scores, kind="stable")[:nprobe]
+        rows = np.sort(
+            np.concatenate(
+                [
+                    self._list_rows[self._list_offsets[i] : self._list_offsets[i + 1]]
+                    for i in probed_lists
+                ]
+            )
+        )
+        # only the probed rows are read from disk
+        scores = self._arrays["clip_embeddings"][rows] @ query
+        return self._top_k(rows, scores, k)
+
+    def _top_k(
+        self, rows: np.ndarray, scores: np.ndarray, k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the 'k' rows with the highest scores, highest first. Ties are broken by
+        the lower row.
+
+        Parameters
+        ----------
+        rows: np.ndarray
+            the rows
+        scores: np.ndarray
+            the score of each row
+
+        Returns
+        -------
+        tuple[np.ndarray, np.ndarray]
+            the top rows and their scores
+        """
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            rows, scores = rows[top], scores[top]
+        order = np.lexsort((rows, -scores))
+        return rows[order], scores[order]
+
+    def _assign_lists(self, vectors: np.ndarray) -> np.ndarray:
+        """
+        Returns the inverted list of each vector, i.e. its most similar centroid.
+
+        Parameters
+        ----------
+        vectors: np.ndarray
+            normalized vectors of shape (M, E)
+
+        Returns
+        -------
+        np.ndarray
+            int64 list number of each vector
+        """
+        return np.argmax(vectors @ self._centroids.T, axis=1).astype(np.int64)
+
+    def _normalize(self, embeddings: torch.Tensor or np.ndarray) -> np.ndarray:
+        """
+        Converts 'embeddings' to a float32 array of unit vectors along the last
+        dimension. Zero vectors are left unchanged.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor or np.ndarray
+            the embeddings
+
+        Returns
+        -------
+        np.ndarray
+            the normalized embeddings
+        """
+        if torch.is_tensor(embeddings):
+            embeddings = embeddings.detach().float().cpu().numpy()
+        vectors = np.array(embeddings, dtype=np.float32)
+        if vectors.ndim == 0:
+            return vectors
+        norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+    def _get_media_number(self, media_id: str) -> int:
+        """
+        Returns the number of 'media_id', appending it to the media ids file if it's
+        new. Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        media_id: str
+            id of the media file
+
+        Returns
+        -------
+        int
+            the media number stored in the rows of the media file
+        """
+        if media_id in self._media_numbers:
+            return self._media_numbers[media_id]
+
+        with open(self._get_path("media_ids.jsonl"), "a") as f:
+            f.write(json.dumps(media_id) + "\n")
+        self._media_numbers[media_id] = len(self._media_ids)
+        self._media_ids.append(media_id)
+        return self._media_numbers[media_id]
+
+    def _remove_media(self, media_id: str) -> int:
+        """
+        Removes the rows of 'media_id', moving the rows after them up. Must be called
+        while holding self._lock.
+
+        Parameters
+        ----------
+        media_id: str
+            id of the media file
+
+        Returns
+        -------
+        int
+            the number of removed rows
+        """
+        if media_id not in self._media_rows:
+            return 0
+        first_row, num_removed = self._media_rows.pop(media_id)
+
+        # overlapping slices are copied as if through a temporary copy
+        arrays = list(self._arrays.values())
+        for src_row in range(
+            first_row + num_removed, self._num_vectors, SEARCH_CHUNK_SIZE
+        ):
+            src = slice(src_row, min(src_row + SEARCH_CHUNK_SIZE, self._num_vectors))
+            dst = slice(src.start - num_removed, src.stop - num_removed)
+            for array in arrays:
+                array[dst] = array[src]
+        self._num_vectors -= num_removed
+
+        for other_id, (other_first_row, num_rows) in self._media_rows.items():
+            if other_first_row > first_row:
+                self._media_rows[other_id] = (other_first_row - num_removed, num_rows)
+        self._list_rows = None
+        return num_removed
+
+    def _reserve(self, num_vectors: int) -> None:
+        """
+        Grows the embedding matrix and the row columns to hold at least 'num_vectors'
+        rows. Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        num_vectors: int
+            the number of rows needed
+
+        Returns
+        -------
+        None
+        """
+        capacity = 0
+        if "clip_embeddings" in self._arrays:
+            capacity = len(self._arrays["clip_embeddings"])
+        if num_vectors <= capacity:
+            return
+
+        new_capacity = max(capacity, self._initial_capacity)
+        while new_capacity < num_vectors:
+            new_capacity *= 2
+
+        self._grow_array("clip_embeddings", np.float32, (new_capacity, self._dim))
+        for name, dtype in ROW_COLUMNS.items():
+            self._grow_array(name, dtype, (new_capacity,))
+
+    def _grow_array(self, name: str, dtype: type, shape: tuple[int]) -> None:
+        """
+        Replaces the .npy file of the array 'name' with a larger one keeping its first
+        self._num_vectors rows. Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        name: str
+            name of the array in self._arrays and of its file
+        dtype: type
+            the array's dtype
+        shape: tuple[int]
+            the new shape of the array
+
+        Returns
+        -------
+        None
+        """
+        path = self._get_path(name + ".npy")
+        tmp_path = path + ".tmp"
+        grown = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=shape)
+        # the old array is unmapped before its file is replaced
+        array = self._arrays.pop(name, None)
+        if array is not None:
+            grown[: self._num_vectors] = array[: self._num_vectors]
+        grown.flush()
+        del grown, array
+        os.replace(tmp_path, path)
+        self._arrays[name] = np.lib.format.open_memmap(path, mode="r+")
+
+    def _flush(self) -> None:
+        """
+        Writes the embedding matrix and the row columns to disk, then the metadata.
+        Rows beyond the metadata's number of vectors are ignored when loading, so
+        appended rows only become part of the index once the metadata is replaced.
+        Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        for column in self._arrays.values():
+            column.flush()
+        metadata = {
+            "dim": self._dim,
+            "num_vectors": self._num_vectors,
+            "num_media_ids": len(self._media_ids),
+            "num_lists": self.num_lists,
+        }
+        metadata_path = self._get_path("clip_index.json")
+        with open(metadata_path + ".tmp", "w") as f:
+            json.dump(metadata, f)
+        os.replace(metadata_path + ".tmp", metadata_path)
+
+    def _load(self) -> None:
+        """
+        Loads the index stored in the index directory, if any.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        metadata_path = self._get_path("clip_index.json")
+        if os.path.exists(metadata_path) is False:
+            return
+
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        self._dim = metadata["dim"]
+        self._num_vectors = metadata["num_vectors"]
+        if self._dim is not None:
+            for name in ["clip_embeddings"] + list(ROW_COLUMNS):
+                self._arrays[name] = np.lib.format.open_memmap(
+                    self._get_path(name + ".npy"), mode="r+"
+                )
+
+        if metadata["num_media_ids"] > 0:
+            with open(self._get_path("media_ids.jsonl"), "r") as f:
+                lines = f.readlines()[: metadata["num_media_ids"]]
+            self._media_ids = [json.loads(line) for line in lines]
+            self._media_numbers = {
+                media_id: number for number, media_id in enumerate(self._media_ids)
+            }
+
+        # the rows of a media file are contiguous
+        if self._num_vectors > 0:
+            media_numbers = self._arrays["media_numbers"][: self._num_vectors]
+            first_rows = np.flatnonzero(np.diff(media_numbers) != 0) + 1
+            first_rows = np.concatenate([[0], first_rows]).tolist()
+            stop_rows = first_rows[1:] + [self._num_vectors]
+            for first_row, stop_row in zip(first_rows, stop_rows):
+                media_id = self._media_ids[media_numbers[first_row]]
+                self._media_rows[media_id] = (first_row, stop_row - first_row)
+
+        if metadata["num_lists"] > 0:
+            self._centroids = np.load(self._get_path("centroids.npy"))
+
+    def _get_path(self, file_name: str) -> str:
+        """
+        Returns the path of a file of the index.
+
+        Parameters
+        ----------
+        file_name: str
+            name of the file in the index directory
+
+        Returns
+        -------
+        str
+            the path of the file
+        """
+        return os.path.join(self._index_dir, file_name)
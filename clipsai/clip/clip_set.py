@@ -0,0 +1,361 @@
+"""
+A columnar collection of clips backed by NumPy arrays.
+
+Notes
+-----
+- Clip finding returns thousands of clips per media file. Storing their start times,
+end times, start characters and end characters as four arrays instead of one object
+per clip makes filtering, sorting and overlap queries single vectorized operations.
+- Clip objects are only created when the collection is iterated or indexed with an
+integer.
+"""
+# standard library imports
+from collections.abc import Iterator
+import logging
+
+# current package imports
+from .clip import Clip
+from .exceptions import ClipFinderError
+
+# 3rd party imports
+import numpy as np
+
+COLUMNS = ("start_time", "end_time", "start_char", "end_char")
+
+
+class ClipSet:
+    """
+    An immutable, ordered collection of clips stored as NumPy columns.
+
+    Attributes
+    ----------
+    start_times (np.ndarray): float64 start times of the clips in seconds.
+    end_times (np.ndarray): float64 end times of the clips in seconds.
+    start_chars (np.ndarray): int64 start characters of the clips in the transcription.
+    end_chars (np.ndarray): int64 end characters of the clips in the transcription.
+    """
+
+    __slots__ = ("_start_times", "_end_times", "_start_chars", "_end_chars")
+
+    def __init__(
+        self,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+        start_chars: np.ndarray,
+        end_chars: np.ndarray,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        start_times: np.ndarray
+            start times of the clips in seconds
+        end_times: np.ndarray
+            end times of the clips in seconds
+        start_chars: np.ndarray
+            start characters of the clips in the transcription
+        end_chars: np.ndarray
+            end characters of the clips in the transcription
+        """
+        columns = [
+            np.asarray(start_times, dtype=np.float64),
+            np.asarray(end_times, dtype=np.float64),
+            np.asarray(start_chars, dtype=np.int64),
+            np.asarray(end_chars, dtype=np.int64),
+        ]
+        for name, column in zip(COLUMNS, columns):
+            if column.ndim != 1 or len(column) != len(columns[0]):
+                err = (
+                    "Every column of a ClipSet must be 1 dimensional with the same "
+                    "length. Column '{}' has shape {} but the column 'start_time' "
+                    "has shape {}.".format(name, column.shape, columns[0].shape)
+                )
+                logging.error(err)
+                raise ClipFinderError(err)
+        # columns are shared with the caller and with the sets derived from this one,
+        # so they are read only views
+        columns = [column.view() for column in columns]
+        for column in columns:
+            column.flags.writeable = False
+        (
+            self._start_times,
+            self._end_times,
+            self._start_chars,
+            self._end_chars,
+        ) = columns
+
+    @classmethod
+    def from_dicts(cls, clips: list[dict]) -> "ClipSet":
+        """
+        Creates a ClipSet from clip dictionaries.
+
+        Parameters
+        ----------
+        clips: list[dict]
+            clips with the keys "start_time", "end_time", "start_char" and "end_char"
+
+        Returns
+        -------
+        ClipSet
+            the clips
+        """
+        return cls(*[[clip[column] for clip in clips] for column in COLUMNS])
+
+    @classmethod
+    def from_clips(cls, clips: list[Clip]) -> "ClipSet":
+        """
+        Creates a ClipSet from Clip objects.
+
+        Parameters
+        ----------
+        clips: list[Clip]
+            the clips
+
+        Returns
+        -------
+        ClipSet
+            the clips
+        """
+        return cls(
+            [clip.start_time for clip in clips],
+            [clip.end_time for clip in clips],
+            [clip.start_char for clip in clips],
+            [clip.end_char for clip in clips],
+        )
+
+    @property
+    def start_times(self) -> np.ndarray:
+        """
+        Returns the start times of the clips in seconds.
+        """
+        return self._start_times
+
+    @property
+    def end_times(self) -> np.ndarray:
+        """
+        Returns the end times of the clips in seconds.
+        """
+        return self._end_times
+
+    @property
+    def start_chars(self) -> np.ndarray:
+        """
+        Returns the start characters of the clips in the transcription.
+        """
+        return self._start_chars
+
+    @property
+    def end_chars(self) -> np.ndarray:
+        """
+        Returns the end characters of the clips in the transcription.
+        """
+        return self._end_chars
+
+    @property
+    def durations(self) -> np.ndarray:
+        """
+        Returns the durations of the clips in seconds.
+        """
+        return self._end_times - self._start_times
+
+    def __len__(self) -> int:
+        """
+        Returns the number of clips.
+        """
+        return len(self._start_times)
+
+    def __iter__(self) -> Iterator[Clip]:
+        """
+        Yields a Clip for each clip in order.
+        """
+        # tolist() converts to python floats and ints, like the clips ClipFinder
+        # creates
+        columns = [column.tolist() for column in self.columns().values()]
+        for start_time, end_time, start_char, end_char in zip(*columns):
+            yield Clip(start_time, end_time, start_char, end_char)
+
+    def __getitem__(self, key) -> "Clip | ClipSet":
+        """
+        Returns the clip at integer index 'key', or a ClipSet of the clips selected by
+        a slice, integer array or boolean mask.
+
+        Parameters
+        ----------
+        key: int or slice or np.ndarray
+            the index of a clip, or the clips to select
+
+        Returns
+        -------
+        Clip or ClipSet
+            the selected clip or clips
+        """
+        if isinstance(key, (int, np.integer)):
+            return Clip(
+                self._start_times[key].item(),
+                self._end_times[key].item(),
+                self._start_chars[key].item(),
+                self._end_chars[key].item(),
+            )
+        return self._select(key)
+
+    def __eq__(self, __other: object) -> bool:
+        """
+        Returns True if 'other' is a ClipSet with the same clips in the same order,
+        False otherwise.
+
+        Parameters
+        ----------
+        other: object
+            The value to compare the clip set to.
+        """
+        if not isinstance(__other, ClipSet):
+            return False
+        return all(
+            np.array_equal(column, other_column)
+            for column, other_column in zip(
+                self.columns().values(), __other.columns().values()
+            )
+        )
+
+    def __str__(self) -> str:
+        """
+        Returns a string representation of the clip set.
+        """
+        return "ClipSet({} clips)".format(len(self))
+
+    def filter_by_duration(
+        self, min_duration: float = None, max_duration: float = None
+    ) -> "ClipSet":
+        """
+        Returns the clips whose duration is within [min_duration, max_duration].
+
+        Parameters
+        ----------
+        min_duration: float
+            minimum clip duration in seconds. Default is None (no minimum)
+        max_duration: float
+            maximum clip duration in seconds. Default is None (no maximum)
+
+        Returns
+        -------
+        ClipSet
+            the clips within the duration range, in their original order
+        """
+        durations = self.durations
+        mask = np.ones(len(self), dtype=bool)
+        if min_duration is not None:
+            mask &= durations >= min_duration
+        if max_duration is not None:
+            mask &= durations <= max_duration
+        return self._select(mask)
+
+    def sort(self, by: str = "start_time", descending: bool = False) -> "ClipSet":
+        """
+        Returns the clips sorted by one of their columns or by duration. Clips with
+        equal values keep their order.
+
+        Parameters
+        ----------
+        by: str
+            the column to sort by.
+            Possible values: 'start_time', 'end_time', 'start_char', 'end_char',
+            'duration'
+        descending: bool
+            sorts from the largest to the smallest value if True
+
+        Returns
+        -------
+        ClipSet
+            the sorted clips
+        """
+        if by == "duration":
+            values = self.durations
+        elif by in COLUMNS:
+            values = self.columns()[by]
+        else:
+            err = "Can't sort clips by '{}'. Possible values: {}".format(
+                by, list(COLUMNS) + ["duration"]
+            )
+            logging.error(err)
+            raise ClipFinderError(err)
+
+        if descending:
+            # negating keeps equal values in their original order, unlike reversing
+            order = np.argsort(-values, kind="stable")
+        else:
+            order = np.argsort(values, kind="stable")
+        return self._select(order)
+
+    def overlapping(self, start_time: float, end_time: float) -> "ClipSet":
+        """
+        Returns the clips that overlap the time range [start_time, end_time) by a
+        positive amount of time.
+
+        Parameters
+        ----------
+        start_time: float
+            start of the time range in seconds
+        end_time: float
+            end of the time range in seconds
+
+        Returns
+        -------
+        ClipSet
+            the overlapping clips, in their original order
+        """
+        mask = (self._start_times < end_time) & (self._end_times > start_time)
+        return self._select(mask)
+
+    def columns(self) -> dict[str, np.ndarray]:
+        """
+        Returns the clips' columns without copying them, e.g. to build a DataFrame or
+        to save them with numpy.savez(). The arrays are read only.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict[str, np.ndarray]
+            maps "start_time", "end_time", "start_char" and "end_char" to their column
+        """
+        return {
+            "start_time": self._start_times,
+            "end_time": self._end_times,
+            "start_char": self._start_chars,
+            "end_char": self._end_chars,
+        }
+
+    def to_list(self) -> list[Clip]:
+        """
+        Returns the clips as a list of Clip objects.
+        """
+        return list(self)
+
+    def to_dicts(self) -> list[dict]:
+        """
+        Returns the clips as a list of dictionaries, e.g. to serialize them as JSON.
+        """
+        columns = {name: column.tolist() for name, column in self.columns().items()}
+        return [dict(zip(columns.keys(), row)) for row in zip(*columns.values())]
+
+    def _select(self, key) -> "ClipSet":
+        """
+        Returns the clips selected by a slice, integer array or boolean mask.
+
+        Parameters
+        ----------
+        key: slice or np.ndarray
+            the clips to select
+
+        Returns
+        -------
+        ClipSet
+            the selected clips. Slices share the columns of this set
+        """
+        return ClipSet(
+            self._start_times[key],
+            self._end_times[key],
+            self._start_chars[key],
+            self._end_chars[key],
+        )
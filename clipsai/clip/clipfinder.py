@@ -2,21 +2,38 @@
 Finding clips with AudioFiles using the TextTiling algorithm.
 """
 # standard library imports
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import os
+import time
 
 # current package imports
+from .agglomerative import AgglomerativeSegmenter
 from .clip import Clip
+from .clip_index import ClipIndex
+from .clip_set import ClipSet
+from .embedding_cache import EmbeddingCache
+from .embedding_reducer import EmbeddingReducer
 from .exceptions import ClipFinderError
-from .text_embedder import TextEmbedder
+from .sentence_spans import merge_sentences
+from .text_embedder import BaseTextEmbedder, TextEmbedder
 from .texttiler import TextTiler
 from .texttiler import TextTilerConfigManager
 
 # local package imports
 from clipsai.transcribe.transcription import Transcription
-from clipsai.utils.pytorch import get_compute_device, assert_compute_device_available
+from clipsai.utils.exceptions import ConfigError
+from clipsai.utils.pytorch import (
+    assert_compute_device_available,
+    get_compute_device,
+    max_magnitude_2d,
+)
+from clipsai.utils.type_checker import TypeChecker
 from clipsai.utils.utils import find_missing_dict_keys
 
 # 3rd party imports
+import numpy as np
 import torch
 
 BOUNDARY = 1
@@ -36,6 +53,17 @@ class ClipFinder:
         embedding_aggregation_pool_method: str = "max",
         smoothing_width: int = 3,
         window_compare_pool_method: str = "mean",
+        embedder: BaseTextEmbedder or str = None,
+        embedding_cache: EmbeddingCache = None,
+        embedding_batch_size: int = 32,
+        embedding_precision: str = "float32",
+        multi_scale_tiling: bool = False,
+        embedding_reduction: str = None,
+        reduced_embedding_dim: int = 256,
+        tiling_precision: str = "float32",
+        max_span_words: int = None,
+        max_span_duration: float = None,
+        segmentation_mode: str = "texttiling",
     ) -> None:
         """
         Parameters
@@ -61,6 +89,50 @@ class ClipFinder:
             the method used to pool embeddings within windows (of size k) for comparison
             to adjacent windows.
             Possible values: 'mean', 'max'
+        embedder: BaseTextEmbedder or str
+            the embedder used to embed the transcription's sentences, or the name of
+            the SentenceTransformer model to embed them with (see EMBEDDER_PRESETS for
+            short names such as 'minilm'). The embedding_* settings
+            only apply when 'embedder' isn't a BaseTextEmbedder. Default is
+            None ('all-roberta-large-v1')
+        embedding_cache: EmbeddingCache
+            on-disk cache of sentence embeddings reused across calls to find_clips().
+            Default is None (sentences are embedded on every call)
+        embedding_batch_size: int
+            number of sentences embedded per forward pass of the embedding model
+        embedding_precision: str
+            precision of the embedding model weights. 'int8' dynamically quantizes the
+            model and is only available on the cpu.
+            Possible values: 'float32', 'float16', 'bfloat16', 'int8'
+        multi_scale_tiling: bool
+            if True, the first TextTiling round of every window size is computed in a
+            single batched pass over the sentence embeddings instead of once per
+            window size. The clips found are identical.
+        embedding_reduction: str
+            projects the sentence embeddings onto 'reduced_embedding_dim' dimensions
+            before tiling, which makes tiling faster and use less memory but may move
+            some clip boundaries. 'pca' fits the projection on each transcription,
+            'random_projection' uses a fixed random projection.
+            Possible values: 'pca', 'random_projection' or None (not reduced)
+        reduced_embedding_dim: int
+            number of dimensions the sentence embeddings are reduced to
+        tiling_precision: str
+            precision the sentence embeddings are stored with while tiling.
+            Possible values: 'float32', 'float16'
+        max_span_words: int
+            if given, adjacent sentences are merged into spans of at most this many
+            words before they are embedded, so short sentences don't inflate the number
+            of embeddings. Clips start and end at span boundaries. Default is None
+            (no word budget)
+        max_span_duration: float
+            if given, adjacent sentences are merged into spans lasting at most this
+            many seconds before they are embedded. Default is None (no duration budget)
+        segmentation_mode: str
+            how the sentences are segmented into clips. 'texttiling' runs TextTiling
+            rounds for every window size. 'agglomerative' builds one tree of merges of
+            adjacent sentences and reads the clips of every duration range from it,
+            which is faster on long transcriptions.
+            Possible values: 'texttiling', 'agglomerative'
         """
         # configuration check
         config_manager = ClipFinderConfigManager()
@@ -74,16 +146,57 @@ class ClipFinder:
                 "window_compare_pool_method": window_compare_pool_method,
             }
         )
+        err = config_manager.check_valid_span_budgets(max_span_words, max_span_duration)
+        if err is not None:
+            raise ConfigError(err)
+        err = config_manager.check_valid_segmentation_mode(segmentation_mode)
+        if err is not None:
+            raise ConfigError(err)
         if device is None:
             device = get_compute_device()
         assert_compute_device_available(device)
         self._device = device
+        self._max_span_words = max_span_words
+        self._max_span_duration = max_span_duration
+        self._segmentation_mode = segmentation_mode
         self._cutoff_policy = cutoff_policy
         self._embedding_aggregation_pool_method = embedding_aggregation_pool_method
         self._min_clip_duration = min_clip_duration
         self._max_clip_duration = max_clip_duration
         self._smoothing_width = smoothing_width
         self._window_compare_pool_method = window_compare_pool_method
+        type_checker = TypeChecker()
+        type_checker.assert_type(multi_scale_tiling, "multi_scale_tiling", bool)
+        self._multi_scale_tiling = multi_scale_tiling
+        type_checker.assert_type(
+            embedder, "embedder", (BaseTextEmbedder, str, type(None))
+        )
+        if isinstance(embedder, BaseTextEmbedder) is False:
+            # the model is loaded lazily from the process-wide model registry, so
+            # creating the embedder here is cheap and every call to find_clips()
+            # reuses the model
+            embedder = TextEmbedder(
+                model_name=embedder or "all-roberta-large-v1",
+                embedding_cache=embedding_cache,
+                batch_size=embedding_batch_size,
+                precision=embedding_precision,
+            )
+        self._text_embedder = embedder
+        self._embedding_reducer = None
+        if embedding_reduction is not None or tiling_precision != "float32":
+            self._embedding_reducer = EmbeddingReducer(
+                method=embedding_reduction,
+                dim=reduced_embedding_dim,
+                precision=tiling_precision,
+                device=self._device,
+            )
+
+    @property
+    def embedder(self) -> BaseTextEmbedder:
+        """
+        The embedder used to embed the transcription's sentences.
+        """
+        return self._text_embedder
 
     def find_clips(
         self,
@@ -104,75 +217,666 @@ class ClipFinder:
         """
         # get the transcription as a list of sentences
         sentences = []
-        sentences_info = transcription.get_sentence_info()
+        sentences_info = self._get_sentences_info(transcription)
         for sentence_info in sentences_info:
             sentences.append(sentence_info["sentence"])
 
         # embed sentences
-        text_embedder = TextEmbedder()
-        sentence_embeddings = text_embedder.embed_sentences(sentences)
+        sentence_embeddings = self._embed_sentences(sentences)
 
-        # add full media as clip
+        return self._find_clips_from_embeddings(
+            transcription, sentences_info, sentence_embeddings
+        )
+
+    def find_clip_set(
+        self,
+        transcription: Transcription,
+    ) -> ClipSet:
+        """
+        Finds the clips find_clips() finds and returns them as a ClipSet, without
+        creating a Clip object per clip.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+
+        Returns
+        -------
+        ClipSet
+            the clips found in the transcription, in the order find_clips() returns
+            them
+        """
+        sentences_info = self._get_sentences_info(transcription)
+        sentences = [sentence_info["sentence"] for sentence_info in sentences_info]
+        sentence_embeddings = self._embed_sentences(sentences)
+
+        clip_infos = [
+            clip_info
+            for clip_info, _, _ in self._iter_clips_from_embeddings(
+                transcription, sentences_info, sentence_embeddings
+            )
+        ]
+        return ClipSet.from_dicts(clip_infos)
+
+    def find_clips_with_embeddings(
+        self,
+        transcription: Transcription,
+    ) -> tuple[list[Clip], torch.Tensor]:
+        """
+        Finds the clips find_clips() finds along with the pooled embedding of each
+        clip, e.g. to add them to a ClipSearchIndex. Clips without sentences, e.g. the
+        full media clip of a transcription without sentences, have nothing to embed
+        and are left out.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+
+        Returns
+        -------
+        tuple[list[Clip], torch.Tensor]
+            the clips found in the transcription and a float32 tensor of shape (M, E)
+            on the cpu where row i is the embedding of clip i. The embedding of a clip
+            is the embeddings of the sentences between its start and end characters
+            pooled with the embedding aggregation pool method, after the embedding
+            reduction if one is set
+        """
+        sentences_info = self._get_sentences_info(transcription)
+        sentences = [sentence_info["sentence"] for sentence_info in sentences_info]
+        sentence_embeddings = self._embed_sentences(sentences)
+
+        clip_infos = [
+            clip_info
+            for clip_info, _, _ in self._iter_clips_from_embeddings(
+                transcription, sentences_info, sentence_embeddings
+            )
+        ]
+        if self._embedding_reducer is not None:
+            sentence_embeddings = self._embedding_reducer.reduce(sentence_embeddings)
+
+        # TextTiling's super clip embeddings overlap their neighbours by a sentence
+        # and later rounds pool pooled embeddings, so clips are pooled again from
+        # exactly their own sentences
+        sentence_start_chars = np.array(
+            [sentence_info["start_char"] for sentence_info in sentences_info],
+            dtype=np.int64,
+        )
         clips = []
-        if transcription.end_time <= self._max_clip_duration:
-            full_media_clip = {}
-            full_media_clip["start_char"] = 0
-            full_media_clip["end_char"] = len(transcription.get_char_info())
-            full_media_clip["start_time"] = 0
-            full_media_clip["end_time"] = transcription.end_time
-            full_media_clip["norm"] = 1.0
-            clips.append(full_media_clip)
+        clip_embeddings = []
+        for clip_info in clip_infos:
+            first_sentence, stop_sentence = np.searchsorted(
+                sentence_start_chars, [clip_info["start_char"], clip_info["end_char"]]
+            ).tolist()
+            if stop_sentence <= first_sentence:
+                continue
+            clips.append(self._create_clip(clip_info))
+            clip_embeddings.append(
+                self._pool_embeddings(
+                    sentence_embeddings[first_sentence:stop_sentence]
+                ).float()
+            )
 
-        # <3 min clips
-        k_vals = [5, 7]
-        for k in k_vals:
-            clips = self._text_tile_multiple_rounds(
-                sentences_info,
-                sentence_embeddings,
-                k,
-                self._min_clip_duration,
-                self._max_clip_duration,
-                clips,
+        if len(clip_embeddings) == 0:
+            return clips, torch.empty(0, sentence_embeddings.shape[-1])
+        return clips, torch.stack(clip_embeddings).cpu()
+
+    def embed_query(self, query: str) -> torch.Tensor:
+        """
+        Embeds a search query into the space of the clip embeddings returned by
+        find_clips_with_embeddings(), to search a ClipSearchIndex with.
+
+        Parameters
+        ----------
+        query: str
+            the search query
+
+        Returns
+        -------
+        torch.Tensor
+            float32 tensor of shape (E,) on the cpu
+        """
+        if self._embedding_reducer is not None:
+            if self._embedding_reducer.method == "pca":
+                err = (
+                    "Queries can't be embedded with 'pca' embedding reduction, which "
+                    "projects each transcription onto its own dimensions. Use "
+                    "'random_projection' or no reduction to search clips."
+                )
+                logging.error(err)
+                raise ClipFinderError(err)
+            query_embedding = self._embedding_reducer.reduce(
+                self._text_embedder.embed_sentences([query])
             )
+        else:
+            query_embedding = self._text_embedder.embed_sentences([query])
+        return query_embedding[0].float().cpu()
 
-        # 3+ min clips
-        k_vals = [11, 17]
-        min_duration_secs = 180  # 3 minutes
-        for k in k_vals:
-            clips = self._text_tile_multiple_rounds(
-                sentences_info,
-                sentence_embeddings,
-                k,
-                min_duration_secs,
-                self._max_clip_duration,
-                clips,
+    def find_clips_in_range(
+        self,
+        transcription: Transcription,
+        start_time: float,
+        end_time: float,
+    ) -> list[Clip]:
+        """
+        Finds clips within a time range of an audio file's transcription using the
+        TextTiling Algorithm. Only the sentences overlapping the range are embedded and
+        tiled, so the cost depends on the length of the range rather than the length
+        of the transcription. The range itself is the longest clip, like the full media
+        clip of find_clips(). Embeddings of earlier calls are only reused through a
+        configured EmbeddingCache, or by an IncrementalClipFinder.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+        start_time: float
+            start of the range in seconds. The range starts at the sentence spoken at
+            or after 'start_time'
+        end_time: float
+            end of the range in seconds. The range ends at the sentence spoken at or
+            before 'end_time'
+
+        Returns
+        -------
+        list[Clip]
+            the clips found within the range
+        """
+        if (0 <= start_time < end_time <= transcription.end_time) is False:
+            err = (
+                "The range {} - {} seconds must be a non-empty range within the "
+                "transcription's times 0 - {} seconds"
+                "".format(start_time, end_time, transcription.end_time)
             )
+            logging.error(err)
+            raise ClipFinderError(err)
 
-        # 10+ min clips
-        k_vals = [37, 53, 73, 97]
-        min_duration_secs = 600  # 10 minutes
-        for k in k_vals:
-            clips = self._text_tile_multiple_rounds(
+        start_index = transcription.find_sentence_index(start_time, "start")
+        end_index = transcription.find_sentence_index(end_time, "end")
+        sentences_info, sentence_embeddings = self._get_range_embeddings(
+            transcription, start_index, end_index
+        )
+        if len(sentences_info) == 0:
+            return []
+
+        range_clip = {
+            "start_char": sentences_info[0]["start_char"],
+            "end_char": sentences_info[-1]["end_char"],
+            "start_time": sentences_info[0]["start_time"],
+            "end_time": sentences_info[-1]["end_time"],
+            "norm": 1.0,
+        }
+        return [
+            self._create_clip(clip_info)
+            for clip_info, _, _ in self._iter_clips_from_embeddings(
+                transcription, sentences_info, sentence_embeddings, range_clip
+            )
+        ]
+
+    def iter_clips(
+        self,
+        transcription: Transcription,
+    ) -> Iterator[tuple[Clip, int, int]]:
+        """
+        Finds clips in an audio file's transcription using the TextTiling Algorithm,
+        yielding each clip as soon as it is chosen. The clips are yielded in the order
+        find_clips() returns them, so short clips are available while the larger window
+        sizes are still being tiled.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+
+        Returns
+        -------
+        Iterator[tuple[Clip, int, int]]
+            the clip, the TextTiling window size and the round that created it. The
+            window size is None and the round is 0 for the clip spanning the full
+            media. With agglomerative segmentation the window size is None and the
+            round is the number of the clip's duration range, starting at 1
+        """
+        sentences_info = self._get_sentences_info(transcription)
+        sentences = [sentence_info["sentence"] for sentence_info in sentences_info]
+        sentence_embeddings = self._embed_sentences(sentences)
+
+        for clip_info, k, text_tile_round in self._iter_clips_from_embeddings(
+            transcription, sentences_info, sentence_embeddings
+        ):
+            yield self._create_clip(clip_info), k, text_tile_round
+
+    def find_clips_many(
+        self,
+        transcriptions: list[Transcription],
+        num_workers: int = None,
+    ) -> list[dict]:
+        """
+        Finds clips in many transcriptions. The sentences of every transcription are
+        embedded together in shared batches, then the clips of each transcription are
+        found in a pool of worker threads.
+
+        Parameters
+        ----------
+        transcriptions: list[Transcription]
+            the transcriptions of the source media to find clips within
+        num_workers: int
+            number of transcriptions whose clips are found concurrently. Default is
+            None (one worker per cpu, at most one per transcription)
+
+        Returns
+        -------
+        list[dict]
+            one dictionary per transcription, in the same order as 'transcriptions',
+            with the keys:
+            - "clips": list[Clip], the clips found in the transcription
+            - "num_sentences": int, the number of sentences in the transcription
+            - "embedding_time": float, the seconds spent embedding all sentences
+            multiplied by the transcription's share of the sentences
+            - "tiling_time": float, the seconds spent finding the transcription's
+            clips from its sentence embeddings
+        """
+        if num_workers is None:
+            num_workers = max(min(len(transcriptions), os.cpu_count() or 1), 1)
+        if isinstance(num_workers, int) is False or num_workers < 1:
+            err = "num_workers must be an integer greater than 0, not '{}'".format(
+                num_workers
+            )
+            logging.error(err)
+            raise ClipFinderError(err)
+
+        # pack the sentences of every transcription into shared embedding batches
+        sentences_infos = []
+        sentences = []
+        offsets = [0]
+        for transcription in transcriptions:
+            sentences_info = self._get_sentences_info(transcription)
+            sentences_infos.append(sentences_info)
+            sentences.extend(
+                sentence_info["sentence"] for sentence_info in sentences_info
+            )
+            offsets.append(len(sentences))
+
+        start_time = time.perf_counter()
+        sentence_embeddings = self._text_embedder.embed_sentences(sentences)
+        embedding_time = time.perf_counter() - start_time
+
+        def find_clips(i: int) -> dict:
+            start_time = time.perf_counter()
+            clips = self._find_clips_from_embeddings(
+                transcriptions[i],
+                sentences_infos[i],
+                sentence_embeddings[offsets[i] : offsets[i + 1]],
+            )
+            tiling_time = time.perf_counter() - start_time
+            num_sentences = offsets[i + 1] - offsets[i]
+            share = num_sentences / max(len(sentences), 1)
+            return {
+                "clips": clips,
+                "num_sentences": num_sentences,
+                "embedding_time": embedding_time * share,
+                "tiling_time": tiling_time,
+            }
+
+        # map() returns the results in input order
+        with ThreadPoolExecutor(max_workers=num_workers) as executor:
+            return list(executor.map(find_clips, range(len(transcriptions))))
+
+    def _find_clips_from_embeddings(
+        self,
+        transcription: Transcription,
+        sentences_info: list[dict],
+        sentence_embeddings: torch.Tensor,
+    ) -> list[Clip]:
+        """
+        Finds clips in an audio file's transcription from the embeddings of its
+        sentences using the TextTiling Algorithm.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+        sentences_info: list[dict]
+            the transcription's sentence info as returned by get_sentence_info()
+        sentence_embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+
+        Returns
+        -------
+        list[Clip]
+            the clips found in the transcription
+        """
+        clip_objects = []
+        for clip_info, _, _ in self._iter_clips_from_embeddings(
+            transcription, sentences_info, sentence_embeddings
+        ):
+            clip_objects.append(self._create_clip(clip_info))
+
+        return clip_objects
+
+    def _iter_clips_from_embeddings(
+        self,
+        transcription: Transcription,
+        sentences_info: list[dict],
+        sentence_embeddings: torch.Tensor,
+        full_clip: dict = None,
+    ) -> Iterator[tuple[dict, int, int]]:
+        """
+        Finds clips in an audio file's transcription from the embeddings of its
+        sentences using the TextTiling Algorithm, yielding each clip as soon as it is
+        chosen.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+        sentences_info: list[dict]
+            the transcription's sentence info as returned by get_sentence_info()
+        sentence_embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+        full_clip: dict
+            the clip spanning every sentence, chosen first if it isn't longer than the
+            maximum clip duration. Default is None (the full media)
+
+        Returns
+        -------
+        Iterator[tuple[dict, int, int]]
+            the clip's information, the window size and the round that created it
+        """
+        if self._embedding_reducer is not None:
+            sentence_embeddings = self._embedding_reducer.reduce(sentence_embeddings)
+
+        # add full media as clip
+        clips = ClipIndex()
+        if full_clip is None:
+            full_clip = {}
+            full_clip["start_char"] = 0
+            full_clip["end_char"] = len(transcription.get_char_info())
+            full_clip["start_time"] = 0
+            full_clip["end_time"] = transcription.end_time
+            full_clip["norm"] = 1.0
+        if full_clip["end_time"] - full_clip["start_time"] <= self._max_clip_duration:
+            clips.add([full_clip])
+            yield full_clip, None, 0
+
+        if self._segmentation_mode == "agglomerative":
+            yield from self._iter_agglomerative_clips(
+                sentences_info, sentence_embeddings, clips
+            )
+            return
+
+        first_rounds = self._tile_first_rounds(sentences_info, sentence_embeddings)
+
+        # <3 min clips with k in [5, 7], 3+ min clips with k in [11, 17] and 10+ min
+        # clips with k in [37, 53, 73, 97]
+        for k, min_duration_secs in self._get_tiling_schedule():
+            for clip_info, text_tile_round in self._iter_text_tile_rounds(
                 sentences_info,
                 sentence_embeddings,
                 k,
                 min_duration_secs,
                 self._max_clip_duration,
                 clips,
-            )
+                first_round=first_rounds.get(k),
+            ):
+                yield clip_info, k, text_tile_round
 
-        clip_objects = []
-        for clip_info in clips:
-            clip_objects.append(
-                Clip(
-                    clip_info["start_time"],
-                    clip_info["end_time"],
-                    clip_info["start_char"],
-                    clip_info["end_char"],
+    def _get_sentences_info(self, transcription: Transcription) -> list[dict]:
+        """
+        Returns the sentence info of the transcription, with adjacent sentences merged
+        into spans if a span budget is set.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media to find clips within
+
+        Returns
+        -------
+        list[dict]
+            the sentences or spans, with the keys of the sentence info returned by
+            get_sentence_info()
+        """
+        return merge_sentences(
+            transcription.get_sentence_info(),
+            self._max_span_words,
+            self._max_span_duration,
+        )
+
+    def _embed_sentences(self, sentences: list[str]) -> torch.Tensor:
+        """
+        Embeds the sentences of a transcription.
+
+        Parameters
+        ----------
+        sentences: list[str]
+            the transcription's sentences
+
+        Returns
+        -------
+        torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+        """
+        return self._text_embedder.embed_sentences(sentences)
+
+    def _get_range_embeddings(
+        self,
+        transcription: Transcription,
+        start_index: int,
+        end_index: int,
+    ) -> tuple[list[dict], torch.Tensor]:
+        """
+        Merges the sentences of a range of a transcription into spans if a span budget
+        is set, starting from the range's first sentence, and embeds them. Embeddings
+        are only reused through the embedder's EmbeddingCache, if one is set, and the
+        range doesn't replace the embeddings of the transcription.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media
+        start_index: int
+            index of the range's first sentence in the transcription
+        end_index: int
+            index of the range's last sentence in the transcription
+
+        Returns
+        -------
+        tuple[list[dict], torch.Tensor]
+            the sentences or spans of the range and a tensor of shape (N, E)
+            containing the embedding of each of them
+        """
+        sentences_info = merge_sentences(
+            transcription.get_sentence_info()[start_index : end_index + 1],
+            self._max_span_words,
+            self._max_span_duration,
+        )
+        if len(sentences_info) == 0:
+            return sentences_info, None
+
+        sentences = [sentence_info["sentence"] for sentence_info in sentences_info]
+        return sentences_info, self._text_embedder.embed_sentences(sentences)
+
+    def _pool_embeddings(self, embeddings: torch.Tensor) -> torch.Tensor:
+        """
+        Pools the embeddings of a clip's sentences into the clip's embedding with the
+        embedding aggregation pool method, like TextTiling pools super clips.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence of the
+            clip, N > 0
+
+        Returns
+        -------
+        torch.Tensor
+            tensor of shape (E,)
+        """
+        if self._embedding_aggregation_pool_method == "mean":
+            return torch.mean(embeddings, dim=0)
+        return max_magnitude_2d(embeddings, dim=0)
+
+    def _create_clip(self, clip_info: dict) -> Clip:
+        """
+        Creates a Clip from a dictionary containing information about a clip.
+
+        Parameters
+        ----------
+        clip_info: dict
+            dictionary containing information about a clip
+
+        Returns
+        -------
+        Clip
+            the clip
+        """
+        return Clip(
+            clip_info["start_time"],
+            clip_info["end_time"],
+            clip_info["start_char"],
+            clip_info["end_char"],
+        )
+
+    def _get_tiling_schedule(self) -> list[tuple[int, int]]:
+        """
+        Returns the TextTiling window sizes in the order they are run, each with the
+        minimum duration of the clips it creates.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[tuple[int, int]]
+            list of (window size, minimum clip duration in seconds)
+        """
+        schedule = []
+        # <3 min clips
+        for k in [5, 7]:
+            schedule.append((k, self._min_clip_duration))
+        # 3+ min clips
+        for k in [11, 17]:
+            schedule.append((k, 180))
+        # 10+ min clips
+        for k in [37, 53, 73, 97]:
+            schedule.append((k, 600))
+        return schedule
+
+    def _get_duration_bands(self) -> list[tuple[float, float]]:
+        """
+        Returns the duration ranges of the clips of the tiling schedule, e.g. <3 min,
+        3+ min and 10+ min clips.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[tuple[float, float]]
+            (minimum, maximum) clip duration in seconds of each range, in increasing
+            order
+        """
+        min_durations = sorted(
+            {min_secs for _, min_secs in self._get_tiling_schedule()}
+        )
+        max_durations = min_durations[1:] + [self._max_clip_duration]
+        return [
+            (min_secs, min(max_secs, self._max_clip_duration))
+            for min_secs, max_secs in zip(min_durations, max_durations)
+            if min_secs < min(max_secs, self._max_clip_duration)
+        ]
+
+    def _iter_agglomerative_clips(
+        self,
+        sentences_info: list[dict],
+        sentence_embeddings: torch.Tensor,
+        final_clips: ClipIndex,
+    ) -> Iterator[tuple[dict, int, int]]:
+        """
+        Finds clips by building the agglomerative merge tree of the sentence embeddings
+        and reading the largest segments of every duration range from it.
+
+        Parameters
+        ----------
+        sentences_info: list[dict]
+            the transcription's sentence info as returned by get_sentence_info()
+        sentence_embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+        final_clips: ClipIndex
+            index of the already chosen clips, new clips are added to it
+
+        Returns
+        -------
+        Iterator[tuple[dict, int, int]]
+            the clip's information, None (there is no window size) and the number of
+            the duration range the clip was read from, starting at 1
+        """
+        if len(sentences_info) == 0:
+            return
+
+        merge_tree = AgglomerativeSegmenter().build_merge_tree(sentence_embeddings)
+        start_times = np.array([info["start_time"] for info in sentences_info])
+        end_times = np.array([info["end_time"] for info in sentences_info])
+        duration_bands = self._get_duration_bands()
+        band_segments = merge_tree.find_band_segments(
+            start_times, end_times, duration_bands
+        )
+
+        for band, (nodes, (min_secs, max_secs)) in enumerate(
+            zip(band_segments, duration_bands)
+        ):
+            band_clips = []
+            for node in nodes:
+                first = sentences_info[merge_tree.starts[node]]
+                last = sentences_info[merge_tree.ends[node]]
+                band_clips.append(
+                    {
+                        "start_char": first["start_char"],
+                        "end_char": last["end_char"],
+                        "start_time": first["start_time"],
+                        "end_time": last["end_time"],
+                        "norm": float(merge_tree.norms[node]),
+                    }
                 )
+            new_clips = self._remove_duplicates(
+                band_clips, final_clips, min_secs, max_secs
             )
+            final_clips.add(new_clips)
+            for new_clip in new_clips:
+                yield new_clip, None, band + 1
 
-        return clip_objects
+    def _tile_first_rounds(
+        self, sentences_info: list[dict], sentence_embeddings: torch.Tensor
+    ) -> dict:
+        """
+        Computes the first TextTiling round of every window size ahead of the tiling
+        schedule. The first round of every window size tiles the sentence embeddings,
+        so with multi-scale tiling it is computed for all window sizes at once.
+
+        Parameters
+        ----------
+        sentences_info: list[dict]
+            the transcription's sentence info as returned by get_sentence_info()
+        sentence_embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+
+        Returns
+        -------
+        dict
+            maps a window size to the super clips and super clip embeddings of its
+            first round. Empty if the first rounds are computed by the schedule
+        """
+        if self._multi_scale_tiling is False or len(sentence_embeddings) <= 8:
+            return {}
+
+        k_vals = [k for k, _ in self._get_tiling_schedule()]
+        first_rounds = self._text_tile_multi_scale(
+            sentences_info, sentence_embeddings, k_vals
+        )
+        return dict(zip(k_vals, first_rounds))
 
     def _text_tile_multiple_rounds(
         self,
@@ -181,8 +885,9 @@ class ClipFinder:
         k: int,
         min_clip_duration: int,
         max_clip_duration: int,
-        final_clips: list[dict] = [],
-    ) -> tuple[list, torch.Tensor]:
+        final_clips: ClipIndex = None,
+        first_round: tuple[list[dict], torch.Tensor] = None,
+    ) -> ClipIndex:
         """
         Segments the embeddings multiple rounds using the TextTiling algorithm.
 
@@ -198,21 +903,80 @@ class ClipFinder:
             minimum clip length for a clip to be created
         max_duration_secs: int
             max clip length for a clip to be created
-        final_clips: list[dict]
-            list of dictionaries containing information about already chosen clips
+        final_clips: ClipIndex
+            index of the already chosen clips, new clips are added to it. Default is
+            None (no clips were chosen yet)
+        first_round: tuple[list[dict], torch.Tensor]
+            the super clips and super clip embeddings of the first round if they were
+            already computed. Default is None (the first round is computed here)
 
         Returns
         -------
-        list[dict]
-            list of dictionaries containing information about the chosen clips
+        ClipIndex
+            index of the chosen clips
+        """
+        if final_clips is None:
+            final_clips = ClipIndex()
+        for _ in self._iter_text_tile_rounds(
+            clips,
+            clip_embeddings,
+            k,
+            min_clip_duration,
+            max_clip_duration,
+            final_clips,
+            first_round,
+        ):
+            pass
+
+        return final_clips
+
+    def _iter_text_tile_rounds(
+        self,
+        clips: list[dict],
+        clip_embeddings: torch.tensor,
+        k: int,
+        min_clip_duration: int,
+        max_clip_duration: int,
+        final_clips: ClipIndex,
+        first_round: tuple[list[dict], torch.Tensor] = None,
+    ) -> Iterator[tuple[dict, int]]:
+        """
+        Segments the embeddings multiple rounds using the TextTiling algorithm,
+        yielding the clips chosen in each round as soon as the round is done.
+
+        Parameters
+        ----------
+        clips: list[dict]
+            list of dictionaries containing information about clips' transcript
+        clip_embeddings: torch.tensor
+            clip embeddings used to segment the clips into larger clips
+        k: int
+            text tiling window size
+        min_duration_secs: int
+            minimum clip length for a clip to be created
+        max_duration_secs: int
+            max clip length for a clip to be created
+        final_clips: ClipIndex
+            index of the already chosen clips, new clips are added to it
+        first_round: tuple[list[dict], torch.Tensor]
+            the super clips and super clip embeddings of the first round if they were
+            already computed. Default is None (the first round is computed here)
+
+        Returns
+        -------
+        Iterator[tuple[dict, int]]
+            the chosen clip's information and the round that created it
         """
-        self._text_tile_round = 0
+        text_tile_round = 0
         while len(clip_embeddings) > 8:
-            self._text_tile_round += 1
+            text_tile_round += 1
             # segment the embeddings using the TextTiling algorithm
-            super_clips, super_clip_embeddings = self._text_tile(
-                clips, clip_embeddings, k
-            )
+            if text_tile_round == 1 and first_round is not None:
+                super_clips, super_clip_embeddings = first_round
+            else:
+                super_clips, super_clip_embeddings = self._text_tile(
+                    clips, clip_embeddings, k
+                )
             # filter clips based on length
             new_clips = self._remove_duplicates(
                 super_clips,
@@ -220,12 +984,12 @@ class ClipFinder:
                 min_clip_duration,
                 max_clip_duration,
             )
-            final_clips += new_clips
+            final_clips.add(new_clips)
+            for new_clip in new_clips:
+                yield new_clip, text_tile_round
             clips = super_clips
             clip_embeddings = super_clip_embeddings
 
-        return final_clips
-
     def _text_tile(
         self,
         clips: list[dict],
@@ -273,7 +1037,112 @@ class ClipFinder:
             self._cutoff_policy,
         )
 
-        # combine clips into super clips (larger clips composed of smaller clips)
+        super_clips = self._combine_clips(clips, boundaries, super_clip_embeddings)
+        return super_clips, super_clip_embeddings
+
+    def _text_tile_multi_scale(
+        self,
+        clips: list[dict],
+        clip_embeddings: torch.tensor,
+        k_values: list[int],
+        gap_scores: torch.Tensor = None,
+    ) -> list[tuple[list, torch.Tensor]]:
+        """
+        Segments the embeddings using the TextTiling algorithm once for every window
+        size in 'k_values' in a single batched pass.
+
+        Parameters
+        ----------
+        clips: list[dict]
+            list of dictionaries containing information about clips' transcript
+        clip_embeddings: torch.tensor
+            clip embeddings used to segment the clips into larger clips
+        k_values: list[int]
+            text tiling window sizes
+        gap_scores: torch.Tensor
+            the unsmoothed gap scores of shape (K, N-1) of the corrected window sizes
+            (see _get_corrected_k_values()) if they were already computed. Default is
+            None (the gap scores are computed here)
+
+        Returns
+        -------
+        list[tuple[list, torch.Tensor]]
+            the super clips and super clip embeddings returned by _text_tile() for
+            each window size in 'k_values', in the same order
+        """
+        # check that the number of embeddings matches the number of clips
+        if len(clip_embeddings) != len(clips):
+            err = (
+                "Length of embeddings ({}) does not match length of clip ({})"
+                "".format(len(clip_embeddings), len(clips))
+            )
+            logging.error(err)
+            raise ClipFinderError(err)
+
+        k_values = self._get_corrected_k_values(k_values, len(clip_embeddings))
+
+        texttiler = TextTiler(self._device)
+        results = texttiler.text_tile_multi_scale(
+            clip_embeddings,
+            k_values,
+            self._window_compare_pool_method,
+            self._embedding_aggregation_pool_method,
+            self._smoothing_width,
+            self._cutoff_policy,
+            gap_scores,
+        )
+
+        return [
+            (
+                self._combine_clips(clips, boundaries, super_clip_embeddings),
+                super_clip_embeddings,
+            )
+            for boundaries, super_clip_embeddings in results
+        ]
+
+    def _get_corrected_k_values(self, k_values: list[int], num_clips: int) -> list[int]:
+        """
+        Returns the window sizes used to tile 'num_clips' clips. A smaller window size
+        is used if the number of clips is small.
+
+        Parameters
+        ----------
+        k_values: list[int]
+            text tiling window sizes
+        num_clips: int
+            number of clips to tile
+
+        Returns
+        -------
+        list[int]
+            the corrected window sizes
+        """
+        return [3 if k >= num_clips else k for k in k_values]
+
+    def _combine_clips(
+        self,
+        clips: list[dict],
+        boundaries: list,
+        super_clip_embeddings: torch.Tensor,
+    ) -> list[dict]:
+        """
+        Combines clips into super clips (larger clips composed of smaller clips) ending
+        at each boundary.
+
+        Parameters
+        ----------
+        clips: list[dict]
+            list of dictionaries containing information about clips' transcript
+        boundaries: list
+            list of 0's and 1's where a 1 at index i indicates a boundary after clip i
+        super_clip_embeddings: torch.Tensor
+            the pooled embedding of each super clip
+
+        Returns
+        -------
+        list[dict]
+            list of dictionaries containing information about the super clips
+        """
         num_clips = len(clips)
         super_clips = []
         clip_start_idx = 0
@@ -297,12 +1166,12 @@ class ClipFinder:
 
                 super_clip_num += 1
 
-        return super_clips, super_clip_embeddings
+        return super_clips
 
     def _remove_duplicates(
         self,
         potential_clips: dict,
-        clips_to_check_against: list[dict],
+        clips_to_check_against: ClipIndex or list[dict],
         min_duration_secs: int,
         max_duration_secs: int,
     ) -> tuple:
@@ -314,8 +1183,8 @@ class ClipFinder:
         ----------
         potential_clips: dict
             list of potential clips
-        clips_to_check_against: list[dict]
-            list of clips to check against
+        clips_to_check_against: ClipIndex or list[dict]
+            index or list of clips to check against
         min_duration_secs: int
             minimum clip length for a clip to be created
         max_duration_secs: int
@@ -326,6 +1195,8 @@ class ClipFinder:
         list[dict]
             list of potential clips with duplicates removed
         """
+        if isinstance(clips_to_check_against, ClipIndex) is False:
+            clips_to_check_against = ClipIndex(clips_to_check_against)
         filtered_clips = []
 
         # create clip objects
@@ -344,31 +1215,28 @@ class ClipFinder:
         return filtered_clips
 
     def _is_duplicate(
-        self, potential_clip: dict, clips_to_check_against: list[dict]
+        self, potential_clip: dict, clips_to_check_against: ClipIndex or list[dict]
     ) -> bool:
         """
-        Checks if 'potential_clip' is a duplicate of any clip in clips.
+        Checks if 'potential_clip' is a duplicate of any clip in clips, i.e. their
+        start time difference plus end time difference is less than 15 seconds. Only
+        the clips starting within 15 seconds of 'potential_clip' are compared.
 
         Parameters
         ----------
         potential_clip: dict
             a potential clip
-        clips_to_check_against: list[dict]
-            list of clips to check against
+        clips_to_check_against: ClipIndex or list[dict]
+            index or list of clips to check against
 
         Returns
         -------
         bool
             True if 'potential_clip' is a duplicate, False otherwise.
         """
-        for clip in clips_to_check_against:
-            start_time_diff = abs(potential_clip["start_time"] - clip["start_time"])
-            end_time_diff = abs(potential_clip["end_time"] - clip["end_time"])
-
-            if (start_time_diff + end_time_diff) < 15:
-                return True
-
-        return False
+        if isinstance(clips_to_check_against, ClipIndex) is False:
+            clips_to_check_against = ClipIndex(clips_to_check_against)
+        return clips_to_check_against.has_duplicate(potential_clip, max_distance=15)
 
 
 class ClipFinderConfigManager(TextTilerConfigManager):
@@ -467,6 +1335,84 @@ class ClipFinderConfigManager(TextTilerConfigManager):
 
         return None
 
+    def get_valid_segmentation_modes(self) -> list[str]:
+        """
+        Returns the valid segmentation modes.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[str]
+            list of segmentation modes
+        """
+        return ["texttiling", "agglomerative"]
+
+    def check_valid_segmentation_mode(self, segmentation_mode: str) -> str or None:
+        """
+        Checks the segmentation mode is valid. Returns None if the segmentation mode is
+        valid, a descriptive error message if invalid.
+
+        Parameters
+        ----------
+        segmentation_mode: str
+            how the sentences are segmented into clips
+
+        Returns
+        -------
+        str or None
+            None if the segmentation mode is valid, otherwise an error message.
+        """
+        if segmentation_mode not in self.get_valid_segmentation_modes():
+            return "segmentation_mode must be one of {} not '{}'".format(
+                self.get_valid_segmentation_modes(), segmentation_mode
+            )
+
+        return None
+
+    def check_valid_span_budgets(
+        self, max_span_words: int, max_span_duration: float
+    ) -> str or None:
+        """
+        Checks the budgets of the spans sentences are merged into are valid. Returns
+        None if the budgets are valid, a descriptive error message if invalid.
+
+        Parameters
+        ----------
+        max_span_words: int
+            maximum number of words in a span, or None
+        max_span_duration: float
+            maximum duration of a span in seconds, or None
+
+        Returns
+        -------
+        str or None
+            None if the budgets are valid, otherwise an error message.
+        """
+        if max_span_words is not None:
+            err = self._type_checker.check_type(max_span_words, "max_span_words", int)
+            if err is not None:
+                return err
+            if max_span_words < 1:
+                return "max_span_words must be 1 or greater, not {}".format(
+                    max_span_words
+                )
+
+        if max_span_duration is not None:
+            err = self._type_checker.check_type(
+                max_span_duration, "max_span_duration", (float, int)
+            )
+            if err is not None:
+                return err
+            if max_span_duration <= 0:
+                return "max_span_duration must be greater than 0, not {}".format(
+                    max_span_duration
+                )
+
+        return None
+
     def check_valid_clip_times(
         self, min_clip_duration: float, max_clip_duration: float
     ) -> str or None:
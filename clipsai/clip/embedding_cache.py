@@ -0,0 +1,727 @@
+"""
+A persistent on-disk cache of sentence embeddings.
+
+Notes
+-----
+- Each model's embeddings are stored in a memory-mapped float32 matrix with one row
+per cached sentence. The matrix starts small and doubles in size as it fills up, up to
+max_entries rows.
+- Sentences are keyed by a hash of their normalized text, so re-running ClipFinder
+on the same transcription doesn't embed any sentence twice.
+- The rows of the cached sentences are stored in a snapshot and a log that each call
+to store() appends to. The snapshot is only rewritten, atomically, by flush() or once
+the log grows longer than the snapshot. Its first line is the id of its log.
+- Processes sharing a cache directory take a file lock around reads and writes, and
+replay the entries the others appended to the log first. File locks aren't available
+on Windows, where a cache directory must only be used by one process.
+"""
+# standard library imports
+from collections import OrderedDict
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import unicodedata
+import uuid
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# current package imports
+from .exceptions import TextEmbedderError
+
+# 3rd party imports
+import numpy as np
+
+# number of rows of a new embedding matrix
+INITIAL_ROWS = 1024
+# minimum number of log entries before the log is compacted into the snapshot
+MIN_COMPACTION_ENTRIES = 4096
+
+
+def normalize_sentence(sentence: str) -> str:
+    """
+    Normalizes a sentence so that sentences differing only in unicode representation
+    or whitespace share a cache entry.
+
+    Parameters
+    ----------
+    sentence: str
+        the sentence to normalize
+
+    Returns
+    -------
+    str
+        the normalized sentence
+    """
+    sentence = unicodedata.normalize("NFKC", sentence)
+    return re.sub(r"\s+", " ", sentence).strip()
+
+
+class EmbeddingCache:
+    """
+    A size-bounded, persistent cache of sentence embeddings keyed by (model name,
+    normalized sentence hash). The least recently used embedding is evicted when a
+    model's cache is full.
+    """
+
+    def __init__(self, cache_dir: str, max_entries: int = 200000) -> None:
+        """
+        Parameters
+        ----------
+        cache_dir: str
+            absolute path of the directory the cache is stored in; created if it
+            doesn't exist
+        max_entries: int
+            maximum number of embeddings cached per model
+        """
+        if isinstance(max_entries, int) is False or max_entries < 1:
+            err = "max_entries must be an integer greater than 0, not '{}'".format(
+                max_entries
+            )
+            logging.error(err)
+            raise TextEmbedderError(err)
+
+        os.makedirs(cache_dir, exist_ok=True)
+        self._cache_dir = cache_dir
+        self._max_entries = max_entries
+        # model name -> {"dim": int, "slots": OrderedDict, "free": set, "matrix":
+        # np.memmap} plus the position of the store in its log
+        self._stores = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @property
+    def cache_dir(self) -> str:
+        """
+        The directory the cache is stored in.
+        """
+        return self._cache_dir
+
+    @property
+    def max_entries(self) -> int:
+        """
+        The maximum number of embeddings cached per model.
+        """
+        return self._max_entries
+
+    @property
+    def hits(self) -> int:
+        """
+        The number of sentences found in the cache since creation or the last call to
+        reset_stats().
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        The number of sentences not found in the cache since creation or the last call
+        to reset_stats().
+        """
+        return self._misses
+
+    def get_stats(self) -> dict:
+        """
+        Returns the hit and miss counters of the cache.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict
+            dictionary with the keys "hits", "misses" and "hit_rate"
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate": self._hits / lookups if lookups > 0 else 0.0,
+            }
+
+    def reset_stats(self) -> None:
+        """
+        Resets the hit and miss counters to zero.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._hits = 0
+            self._misses = 0
+
+    def num_entries(self, model_name: str) -> int:
+        """
+        Returns the number of embeddings cached for 'model_name'.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model the embeddings were created with
+
+        Returns
+        -------
+        int
+            the number of cached embeddings
+        """
+        with self._lock, self._file_lock(model_name, exclusive=False):
+            store = self._get_store(model_name)
+            return 0 if store is None else len(store["slots"])
+
+    def lookup(self, model_name: str, sentences: list[str]) -> tuple[dict, list[int]]:
+        """
+        Looks up the embeddings of 'sentences' created with 'model_name'.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model the embeddings were created with
+        sentences: list[str]
+            the sentences to look up
+
+        Returns
+        -------
+        tuple[dict, list[int]]
+            - dictionary mapping the index of each cached sentence to its embedding
+            - the indices of the sentences that aren't cached
+        """
+        keys = [self._hash(sentence) for sentence in sentences]
+        found_idxs = []
+        found_slots = []
+        missing = []
+        with self._lock, self._file_lock(model_name, exclusive=False):
+            store = self._get_store(model_name)
+            for i, key in enumerate(keys):
+                slot = None if store is None else store["slots"].get(key)
+                if slot is None:
+                    missing.append(i)
+                    continue
+                store["slots"].move_to_end(key)
+                found_idxs.append(i)
+                found_slots.append(slot)
+            found_embeddings = []
+            if len(found_slots) > 0:
+                found_embeddings = np.array(store["matrix"][found_slots])
+            self._hits += len(found_idxs)
+            self._misses += len(missing)
+        return dict(zip(found_idxs, found_embeddings)), missing
+
+    def store(
+        self, model_name: str, sentences: list[str], embeddings: np.ndarray
+    ) -> None:
+        """
+        Caches the embeddings of 'sentences' created with 'model_name' and appends
+        their rows to the log on disk.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model the embeddings were created with
+        sentences: list[str]
+            the embedded sentences
+        embeddings: np.ndarray
+            array of shape (N, E) where row i is the embedding of sentences[i]
+
+        Returns
+        -------
+        None
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if embeddings.ndim != 2 or len(embeddings) != len(sentences):
+            err = "embeddings must have shape ({}, E), not {}" "".format(
+                len(sentences), embeddings.shape
+            )
+            logging.error(err)
+            raise TextEmbedderError(err)
+        if len(sentences) == 0:
+            return
+
+        keys = [self._hash(sentence) for sentence in sentences]
+        with self._lock, self._file_lock(model_name, exclusive=True):
+            store = self._get_store(model_name, dim=embeddings.shape[1])
+            if store["dim"] != embeddings.shape[1]:
+                err = (
+                    "Cached embeddings of model '{}' have dimension {}, not {}"
+                    "".format(model_name, store["dim"], embeddings.shape[1])
+                )
+                logging.error(err)
+                raise TextEmbedderError(err)
+
+            slots = store["slots"]
+            evicted_keys = []
+            stored = []
+            for key in keys:
+                if key not in slots:
+                    # free the rows of the least recently used embeddings
+                    while len(slots) >= self._max_entries:
+                        evicted_key, evicted_slot = slots.popitem(last=False)
+                        store["free"].add(evicted_slot)
+                        evicted_keys.append(evicted_key)
+                    if len(store["free"]) > 0:
+                        slots[key] = store["free"].pop()
+                    else:
+                        slots[key] = store["num_rows"]
+                        store["num_rows"] += 1
+                slots.move_to_end(key)
+                stored.append((key, slots[key]))
+
+            # a batch larger than max_entries evicts some of its own sentences
+            slot_embeddings = {
+                slot: embedding
+                for (key, slot), embedding in zip(stored, embeddings)
+                if slots.get(key) == slot
+            }
+            stored = [(key, slot) for key, slot in stored if slots.get(key) == slot]
+            # evictions are logged before their rows are overwritten, so a crash
+            # never leaves a sentence pointing to another sentence's embedding
+            self._append_log(model_name, store, [(key, -1) for key in evicted_keys])
+            self._write_rows(model_name, store, slot_embeddings)
+            self._append_log(model_name, store, stored)
+            if store["num_logged"] > max(len(slots), MIN_COMPACTION_ENTRIES):
+                self._write_snapshot(model_name, store)
+
+    def flush(self) -> None:
+        """
+        Writes the cached embeddings and the recency order of every model to disk.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            for model_name in list(self._stores):
+                with self._file_lock(model_name, exclusive=True):
+                    store = self._get_store(model_name)
+                    if store is not None:
+                        self._write_snapshot(model_name, store)
+
+    def clear(self, model_name: str = None) -> None:
+        """
+        Deletes the cached embeddings of 'model_name', or of every model if
+        'model_name' is None.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model whose embeddings are deleted. Default is None (deletes
+            the embeddings of every model)
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if model_name is None:
+                self._stores.clear()
+                file_stems = {
+                    file_name.split(".")[0]
+                    for file_name in os.listdir(self._cache_dir)
+                    if file_name.startswith("embeddings-")
+                }
+            else:
+                self._stores.pop(model_name, None)
+                file_stems = {self._get_file_stem(model_name)}
+
+            for file_stem in file_stems:
+                lock_path = os.path.join(self._cache_dir, file_stem + ".lock")
+                with self._open_lock(lock_path, exclusive=True):
+                    for file_name in os.listdir(self._cache_dir):
+                        if file_name.startswith(file_stem + ".") and (
+                            file_name.endswith(".lock") is False
+                        ):
+                            os.remove(os.path.join(self._cache_dir, file_name))
+
+    def _get_store(self, model_name: str, dim: int = None) -> dict or None:
+        """
+        Returns the in-memory store of 'model_name' with the entries other processes
+        appended to the log since the last call, loading it from disk if needed.
+        Creates the store if it doesn't exist and 'dim' is given. Must be called while
+        holding self._lock and the model's file lock.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        dim: int
+            dimension of the model's embeddings
+
+        Returns
+        -------
+        dict or None
+            the model's store or None if it doesn't exist
+        """
+        store = self._stores.get(model_name)
+        if store is not None and self._sync_store(model_name, store):
+            return store
+
+        # the store is new or another process replaced the snapshot
+        self._stores.pop(model_name, None)
+        store = self._load_store(model_name, dim)
+        if store is not None:
+            self._stores[model_name] = store
+        return store
+
+    def _load_store(self, model_name: str, dim: int = None) -> dict or None:
+        """
+        Loads the store of 'model_name' from its snapshot and log. Creates the store if
+        it doesn't exist and 'dim' is given.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        dim: int
+            dimension of the model's embeddings
+
+        Returns
+        -------
+        dict or None
+            the model's store or None if it doesn't exist
+        """
+        matrix_path = self._get_path(model_name, ".f32")
+        index_path = self._get_path(model_name, ".index")
+        if os.path.exists(index_path) and os.path.exists(matrix_path):
+            with open(index_path, "r") as f:
+                log_id = f.readline().strip()
+                index = json.load(f)
+            store = {
+                "dim": index["dim"],
+                "slots": OrderedDict(index["slots"]),
+                "free": set(index["free"]),
+                "num_rows": len(index["slots"]) + len(index["free"]),
+                "matrix": None,
+                "log_id": log_id,
+                "log_offset": 0,
+                "num_logged": 0,
+            }
+            self._sync_store(model_name, store)
+            return store
+
+        if dim is None:
+            return None
+        num_rows = min(INITIAL_ROWS, self._max_entries)
+        store = {
+            "dim": dim,
+            "slots": OrderedDict(),
+            "free": set(),
+            "num_rows": 0,
+            "matrix": np.memmap(
+                matrix_path, dtype=np.float32, mode="w+", shape=(num_rows, dim)
+            ),
+            "log_id": None,
+            "log_offset": 0,
+            "num_logged": 0,
+        }
+        self._write_snapshot(model_name, store)
+        return store
+
+    def _sync_store(self, model_name: str, store: dict) -> bool:
+        """
+        Replays the log entries other processes appended since the store was last
+        synced and maps the rows the matrix grew by.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        store: dict
+            the model's store
+
+        Returns
+        -------
+        bool
+            False if the snapshot was replaced or deleted since the store was loaded,
+            in which case the store must be loaded again
+        """
+        # the first line of the snapshot is the id of its log
+        try:
+            with open(self._get_path(model_name, ".index"), "r") as f:
+                if f.readline().strip() != store["log_id"]:
+                    return False
+        except FileNotFoundError:
+            return False
+
+        log_path = self._get_path(model_name, ".{}.log".format(store["log_id"]))
+        if os.path.exists(log_path):
+            with open(log_path, "rb") as f:
+                f.seek(store["log_offset"])
+                data = f.read()
+            # a crash can leave a partially written last entry
+            data = data[: data.rfind(b"\n") + 1]
+            store["log_offset"] += len(data)
+            for line in data.decode("utf-8").splitlines():
+                entry = line.split()
+                if len(entry) == 2 and entry[1].lstrip("-").isdigit():
+                    self._replay_entry(store, entry[0], int(entry[1]))
+                    store["num_logged"] += 1
+
+        matrix_path = self._get_path(model_name, ".f32")
+        num_rows = os.path.getsize(matrix_path) // (4 * store["dim"])
+        if store["matrix"] is None or len(store["matrix"]) != num_rows:
+            store["matrix"] = np.memmap(
+                matrix_path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(num_rows, store["dim"]),
+            )
+        return True
+
+    def _replay_entry(self, store: dict, key: str, slot: int) -> None:
+        """
+        Applies a log entry to a store. A negative slot evicts the key.
+
+        Parameters
+        ----------
+        store: dict
+            the model's store
+        key: str
+            the cache key of the sentence
+        slot: int
+            the row of the sentence's embedding, or -1 if it was evicted
+
+        Returns
+        -------
+        None
+        """
+        slots = store["slots"]
+        old_slot = slots.pop(key, None)
+        if old_slot is not None and old_slot != slot:
+            store["free"].add(old_slot)
+        if slot < 0:
+            return
+        slots[key] = slot
+        store["free"].discard(slot)
+        store["num_rows"] = max(store["num_rows"], slot + 1)
+
+    def _write_rows(
+        self, model_name: str, store: dict, slot_embeddings: dict[int, np.ndarray]
+    ) -> None:
+        """
+        Writes embeddings to the rows of a store's matrix, doubling the size of the
+        matrix until it has enough rows.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        store: dict
+            the model's store
+        slot_embeddings: dict[int, np.ndarray]
+            maps a row to the embedding written to it
+
+        Returns
+        -------
+        None
+        """
+        if len(slot_embeddings) == 0:
+            return
+        matrix = store["matrix"]
+        if store["num_rows"] > len(matrix):
+            num_rows = max(min(2 * len(matrix), self._max_entries), store["num_rows"])
+            matrix.flush()
+            store["matrix"] = None
+            del matrix
+            matrix_path = self._get_path(model_name, ".f32")
+            with open(matrix_path, "r+b") as f:
+                f.truncate(num_rows * store["dim"] * 4)
+            store["matrix"] = np.memmap(
+                matrix_path,
+                dtype=np.float32,
+                mode="r+",
+                shape=(num_rows, store["dim"]),
+            )
+        store["matrix"][list(slot_embeddings)] = np.stack(
+            list(slot_embeddings.values())
+        )
+        store["matrix"].flush()
+
+    def _append_log(
+        self, model_name: str, store: dict, entries: list[tuple[str, int]]
+    ) -> None:
+        """
+        Appends entries to a store's log.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        store: dict
+            the model's store, synced with the log
+        entries: list[tuple[str, int]]
+            the cache keys and rows of the stored sentences, with a row of -1 for
+            the evicted sentences
+
+        Returns
+        -------
+        None
+        """
+        if len(entries) == 0:
+            return
+        data = "".join("{} {}\n".format(key, slot) for key, slot in entries)
+        log_path = self._get_path(model_name, ".{}.log".format(store["log_id"]))
+        with open(log_path, "ab") as f:
+            if f.seek(0, os.SEEK_END) > store["log_offset"]:
+                # terminate a partially written entry left by a crash
+                data = "\n" + data
+            f.write(data.encode("utf-8"))
+            store["log_offset"] = f.tell()
+        store["num_logged"] += len(entries)
+
+    def _write_snapshot(self, model_name: str, store: dict) -> None:
+        """
+        Writes a store's entries and recency order to a new snapshot and starts a new
+        empty log. The snapshot is written to a temporary file first so a crash never
+        leaves a partially written snapshot behind. Must be called while holding the
+        model's exclusive file lock.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        store: dict
+            the model's store, synced with the log
+
+        Returns
+        -------
+        None
+        """
+        store["matrix"].flush()
+        log_id = uuid.uuid4().hex
+        index = {
+            "model_name": model_name,
+            "dim": store["dim"],
+            "slots": list(store["slots"].items()),
+            "free": sorted(store["free"]),
+        }
+        index_path = self._get_path(model_name, ".index")
+        tmp_index_path = index_path + ".tmp"
+        with open(tmp_index_path, "w") as f:
+            f.write(log_id + "\n")
+            json.dump(index, f)
+        os.replace(tmp_index_path, index_path)
+
+        store["log_id"] = log_id
+        store["log_offset"] = 0
+        store["num_logged"] = 0
+        # also deletes the logs of snapshots replaced before a crash
+        file_stem = self._get_file_stem(model_name)
+        for file_name in os.listdir(self._cache_dir):
+            if (
+                file_name.startswith(file_stem + ".")
+                and file_name.endswith(".log")
+                and file_name != "{}.{}.log".format(file_stem, log_id)
+            ):
+                os.remove(os.path.join(self._cache_dir, file_name))
+
+    def _file_lock(self, model_name: str, exclusive: bool):
+        """
+        Returns a context manager holding the file lock of 'model_name'.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        exclusive: bool
+            whether to take the lock to write (exclusive) or to read (shared)
+
+        Returns
+        -------
+        contextlib.AbstractContextManager
+            context manager holding the lock
+        """
+        return self._open_lock(self._get_path(model_name, ".lock"), exclusive)
+
+    @contextlib.contextmanager
+    def _open_lock(self, lock_path: str, exclusive: bool):
+        """
+        Holds a file lock on 'lock_path' for the duration of the context. Only
+        locks within the process if file locks aren't available.
+
+        Parameters
+        ----------
+        lock_path: str
+            path of the lock file; created if it doesn't exist
+        exclusive: bool
+            whether to take the lock to write (exclusive) or to read (shared)
+
+        Returns
+        -------
+        Generator
+            yields once the lock is held
+        """
+        with open(lock_path, "a") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            yield
+
+    def _get_file_stem(self, model_name: str) -> str:
+        """
+        Returns the name the cache files of 'model_name' start with.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+
+        Returns
+        -------
+        str
+            the file name without extension
+        """
+        model_id = hashlib.sha256(model_name.encode("utf-8")).hexdigest()[:16]
+        return "embeddings-{}".format(model_id)
+
+    def _get_path(self, model_name: str, extension: str) -> str:
+        """
+        Returns the path of a cache file of 'model_name'.
+
+        Parameters
+        ----------
+        model_name: str
+            name of the model
+        extension: str
+            extension of the file, e.g. '.f32'
+
+        Returns
+        -------
+        str
+            the path of the file
+        """
+        return os.path.join(
+            self._cache_dir, self._get_file_stem(model_name) + extension
+        )
+
+    def _hash(self, sentence: str) -> str:
+        """
+        Returns the cache key of 'sentence'.
+
+        Parameters
+        ----------
+        sentence: str
+            the sentence
+
+        Returns
+        -------
+        str
+            hex digest of the normalized sentence
+        """
+        normalized_sentence = normalize_sentence(sentence).encode("utf-8")
+        return hashlib.sha256(normalized_sentence).hexdigest()
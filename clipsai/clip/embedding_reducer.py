@@ -0,0 +1,309 @@
+"""
+Reducing the dimension and precision of sentence embeddings before TextTiling.
+
+Notes
+-----
+- TextTiling only compares embeddings with cosine similarity, so it only needs the dot
+products between embeddings to be roughly preserved. Both reductions are linear
+projections without centering, which keep the dot products instead of the variance
+around the document's mean embedding.
+- 'pca' projects onto the top right singular vectors of the document's embeddings
+(PCA without centering) and preserves the dot products best for that document.
+'random_projection' projects onto a fixed random Gaussian matrix, which needs no
+fitting and preserves dot products in expectation (Johnson-Lindenstrauss).
+"""
+# local package imports
+from clipsai.utils.config_manager import ConfigManager
+from clipsai.utils.pytorch import get_compute_device, assert_compute_device_available
+from clipsai.utils.utils import find_missing_dict_keys
+
+# 3rd party imports
+import torch
+
+
+class EmbeddingReducer:
+    """
+    Projects sentence embeddings onto fewer dimensions and stores them with a lower
+    precision to reduce the memory and time used by TextTiling.
+    """
+
+    def __init__(
+        self,
+        method: str = None,
+        dim: int = 256,
+        precision: str = "float32",
+        device: str = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        method: str
+            the dimensionality reduction method.
+            Possible values: 'pca', 'random_projection' or None (the dimension isn't
+            reduced)
+        dim: int
+            number of dimensions the embeddings are reduced to. Embeddings with at
+            most 'dim' dimensions aren't reduced
+        precision: str
+            precision the reduced embeddings are stored with.
+            Possible values: 'float32', 'float16'
+        device: str
+            PyTorch device to reduce the embeddings on. Default is None (auto detects
+            the correct device)
+        seed: int
+            seed of the random projection matrix
+        """
+        EmbeddingReducerConfigManager().assert_valid_config(
+            {"method": method, "dim": dim, "precision": precision}
+        )
+        if device is None:
+            device = get_compute_device()
+        assert_compute_device_available(device)
+        self._method = method
+        self._dim = dim
+        self._precision = precision
+        self._device = device
+        self._seed = seed
+        # random projection matrices by embedding dimension
+        self._projections = {}
+
+    @property
+    def method(self) -> str:
+        """
+        The dimensionality reduction method.
+        """
+        return self._method
+
+    @property
+    def dim(self) -> int:
+        """
+        The number of dimensions embeddings are reduced to.
+        """
+        return self._dim
+
+    @property
+    def precision(self) -> str:
+        """
+        The precision reduced embeddings are stored with.
+        """
+        return self._precision
+
+    def reduce(self, embeddings: torch.Tensor) -> torch.Tensor:
+        """
+        Reduces the dimension and precision of 'embeddings'.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+
+        Returns
+        -------
+        torch.Tensor
+            tensor of shape (N, min(E, dim)) on the reducer's device
+        """
+        embeddings = embeddings.to(self._device)
+        if self._method is not None and embeddings.shape[1] > self._dim:
+            if self._method == "pca":
+                projection = self._fit_pca(embeddings)
+            else:
+                projection = self._get_random_projection(embeddings.shape[1])
+            embeddings = embeddings.float() @ projection
+
+        return embeddings.to(getattr(torch, self._precision))
+
+    def _fit_pca(self, embeddings: torch.Tensor) -> torch.Tensor:
+        """
+        Returns the top 'dim' right singular vectors of 'embeddings'.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+
+        Returns
+        -------
+        torch.Tensor
+            float32 tensor of shape (E, dim)
+        """
+        # the eigenvectors of the (E, E) Gram matrix are the right singular vectors of
+        # the embeddings, which is cheaper than a SVD of the (N, E) embeddings
+        dtype = torch.float64
+        if embeddings.device.type == "mps":
+            dtype = torch.float32
+        embeddings = embeddings.to(dtype)
+        gram_matrix = embeddings.T @ embeddings
+        # eigenvalues are in ascending order
+        _, eigenvectors = torch.linalg.eigh(gram_matrix)
+        return eigenvectors[:, -self._dim :].flip(1).float()
+
+    def _get_random_projection(self, embedding_dim: int) -> torch.Tensor:
+        """
+        Returns the random projection matrix for embeddings of 'embedding_dim'
+        dimensions, creating it on first use.
+
+        Parameters
+        ----------
+        embedding_dim: int
+            the number of dimensions of the embeddings
+
+        Returns
+        -------
+        torch.Tensor
+            float32 tensor of shape (embedding_dim, dim)
+        """
+        if embedding_dim not in self._projections:
+            # generated on the cpu so the matrix doesn't depend on the device
+            generator = torch.Generator().manual_seed(self._seed)
+            projection = torch.randn(embedding_dim, self._dim, generator=generator)
+            projection /= self._dim**0.5
+            self._projections[embedding_dim] = projection.to(self._device)
+        return self._projections[embedding_dim]
+
+
+class EmbeddingReducerConfigManager(ConfigManager):
+    """
+    A class for getting information about and validating EmbeddingReducer
+    configuration settings.
+    """
+
+    def __init__(self) -> None:
+        """
+        Parameters
+        ----------
+        None
+        """
+        super().__init__()
+
+    def check_valid_config(self, config: dict) -> str or None:
+        """
+        Checks that 'config' contains valid configuration settings. Returns None if
+        valid, a descriptive error message if invalid.
+
+        Parameters
+        ----------
+        config: dict
+            A dictionary containing the configuration settings for EmbeddingReducer.
+
+        Returns
+        -------
+        str or None
+            None if the inputs are valid, otherwise an error message.
+        """
+        required_keys = ["method", "dim", "precision"]
+        missing_keys = find_missing_dict_keys(config, required_keys)
+        if len(missing_keys) != 0:
+            return "EmbeddingReducer missing configuration settings: {}".format(
+                missing_keys
+            )
+
+        setting_checkers = {
+            "method": self.check_valid_method,
+            "dim": self.check_valid_dim,
+            "precision": self.check_valid_precision,
+        }
+        for setting, checker in setting_checkers.items():
+            err = checker(config[setting])
+            if err is not None:
+                return err
+
+        return None
+
+    def get_valid_methods(self) -> list[str]:
+        """
+        Returns the valid dimensionality reduction methods.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[str]
+            list of dimensionality reduction methods
+        """
+        return ["pca", "random_projection"]
+
+    def check_valid_method(self, method: str) -> str or None:
+        """
+        Checks the dimensionality reduction method is valid. Returns None if the method
+        is valid, a descriptive error message if invalid.
+
+        Parameters
+        ----------
+        method: str
+            the dimensionality reduction method
+
+        Returns
+        -------
+        str or None
+            None if the method is valid, otherwise an error message.
+        """
+        if method is not None and method not in self.get_valid_methods():
+            return "method must be one of {} or None, not '{}'".format(
+                self.get_valid_methods(), method
+            )
+
+        return None
+
+    def check_valid_dim(self, dim: int) -> str or None:
+        """
+        Checks the reduced dimension is valid. Returns None if the dimension is valid,
+        a descriptive error message if invalid.
+
+        Parameters
+        ----------
+        dim: int
+            number of dimensions the embeddings are reduced to
+
+        Returns
+        -------
+        str or None
+            None if the dimension is valid, otherwise an error message.
+        """
+        err = self._type_checker.check_type(dim, "dim", int)
+        if err is not None:
+            return err
+
+        if dim < 1:
+            return "dim must be 1 or greater, not '{}'".format(dim)
+
+        return None
+
+    def get_valid_precisions(self) -> list[str]:
+        """
+        Returns the valid precisions of the reduced embeddings.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[str]
+            list of precisions the reduced embeddings can be stored with
+        """
+        return ["float32", "float16"]
+
+    def check_valid_precision(self, precision: str) -> str or None:
+        """
+        Checks the precision is valid. Returns None if the precision is valid, a
+        descriptive error message if invalid.
+
+        Parameters
+        ----------
+        precision: str
+            precision the reduced embeddings are stored with
+
+        Returns
+        -------
+        str or None
+            None if the precision is valid, otherwise an error message.
+        """
+        if precision not in self.get_valid_precisions():
+            return "precision must be one of {} not '{}'".format(
+                self.get_valid_precisions(), precision
+            )
+
+        return None
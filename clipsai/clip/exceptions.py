@@ -9,3 +9,11 @@ class ClipFinderError(Exception):
 
 class TextTilerError(ClipFinderError):
     pass
+
+
+class TextEmbedderError(ClipFinderError):
+    pass
+
+
+class ClipSearchIndexError(ClipFinderError):
+    pass
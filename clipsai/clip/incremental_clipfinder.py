@@ -0,0 +1,264 @@
+"""
+Finding clips in a transcription that grows over time, e.g. a live recording that is
+transcribed in chunks.
+
+Notes
+-----
+- Only the sentences that weren't seen by the previous call are embedded, and only the
+first round gap scores whose windows overlap those sentences are computed again.
+- The depth scores and boundary cutoff of a round depend on every gap score, and the
+later rounds depend on the boundaries of the first, so those are computed again from
+the stored gap scores. They operate on scores or on a few pooled embeddings, not on
+every sentence embedding.
+- With an embedding reduction, the reduced embeddings of the whole transcription
+change with every call, so only the embedding is incremental.
+"""
+# standard library imports
+import bisect
+import logging
+
+# current package imports
+from .clipfinder import ClipFinder
+from .texttiler import TextTiler
+
+# local package imports
+from clipsai.transcribe.transcription import Transcription
+from clipsai.utils.pytorch import prefix_sums_2d
+
+# 3rd party imports
+import torch
+
+
+class IncrementalClipFinder(ClipFinder):
+    """
+    A ClipFinder that keeps the sentence embeddings and first round gap scores of the
+    transcription between calls to find_clips() or iter_clips(). Each call must pass
+    the whole transcription so far; sentences that changed since the previous call
+    (e.g. the last sentence of the previous chunk that was still being spoken) and
+    every sentence after them are embedded again.
+
+    The clips found are the clips ClipFinder.find_clips() finds from the same sentence
+    embeddings.
+    """
+
+    def __init__(self, *args, **kwargs) -> None:
+        """
+        Takes the same parameters as ClipFinder.
+        """
+        super().__init__(*args, **kwargs)
+        self.reset()
+
+    @property
+    def num_sentences(self) -> int:
+        """
+        The number of sentences embedded so far.
+        """
+        return len(self._sentences)
+
+    def reset(self) -> None:
+        """
+        Forgets the transcription seen so far, e.g. before starting a new recording.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self._sentences = []
+        self._sentence_embeddings = None
+        # prefix sums of the sentence embeddings, only used by 'mean' window pooling
+        self._prefix_sums = None
+        # first round gap scores of shape (K, N-1), one row per corrected window size
+        self._gap_scores = None
+        self._gap_score_k_values = None
+        self._num_scored_sentences = 0
+
+    def _embed_sentences(self, sentences: list[str]) -> torch.Tensor:
+        """
+        Embeds the sentences that weren't seen by the previous call.
+
+        Parameters
+        ----------
+        sentences: list[str]
+            every sentence of the transcription so far
+
+        Returns
+        -------
+        torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+        """
+        self._update_sentence_embeddings(sentences)
+        return self._sentence_embeddings
+
+    def _get_range_embeddings(
+        self,
+        transcription: Transcription,
+        start_index: int,
+        end_index: int,
+    ) -> tuple[list[dict], torch.Tensor]:
+        """
+        Returns the stored sentences or spans containing the sentences of a range of a
+        transcription, with their stored embeddings, if they were already embedded.
+        Otherwise merges and embeds the range like ClipFinder. The stored embeddings
+        aren't changed.
+
+        Parameters
+        ----------
+        transcription: Transcription
+            the transcription of the source media
+        start_index: int
+            index of the range's first sentence in the transcription
+        end_index: int
+            index of the range's last sentence in the transcription
+
+        Returns
+        -------
+        tuple[list[dict], torch.Tensor]
+            the sentences or spans of the range and a tensor of shape (N, E)
+            containing the embedding of each of them
+        """
+        if end_index < start_index or len(self._sentences) == 0:
+            return super()._get_range_embeddings(transcription, start_index, end_index)
+
+        # spans are merged from the start of the transcription, so the range's
+        # sentences are mapped onto the spans containing them
+        sentences_info = transcription.get_sentence_info()
+        range_start_char = sentences_info[start_index]["start_char"]
+        range_end_char = sentences_info[end_index]["end_char"]
+        spans_info = self._get_sentences_info(transcription)
+        first_span = bisect.bisect_right(
+            [span_info["end_char"] for span_info in spans_info], range_start_char
+        )
+        last_span = bisect.bisect_left(
+            [span_info["start_char"] for span_info in spans_info], range_end_char
+        )
+        range_spans_info = spans_info[first_span:last_span]
+        range_sentences = [span_info["sentence"] for span_info in range_spans_info]
+        if self._sentences[first_span:last_span] == range_sentences:
+            return (
+                range_spans_info,
+                self._sentence_embeddings[first_span:last_span],
+            )
+
+        logging.debug(
+            "Sentences {} - {} weren't embedded by the previous call, embedding the "
+            "range".format(start_index, end_index)
+        )
+        return super()._get_range_embeddings(transcription, start_index, end_index)
+
+    def _update_sentence_embeddings(self, sentences: list[str]) -> None:
+        """
+        Embeds the sentences that differ from the sentences of the previous call and
+        drops the stored data derived from the sentences that changed.
+
+        Parameters
+        ----------
+        sentences: list[str]
+            every sentence of the transcription so far
+
+        Returns
+        -------
+        None
+        """
+        num_unchanged = 0
+        max_unchanged = min(len(sentences), len(self._sentences))
+        while (
+            num_unchanged < max_unchanged
+            and sentences[num_unchanged] == self._sentences[num_unchanged]
+        ):
+            num_unchanged += 1
+
+        if num_unchanged < len(self._sentences):
+            logging.debug(
+                "{} sentences changed since the previous call"
+                "".format(len(self._sentences) - num_unchanged)
+            )
+            self._sentence_embeddings = self._sentence_embeddings[:num_unchanged]
+            if self._prefix_sums is not None:
+                self._prefix_sums = self._prefix_sums[: num_unchanged + 1]
+        self._num_scored_sentences = min(self._num_scored_sentences, num_unchanged)
+
+        new_sentences = sentences[num_unchanged:]
+        if len(new_sentences) > 0:
+            new_embeddings = self._text_embedder.embed_sentences(new_sentences)
+            if self._sentence_embeddings is None or num_unchanged == 0:
+                self._sentence_embeddings = new_embeddings
+            else:
+                self._sentence_embeddings = torch.cat(
+                    (self._sentence_embeddings, new_embeddings)
+                )
+        self._sentences = list(sentences)
+
+        if len(sentences) == 0:
+            self._sentence_embeddings = None
+            self._prefix_sums = None
+        elif self._window_compare_pool_method == "mean":
+            if num_unchanged == 0:
+                self._prefix_sums = None
+            self._prefix_sums = prefix_sums_2d(
+                self._sentence_embeddings, self._prefix_sums
+            )
+
+    def _tile_first_rounds(
+        self, sentences_info: list[dict], sentence_embeddings: torch.Tensor
+    ) -> dict:
+        """
+        Computes the first TextTiling round of every window size from the stored gap
+        scores, scoring only the gaps whose windows contain new sentences.
+
+        Parameters
+        ----------
+        sentences_info: list[dict]
+            the transcription's sentence info as returned by get_sentence_info()
+        sentence_embeddings: torch.Tensor
+            tensor of shape (N, E) containing the embedding of each sentence
+
+        Returns
+        -------
+        dict
+            maps a window size to the super clips and super clip embeddings of its
+            first round
+        """
+        if sentence_embeddings is not self._sentence_embeddings:
+            # e.g. embeddings of find_clips_many(), which don't extend the stored ones
+            return super()._tile_first_rounds(sentences_info, sentence_embeddings)
+
+        num_sentences = len(sentence_embeddings)
+        if num_sentences <= 8:
+            self._gap_scores = None
+            return {}
+
+        k_vals = [k for k, _ in self._get_tiling_schedule()]
+        corrected_k_vals = self._get_corrected_k_values(k_vals, num_sentences)
+
+        # gap i pools sentences up to i+k, so the gaps before the first changed
+        # sentence minus the largest window size keep their scores
+        first_gap = 0
+        if self._gap_scores is not None and (
+            corrected_k_vals == self._gap_score_k_values
+        ):
+            first_gap = max(self._num_scored_sentences - max(corrected_k_vals), 0)
+
+        texttiler = TextTiler(self._device)
+        new_gap_scores = texttiler.calc_multi_scale_gap_scores(
+            sentence_embeddings,
+            corrected_k_vals,
+            self._window_compare_pool_method,
+            first_gap,
+            self._prefix_sums,
+        )
+        if first_gap > 0:
+            new_gap_scores = torch.cat(
+                (self._gap_scores[:, :first_gap], new_gap_scores), dim=1
+            )
+        self._gap_scores = new_gap_scores
+        self._gap_score_k_values = corrected_k_vals
+        self._num_scored_sentences = num_sentences
+
+        first_rounds = self._text_tile_multi_scale(
+            sentences_info, sentence_embeddings, k_vals, self._gap_scores
+        )
+        return dict(zip(k_vals, first_rounds))
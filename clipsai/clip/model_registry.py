@@ -0,0 +1,364 @@
+"""
+A process-wide registry of loaded sentence embedding models.
+
+Notes
+-----
+- Loading all-roberta-large-v1 takes seconds and ~1.4 GB of memory, so models are
+loaded once per process and shared by every TextEmbedder and ClipFinder.
+"""
+# standard library imports
+from collections import OrderedDict
+from collections.abc import Callable
+import logging
+import threading
+
+# current package imports
+from .exceptions import TextEmbedderError
+
+# 3rd party imports
+import torch
+
+
+def load_sentence_transformer(
+    model_name: str,
+    device: str = None,
+    precision: str = "float32",
+    backend: str = "torch",
+):
+    """
+    Loads a SentenceTransformer model.
+
+    Parameters
+    ----------
+    model_name: str
+        name or path of the SentenceTransformer model
+    device: str
+        PyTorch device to load the model on. Default is None (SentenceTransformer auto
+        detects the device)
+    precision: str
+        precision of the model weights. 'int8' dynamically quantizes the model's
+        linear layers and is only available on the cpu.
+        Possible values: 'float32', 'float16', 'bfloat16', 'int8'
+    backend: str
+        runtime the model is executed with. 'onnx' runs the model with ONNX Runtime
+        and requires the 'onnx' extra (pip install clipsai[onnx]).
+        Possible values: 'torch', 'onnx'
+
+    Returns
+    -------
+    SentenceTransformer
+        the loaded model
+    """
+    from sentence_transformers import SentenceTransformer
+
+    if backend != "torch":
+        return SentenceTransformer(model_name, device=device, backend=backend)
+
+    model = SentenceTransformer(model_name, device=device)
+    if precision == "float16":
+        model = model.half()
+    elif precision == "bfloat16":
+        model = model.to(torch.bfloat16)
+    elif precision == "int8":
+        model = torch.ao.quantization.quantize_dynamic(
+            model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+    return model
+
+
+class ModelRegistry:
+    """
+    A thread-safe registry that lazily loads models the first time they are requested
+    and keeps at most 'max_resident_models' of them in memory, unloading the least
+    recently used model when the limit is exceeded.
+    """
+
+    def __init__(
+        self,
+        max_resident_models: int = 1,
+        loader: Callable = load_sentence_transformer,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        max_resident_models: int
+            maximum number of models kept in memory at once
+        loader: Callable
+            function taking a model name, device, precision and backend and returning
+            the loaded model
+        """
+        self._assert_valid_max_resident_models(max_resident_models)
+        self._max_resident_models = max_resident_models
+        self._loader = loader
+        # (model_name, device, precision, backend) -> model, ordered from least to
+        # most recently used
+        self._models = OrderedDict()
+        # guards self._models and self._load_locks
+        self._lock = threading.Lock()
+        # one lock per model so a model is only loaded once by concurrent callers
+        self._load_locks = {}
+
+    @property
+    def max_resident_models(self) -> int:
+        """
+        The maximum number of models kept in memory at once.
+        """
+        return self._max_resident_models
+
+    @max_resident_models.setter
+    def max_resident_models(self, max_resident_models: int) -> None:
+        """
+        Sets the maximum number of models kept in memory at once, unloading the least
+        recently used models if more than 'max_resident_models' are loaded.
+        """
+        self._assert_valid_max_resident_models(max_resident_models)
+        with self._lock:
+            self._max_resident_models = max_resident_models
+            evicted_models = self._evict_excess_models()
+        self._release(evicted_models)
+
+    @property
+    def loaded_models(self) -> list[tuple[str, str, str, str]]:
+        """
+        The (model_name, device, precision, backend) of the loaded models, ordered
+        from least to most recently used.
+        """
+        with self._lock:
+            return list(self._models.keys())
+
+    def get(
+        self,
+        model_name: str,
+        device: str = None,
+        precision: str = "float32",
+        backend: str = "torch",
+    ):
+        """
+        Returns the model named 'model_name' on 'device' with 'precision' weights,
+        loading it if it isn't already loaded.
+
+        Parameters
+        ----------
+        model_name: str
+            name or path of the model
+        device: str
+            PyTorch device the model is loaded on. Default is None (the loader auto
+            detects the device)
+        precision: str
+            precision of the model weights
+        backend: str
+            runtime the model is executed with
+
+        Returns
+        -------
+        the loaded model
+        """
+        key = (model_name, device, precision, backend)
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        with load_lock:
+            # another thread may have loaded the model while we waited
+            with self._lock:
+                if key in self._models:
+                    self._models.move_to_end(key)
+                    return self._models[key]
+
+            logging.debug(
+                "Loading model '{}' on device '{}' with precision '{}' and backend "
+                "'{}'".format(model_name, device, precision, backend)
+            )
+            model = self._loader(model_name, device, precision, backend)
+
+            with self._lock:
+                self._models[key] = model
+                evicted_models = self._evict_excess_models()
+                self._load_locks.pop(key, None)
+
+        self._release(evicted_models)
+        return model
+
+    def warmup(
+        self,
+        model_name: str,
+        device: str = None,
+        precision: str = "float32",
+        backend: str = "torch",
+    ) -> None:
+        """
+        Loads the model named 'model_name' on 'device' with 'precision' weights ahead
+        of its first use.
+
+        Parameters
+        ----------
+        model_name: str
+            name or path of the model
+        device: str
+            PyTorch device the model is loaded on. Default is None (the loader auto
+            detects the device)
+        precision: str
+            precision of the model weights
+        backend: str
+            runtime the model is executed with
+
+        Returns
+        -------
+        None
+        """
+        self.get(model_name, device, precision, backend)
+
+    def is_loaded(
+        self,
+        model_name: str,
+        device: str = None,
+        precision: str = "float32",
+        backend: str = "torch",
+    ) -> bool:
+        """
+        Returns True if the model named 'model_name' is loaded on 'device' with
+        'precision' weights, False otherwise.
+
+        Parameters
+        ----------
+        model_name: str
+            name or path of the model
+        device: str
+            PyTorch device the model is loaded on
+        precision: str
+            precision of the model weights
+        backend: str
+            runtime the model is executed with
+
+        Returns
+        -------
+        bool
+            True if the model is loaded, False otherwise
+        """
+        with self._lock:
+            return (model_name, device, precision, backend) in self._models
+
+    def unload(
+        self,
+        model_name: str = None,
+        device: str = None,
+        precision: str = "float32",
+        backend: str = "torch",
+    ) -> None:
+        """
+        Unloads the model named 'model_name' on 'device' with 'precision' weights.
+        Unloads every model if 'model_name' is None.
+
+        Parameters
+        ----------
+        model_name: str
+            name or path of the model to unload. Default is None (unloads every model)
+        device: str
+            PyTorch device the model is loaded on
+        precision: str
+            precision of the model weights
+        backend: str
+            runtime the model is executed with
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            if model_name is None:
+                unloaded_models = list(self._models.values())
+                self._models.clear()
+            else:
+                key = (model_name, device, precision, backend)
+                model = self._models.pop(key, None)
+                unloaded_models = [] if model is None else [model]
+        self._release(unloaded_models)
+
+    def _evict_excess_models(self) -> list:
+        """
+        Removes the least recently used models until at most 'max_resident_models'
+        are loaded. Must be called while holding self._lock.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list
+            the evicted models
+        """
+        evicted_models = []
+        while len(self._models) > self._max_resident_models:
+            (model_name, device, _, _), model = self._models.popitem(last=False)
+            logging.debug(
+                "Unloading model '{}' on device '{}'".format(model_name, device)
+            )
+            evicted_models.append(model)
+        return evicted_models
+
+    def _release(self, models: list) -> None:
+        """
+        Frees the memory held by unloaded models.
+
+        Parameters
+        ----------
+        models: list
+            the unloaded models
+
+        Returns
+        -------
+        None
+        """
+        if len(models) == 0:
+            return
+        models.clear()
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+    def _assert_valid_max_resident_models(self, max_resident_models: int) -> None:
+        """
+        Raises an error if 'max_resident_models' isn't a positive integer.
+
+        Parameters
+        ----------
+        max_resident_models: int
+            maximum number of models kept in memory at once
+
+        Returns
+        -------
+        None
+        """
+        if isinstance(max_resident_models, int) is False or max_resident_models < 1:
+            err = (
+                "max_resident_models must be an integer greater than 0, not '{}'"
+                "".format(max_resident_models)
+            )
+            logging.error(err)
+            raise TextEmbedderError(err)
+
+
+_model_registry = None
+_model_registry_lock = threading.Lock()
+
+
+def get_model_registry() -> ModelRegistry:
+    """
+    Returns the process-wide model registry, creating it on first use.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    -------
+    ModelRegistry
+        the process-wide model registry
+    """
+    global _model_registry
+    with _model_registry_lock:
+        if _model_registry is None:
+            _model_registry = ModelRegistry()
+        return _model_registry
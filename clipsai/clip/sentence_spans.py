@@ -0,0 +1,71 @@
+"""
+Merging adjacent sentences into spans before embedding them.
+
+Notes
+-----
+- Transcripts of conversations contain many very short sentences ("Yeah." "Right.")
+that add little topical signal but count as much as any other sentence in the cost of
+embedding and of every TextTiling round. Merging adjacent sentences into spans of a
+word or duration budget caps the number of embeddings by the transcript's length
+instead of its number of sentences.
+- A span has the same keys as the sentences it merges, so spans can be used wherever
+the sentence info returned by Transcription.get_sentence_info() is.
+"""
+
+
+def merge_sentences(
+    sentences_info: list[dict],
+    max_span_words: int = None,
+    max_span_duration: float = None,
+) -> list[dict]:
+    """
+    Greedily merges adjacent sentences into spans. A sentence is added to the current
+    span as long as the span stays within every given budget; a sentence exceeding a
+    budget on its own is a span by itself.
+
+    Parameters
+    ----------
+    sentences_info: list[dict]
+        sentence info as returned by Transcription.get_sentence_info(), with the keys
+        "sentence", "start_char", "end_char", "start_time" and "end_time"
+    max_span_words: int
+        maximum number of whitespace separated words in a span. Default is None (no
+        word budget)
+    max_span_duration: float
+        maximum duration of a span in seconds. Default is None (no duration budget)
+
+    Returns
+    -------
+    list[dict]
+        the spans, with the keys of the sentence info. A span starts at the start
+        character and time of its first sentence and ends at the end character and time
+        of its last sentence
+    """
+    if max_span_words is None and max_span_duration is None:
+        return sentences_info
+
+    spans = []
+    span = None
+    span_num_words = 0
+    for sentence_info in sentences_info:
+        num_words = len(sentence_info["sentence"].split())
+        if span is not None:
+            fits_words = (
+                max_span_words is None or span_num_words + num_words <= max_span_words
+            )
+            fits_duration = (
+                max_span_duration is None
+                or sentence_info["end_time"] - span["start_time"] <= max_span_duration
+            )
+            if fits_words and fits_duration:
+                span["sentence"] += " " + sentence_info["sentence"]
+                span["end_char"] = sentence_info["end_char"]
+                span["end_time"] = sentence_info["end_time"]
+                span_num_words += num_words
+                continue
+
+        span = dict(sentence_info)
+        span_num_words = num_words
+        spans.append(span)
+
+    return spans
@@ -1,23 +1,104 @@
 """
-Embed text using the Roberta model.
+Embed text using sentence embedding models.
+
+Notes
+-----
+- ClipFinder accepts any BaseTextEmbedder, so the model and the runtime it is executed
+with can be swapped without touching the segmentation code.
 """
+# standard library imports
+import abc
+
+# current package imports
+from .embedding_cache import EmbeddingCache
+from .model_registry import ModelRegistry, get_model_registry
+
+# local package imports
+from clipsai.utils.config_manager import ConfigManager
+from clipsai.utils.utils import find_missing_dict_keys
+
 # 3rd party imports
+import numpy as np
 import torch
-from sentence_transformers import SentenceTransformer
+
+# short names of the SentenceTransformer models known to work well with ClipFinder
+EMBEDDER_PRESETS = {
+    # default, most accurate
+    "roberta-large": "all-roberta-large-v1",
+    # ~3x faster than roberta-large
+    "mpnet-base": "all-mpnet-base-v2",
+    # small local model, ~20x faster than roberta-large
+    "minilm": "all-MiniLM-L6-v2",
+}
 
 
-class TextEmbedder:
+class BaseTextEmbedder(abc.ABC):
     """
-    A class for embedding text using the Roberta model.
+    An abstract class for embedding sentences. Subclasses implement _encode() and
+    model_name; caching embeddings on disk is handled here.
     """
 
-    def __init__(self) -> None:
+    def __init__(self, embedding_cache: EmbeddingCache = None) -> None:
+        """
+        Parameters
+        ----------
+        embedding_cache: EmbeddingCache
+            on-disk cache of sentence embeddings. Sentences found in the cache aren't
+            embedded again. Default is None (no caching)
+        """
+        self._embedding_cache = embedding_cache
+
+    @property
+    @abc.abstractmethod
+    def model_name(self) -> str:
+        """
+        The name of the model used to embed text.
+        """
+        pass
+
+    @property
+    def cache_name(self) -> str:
+        """
+        The name the embeddings are cached under. Embedders whose embeddings differ
+        must use different names.
+        """
+        return self.model_name
+
+    @property
+    def embedding_cache(self) -> EmbeddingCache or None:
+        """
+        The on-disk cache of sentence embeddings, None if caching is disabled.
+        """
+        return self._embedding_cache
+
+    def warmup(self) -> None:
+        """
+        Loads the model ahead of the first call to embed_sentences(). Does nothing
+        unless overridden.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
         """
+        pass
+
+    def unload(self) -> None:
+        """
+        Frees the memory held by the model. Does nothing unless overridden.
+
         Parameters
         ----------
         None
+
+        Returns
+        -------
+        None
         """
-        self.__model = SentenceTransformer("all-roberta-large-v1")
+        pass
 
     def embed_sentences(self, sentences: list) -> torch.Tensor:
         """
@@ -34,4 +115,361 @@ class TextEmbedder:
             a tensor of N x E where n is a sentence and e
             is an embedding for that sentence
         """
-        return torch.tensor(self.__model.encode(sentences))
+        if self._embedding_cache is None:
+            # shares memory with the array returned by the model
+            return torch.from_numpy(self._encode(sentences))
+
+        cache_name = self.cache_name
+        cached_embeddings, missing_idxs = self._embedding_cache.lookup(
+            cache_name, sentences
+        )
+        # the model is only loaded if some sentence isn't cached
+        if len(missing_idxs) > 0:
+            missing_sentences = [sentences[i] for i in missing_idxs]
+            missing_embeddings = self._encode(missing_sentences)
+            self._embedding_cache.store(
+                cache_name, missing_sentences, missing_embeddings
+            )
+            cached_embeddings.update(zip(missing_idxs, missing_embeddings))
+
+        if len(sentences) == 0:
+            return torch.empty(0)
+        embeddings = [cached_embeddings[i] for i in range(len(sentences))]
+        return torch.from_numpy(np.stack(embeddings))
+
+    @abc.abstractmethod
+    def _encode(self, sentences: list) -> np.ndarray:
+        """
+        Embeds 'sentences' with the model.
+
+        Parameters
+        ----------
+        sentences: list
+            a list of N sentences
+
+        Returns
+        -------
+        np.ndarray
+            float32 array of shape (N, E) containing the embedding of each sentence
+        """
+        pass
+
+
+class TextEmbedder(BaseTextEmbedder):
+    """
+    A class for embedding text using SentenceTransformer models.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "all-roberta-large-v1",
+        device: str = None,
+        model_registry: ModelRegistry = None,
+        embedding_cache: EmbeddingCache = None,
+        batch_size: int = 32,
+        precision: str = "float32",
+        backend: str = "torch",
+    ) -> None:
+        """
+        Parameters
+        ----------
+        model_name: str
+            name or path of the SentenceTransformer model used to embed text, or one
+            of the short names in EMBEDDER_PRESETS ('roberta-large', 'mpnet-base',
+            'minilm')
+        device: str
+            PyTorch device to embed text on. Ex: 'cpu', 'cuda'. Default is None
+            (auto detects the correct device, or 'cpu' if precision is 'int8')
+        model_registry: ModelRegistry
+            registry the model is loaded from. Default is None (the process-wide
+            registry shared by every TextEmbedder)
+        embedding_cache: EmbeddingCache
+            on-disk cache of sentence embeddings. Sentences found in the cache aren't
+            embedded again. Default is None (no caching)
+        batch_size: int
+            number of sentences embedded per forward pass of the model
+        precision: str
+            precision of the model weights. 'float16' and 'bfloat16' halve the memory
+            used by the model, 'int8' dynamically quantizes the model's linear layers
+            for faster inference on the cpu.
+            Possible values: 'float32', 'float16', 'bfloat16', 'int8'
+        backend: str
+            runtime the model is executed with. 'onnx' exports the model to ONNX and
+            runs it with ONNX Runtime, which requires the 'onnx' extra
+            (pip install clipsai[onnx]) and float32 precision.
+            Possible values: 'torch', 'onnx'
+        """
+        super().__init__(embedding_cache)
+        config_manager = TextEmbedderConfigManager()
+        config_manager.assert_valid_config(
+            {
+                "backend": backend,
+                "batch_size": batch_size,
+                "device": device,
+                "precision": precision,
+            }
+        )
+        if device is None and precision == "int8":
+            device = "cpu"
+        if model_registry is None:
+            model_registry = get_model_registry()
+
+        self._model_name = EMBEDDER_PRESETS.get(model_name, model_name)
+        self._device = device
+        self._model_registry = model_registry
+        self._batch_size = batch_size
+        self._precision = precision
+        self._backend = backend
+
+    @property
+    def model_name(self) -> str:
+        """
+        The name of the model used to embed text.
+        """
+        return self._model_name
+
+    @property
+    def precision(self) -> str:
+        """
+        The precision of the model weights.
+        """
+        return self._precision
+
+    @property
+    def backend(self) -> str:
+        """
+        The runtime the model is executed with.
+        """
+        return self._backend
+
+    @property
+    def cache_name(self) -> str:
+        """
+        The name the embeddings are cached under. Reduced precision and ONNX
+        embeddings are cached separately from float32 PyTorch ones.
+        """
+        cache_name = self._model_name
+        if self._precision != "float32":
+            cache_name = "{}:{}".format(cache_name, self._precision)
+        if self._backend != "torch":
+            cache_name = "{}:{}".format(cache_name, self._backend)
+        return cache_name
+
+    def warmup(self) -> None:
+        """
+        Loads the model ahead of the first call to embed_sentences().
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self._model_registry.warmup(
+            self._model_name, self._device, self._precision, self._backend
+        )
+
+    def unload(self) -> None:
+        """
+        Unloads the model from the model registry. It is reloaded on the next call to
+        embed_sentences().
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        None
+        """
+        self._model_registry.unload(
+            self._model_name, self._device, self._precision, self._backend
+        )
+
+    def _encode(self, sentences: list) -> np.ndarray:
+        """
+        Embeds 'sentences' with the model.
+
+        Parameters
+        ----------
+        sentences: list
+            a list of N sentences
+
+        Returns
+        -------
+        np.ndarray
+            float32 array of shape (N, E) containing the embedding of each sentence
+        """
+        model = self._model_registry.get(
+            self._model_name, self._device, self._precision, self._backend
+        )
+        # encode() batches sentences of similar length together itself
+        embeddings = model.encode(sentences, batch_size=self._batch_size)
+        return np.asarray(embeddings, dtype=np.float32)
+
+
+class TextEmbedderConfigManager(ConfigManager):
+    """
+    A class for getting information about and validating TextEmbedder configuration
+    settings.
+    """
+
+    def __init__(self) -> None:
+        """
+        Parameters
+        ----------
+        None
+        """
+        super().__init__()
+
+    def check_valid_config(self, config: dict) -> str or None:
+        """
+        Checks that 'config' contains valid configuration settings. Returns None if
+        valid, a descriptive error message if invalid.
+
+        Parameters
+        ----------
+        config: dict
+            A dictionary containing the configuration settings for TextEmbedder.
+
+        Returns
+        -------
+        str or None
+            None if the inputs are valid, otherwise an error message.
+        """
+        required_keys = [
+            "backend",
+            "batch_size",
+            "device",
+            "precision",
+        ]
+        missing_keys = find_missing_dict_keys(config, required_keys)
+        if len(missing_keys) != 0:
+            return "TextEmbedder missing configuration settings: {}".format(
+                missing_keys
+            )
+
+        err = self.check_valid_batch_size(config["batch_size"])
+        if err is not None:
+            return err
+
+        err = self.check_valid_precision(config["precision"])
+        if err is not None:
+            return err
+
+        if config["precision"] == "int8" and config["device"] not in [None, "cpu"]:
+            return (
+                "precision 'int8' is only available on device 'cpu', not '{}'"
+                "".format(config["device"])
+            )
+
+        err = self.check_valid_backend(config["backend"])
+        if err is not None:
+            return err
+
+        if config["backend"] != "torch" and config["precision"] != "float32":
+            return "backend '{}' only supports precision 'float32', not '{}'" "".format(
+                config["backend"], config["precision"]
+            )
+
+        return None
+
+    def check_valid_batch_size(self, batch_size: int) -> str or None:
+        """
+        Checks the batch size is valid. Returns None if the batch size is valid, a
+        descriptive error message if invalid.
+
+        Parameters
+        ----------
+        batch_size: int
+            number of sentences embedded per forward pass of the model
+
+        Returns
+        -------
+        str or None
+            None if the batch size is valid, otherwise an error message.
+        """
+        err = self._type_checker.check_type(batch_size, "batch_size", int)
+        if err is not None:
+            return err
+
+        if batch_size < 1:
+            return "batch_size must be 1 or greater, not '{}'".format(batch_size)
+
+        return None
+
+    def get_valid_precisions(self) -> list[str]:
+        """
+        Returns the valid precisions of the model weights.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[str]
+            list of precisions the model can be loaded with
+        """
+        return ["float32", "float16", "bfloat16", "int8"]
+
+    def check_valid_precision(self, precision: str) -> str or None:
+        """
+        Checks the precision is valid. Returns None if the precision is valid, a
+        descriptive error message if invalid.
+
+        Parameters
+        ----------
+        precision: str
+            precision of the model weights
+
+        Returns
+        -------
+        str or None
+            None if the precision is valid, otherwise an error message.
+        """
+        if precision not in self.get_valid_precisions():
+            return "precision must be one of {} not '{}'".format(
+                self.get_valid_precisions(), precision
+            )
+
+        return None
+
+    def get_valid_backends(self) -> list[str]:
+        """
+        Returns the valid runtimes the model can be executed with.
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        list[str]
+            list of runtimes the model can be executed with
+        """
+        return ["torch", "onnx"]
+
+    def check_valid_backend(self, backend: str) -> str or None:
+        """
+        Checks the backend is valid. Returns None if the backend is valid, a
+        descriptive error message if invalid.
+
+        Parameters
+        ----------
+        backend: str
+            runtime the model is executed with
+
+        Returns
+        -------
+        str or None
+            None if the backend is valid, otherwise an error message.
+        """
+        if backend not in self.get_valid_backends():
+            return "backend must be one of {} not '{}'".format(
+                self.get_valid_backends(), backend
+            )
+
+        return None
@@ -20,6 +20,10 @@ from clipsai.filesys.manager import FileSystemManager
 from clipsai.utils.config_manager import ConfigManager
 from clipsai.utils.pytorch import (
     max_magnitude_2d,
+    prefix_sums_2d,
+    segment_max_magnitude_2d,
+    segment_mean_2d,
+    sliding_window_max_magnitude_2d,
     get_compute_device,
     assert_compute_device_available,
 )
@@ -146,6 +150,105 @@ class TextTiler:
 
         return list(boundaries), pooled_embeddings
 
+    def text_tile_multi_scale(
+        self,
+        embeddings: torch.Tensor,
+        k_values: list[int],
+        window_compare_pool_method: str = "mean",
+        embedding_aggregation_pool_method: str = "max",
+        smoothing_width: int = 3,
+        cutoff_policy: str = "high",
+        gap_scores: torch.Tensor = None,
+    ) -> list[tuple[list, torch.Tensor]]:
+        """
+        Groups embeddings together using the TextTiling algorithm once for every window
+        size in 'k_values'. The gap, depth and boundary scores of every window size are
+        computed together in tensors with a leading dimension of len(k_values), and the
+        result for each window size is identical to calling text_tile() with it.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            tensor of (N, E) where N is the number of embeddings and E is
+            the dimension of each embedding
+        k_values: list[int]
+            the window sizes for Text Tiling algorithm
+        window_compare_pool_method: str
+            the method used to pool embeddings within windows (of size k) for comparison
+            to adjacent windows.
+            Possible values: 'mean', 'max'
+        embedding_aggregation_pool_method: str
+            the method used to pool embeddings within a segment to create a single
+            embedding for the segment.
+            Possible values: 'mean', 'max'
+        smoothing_width: int
+            The width of the window used by the smoothing method
+        cutoff_policy: str
+            The policy used to determine how dissimilar adjacent embedding windows must
+            be to consider them to be from different segments (a boundary).
+            Possible values: 'average', 'high', or 'low'
+        gap_scores: torch.Tensor
+            the unsmoothed gap scores of shape (K, N-1) returned by
+            calc_multi_scale_gap_scores() for the corrected window sizes, if they were
+            already computed. Default is None (the gap scores are computed here)
+
+        Returns
+        -------
+        list[tuple[list, torch.Tensor]]
+            the boundaries and pooled embeddings returned by text_tile() for each
+            window size in 'k_values', in the same order
+        """
+        for k in k_values:
+            self._config_checker.assert_valid_config(
+                {
+                    "k": k,
+                    "window_compare_pool_method": window_compare_pool_method,
+                    "embedding_aggregation_pool_method": (
+                        embedding_aggregation_pool_method
+                    ),
+                    "smoothing_width": smoothing_width,
+                    "cutoff_policy": cutoff_policy,
+                }
+            )
+
+        N, E = embeddings.shape
+        # Correct Fixable Inputs
+        # k values must be less than the number of embeddings
+        corrected_k_values = []
+        for k in k_values:
+            if k >= N:
+                new_k = max(N // 5, 2)
+                logging.warn(
+                    "{} is not enough embeddings to have gaps for comparison using a k "
+                    "value of {}. A new  value of {} will be used instead."
+                    "".format(N, k, new_k)
+                )
+                k = new_k
+            corrected_k_values.append(k)
+        # smoothing width must be less than the number of embeddings
+        if smoothing_width >= N:
+            smoothing_width = 2  # won't smooth when smoothing_width < 3
+
+        # Textiling Algorithm, one row per k value
+        unsmoothed_gap_scores = gap_scores
+        if unsmoothed_gap_scores is None:
+            unsmoothed_gap_scores = self.calc_multi_scale_gap_scores(
+                embeddings, corrected_k_values, window_compare_pool_method
+            )
+        gap_scores = self._smooth_scores(unsmoothed_gap_scores, smoothing_width)
+        depth_scores = self._calc_depth_scores(gap_scores)
+        boundaries = self._identify_boundaries(depth_scores, cutoff_policy)
+
+        # pool embeddings within each group
+        results = []
+        for k_boundaries in boundaries:
+            pooled_embeddings = self._pool_embedding_groups(
+                embeddings, k_boundaries, embedding_aggregation_pool_method
+            )
+            results.append((list(k_boundaries), pooled_embeddings))
+
+        return results
+
     def _calc_gap_scores(
         self,
         embeddings: torch.Tensor,
@@ -156,7 +259,200 @@ class TextTiler:
         Computes the gap scores between embeddings.
 
         The gap score is the cosine similarity between the pooled embeddings of the
-        left and right windows.
+        left and right windows. Every gap is scored at once rather than one at a time.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            contains embeddings of shape (N, E)
+            N = number of embeddings
+            E = dimension of each embedding
+        k: int
+            the block size used for Text Tiling Algorithm
+        pool_method: str
+            the method used to pool the embeddings within each window
+
+        Returns
+        -------
+        gap_scores: torch.Tensor
+            Contains gap scores between each embedding of shape (N-1)
+        """
+        pooled_left_windows, pooled_right_windows = self._pool_gap_windows(
+            embeddings.to(self._device), k, pool_method
+        )
+        return F.cosine_similarity(pooled_left_windows, pooled_right_windows, dim=1)
+
+    def calc_multi_scale_gap_scores(
+        self,
+        embeddings: torch.Tensor,
+        k_values: list[int],
+        pool_method: str,
+        first_gap: int = 0,
+        prefix_sums: torch.Tensor = None,
+    ) -> torch.Tensor:
+        """
+        Computes the gap scores between embeddings for every window size in
+        'k_values' at once.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            contains embeddings of shape (N, E)
+            N = number of embeddings
+            E = dimension of each embedding
+        k_values: list[int]
+            the block sizes used for Text Tiling Algorithm
+        pool_method: str
+            the method used to pool the embeddings within each window
+        first_gap: int
+            index of the first gap to score. Default is 0 (every gap is scored)
+        prefix_sums: torch.Tensor
+            the prefix sums of 'embeddings' returned by prefix_sums_2d(), reused by
+            'mean' pooling. Default is None (computed when needed)
+
+        Returns
+        -------
+        gap_scores: torch.Tensor
+            Contains gap scores between each embedding of shape (K, N-1-first_gap)
+            where row i holds the gap scores of k_values[i]
+        """
+        if prefix_sums is not None:
+            prefix_sums = prefix_sums.to(self._device)
+        pooled_left_windows, pooled_right_windows = self._pool_multi_scale_gap_windows(
+            embeddings.to(self._device), k_values, pool_method, first_gap, prefix_sums
+        )
+        return F.cosine_similarity(pooled_left_windows, pooled_right_windows, dim=-1)
+
+    def _pool_gap_windows(
+        self,
+        embeddings: torch.Tensor,
+        k: int,
+        pool_method: str,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Pools the left and right windows of every gap between embeddings. The left
+        window of gap i holds embeddings max(0, i-k+1) to i and the right window holds
+        embeddings i+1 to min(i+k, N-1).
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            contains embeddings of shape (N, E)
+        k: int
+            the block size used for Text Tiling Algorithm
+        pool_method: str
+            the method used to pool the embeddings within each window
+
+        Returns
+        -------
+        tuple[torch.Tensor, torch.Tensor]
+            the pooled left windows and pooled right windows, each of shape (N-1, E)
+        """
+        pooled_left_windows, pooled_right_windows = self._pool_multi_scale_gap_windows(
+            embeddings, [k], pool_method
+        )
+        return pooled_left_windows[0], pooled_right_windows[0]
+
+    def _pool_multi_scale_gap_windows(
+        self,
+        embeddings: torch.Tensor,
+        k_values: list[int],
+        pool_method: str,
+        first_gap: int = 0,
+        prefix_sums: torch.Tensor = None,
+    ) -> tuple[torch.Tensor, torch.Tensor]:
+        """
+        Pools the left and right windows of every gap between embeddings for every
+        window size in 'k_values'.
+
+        'mean' pooling takes differences of prefix sums, which are shared by every
+        window size. 'max' pooling reduces over sliding windows of the embeddings
+        padded with k-1 zero rows, since a zero row never changes the max magnitude of
+        a column.
+
+        Parameters
+        ----------
+        embeddings: torch.Tensor
+            contains embeddings of shape (N, E)
+        k_values: list[int]
+            the block sizes used for Text Tiling Algorithm
+        pool_method: str
+            the method used to pool the embeddings within each window
+        first_gap: int
+            index of the first gap to pool the windows of. Default is 0 (every gap)
+        prefix_sums: torch.Tensor
+            the prefix sums of 'embeddings' returned by prefix_sums_2d(), reused by
+            'mean' pooling. Default is None (computed when needed)
+
+        Returns
+        -------
+        tuple[torch.Tensor, torch.Tensor]
+            the pooled left windows and pooled right windows, each of shape
+            (K, N-1-first_gap, E) where K is the number of window sizes
+        """
+        # validates the pooling method
+        self._get_pool_method(pool_method)
+
+        N, E = embeddings.shape
+        K = len(k_values)
+        if N - 1 - first_gap < 1:
+            # there are no gaps to pool windows for
+            empty = embeddings.new_zeros((K, 0, E))
+            return empty, empty
+
+        if pool_method == "mean":
+            # accumulate in double precision so long documents don't lose precision
+            if prefix_sums is None:
+                prefix_sums = prefix_sums_2d(embeddings)
+
+            ks = torch.tensor(k_values, device=embeddings.device).unsqueeze(1)
+            gaps = torch.arange(first_gap, N - 1, device=embeddings.device)
+            gaps = gaps.unsqueeze(0)
+            left_window_starts = torch.clamp(gaps - ks + 1, min=0)
+            left_window_ends = right_window_starts = (gaps + 1).expand(K, -1)
+            right_window_ends = torch.clamp(gaps + 1 + ks, max=N)
+
+            left_sums = prefix_sums[left_window_ends] - prefix_sums[left_window_starts]
+            left_sizes = left_window_ends - left_window_starts
+            right_sums = (
+                prefix_sums[right_window_ends] - prefix_sums[right_window_starts]
+            )
+            right_sizes = right_window_ends - right_window_starts
+
+            pooled_left_windows = left_sums / left_sizes.unsqueeze(-1)
+            pooled_right_windows = right_sums / right_sizes.unsqueeze(-1)
+            return (
+                pooled_left_windows.to(embeddings.dtype),
+                pooled_right_windows.to(embeddings.dtype),
+            )
+
+        pooled_left_windows = embeddings.new_empty((K, N - 1 - first_gap, E))
+        pooled_right_windows = embeddings.new_empty((K, N - 1 - first_gap, E))
+        for i, k in enumerate(k_values):
+            # the window of gap g starts at row g of the padded embeddings
+            left_padding = embeddings.new_zeros((max(k - 1 - first_gap, 0), E))
+            left_embeddings = embeddings[max(first_gap - k + 1, 0) : -1]
+            pooled_left_windows[i] = sliding_window_max_magnitude_2d(
+                torch.cat((left_padding, left_embeddings), dim=0), k
+            )
+            right_padding = embeddings.new_zeros((k - 1, E))
+            pooled_right_windows[i] = sliding_window_max_magnitude_2d(
+                torch.cat((embeddings[first_gap + 1 :], right_padding), dim=0), k
+            )
+        return pooled_left_windows, pooled_right_windows
+
+    def _calc_gap_scores_reference(
+        self,
+        embeddings: torch.Tensor,
+        k: int,
+        pool_method: str,
+    ) -> torch.Tensor:
+        """
+        Computes the gap scores between embeddings one gap at a time.
+
+        This is the original, unbatched implementation of _calc_gap_scores(). It pools
+        the left and right windows of every gap from scratch and is kept as a reference
+        to check the batched implementation against.
 
         Parameters
         ----------
@@ -208,12 +504,14 @@ class TextTiler:
         smoothing_width: int,
     ) -> torch.Tensor:
         """
-        Smooths 'scores' using the smooth function from the SciPy Cookbook
+        Smooths 'scores' with a moving average on the scores' device. The result is
+        the result of the smooth function from the SciPy Cookbook.
 
         Parameters
         ----------
         gap_scores: torch.Tensor
-            similarity scores computed between each sentence embedding
+            similarity scores computed between each sentence embedding. Leading
+            dimensions are batch dimensions, each row is smoothed separately
         smoothing_width: int
             the width of the window used by the smoothing method
 
@@ -222,15 +520,8 @@ class TextTiler:
         torch.Tensor
             smoothed gap scores
         """
-        gap_scores_np_array = scores.cpu().detach().numpy()
-        return torch.Tensor(
-            list(
-                smooth(
-                    x=numpy.array(gap_scores_np_array[:]),
-                    window_len=smoothing_width,
-                    window="flat",
-                )
-            )
+        return smooth_tensor(
+            scores.to(self._device), window_len=smoothing_width, window="flat"
         )
 
     def _calc_depth_scores(self, gap_scores: torch.Tensor) -> torch.Tensor:
@@ -248,35 +539,44 @@ class TextTiler:
         depth_scores: torch.Tensor
             depth scores computed for each similarity score
         """
-        depth_scores = torch.zeros(len(gap_scores)).to(self._device)
-        num_gaps = len(gap_scores)
-
-        for gap in range(num_gaps):
-            gap_score = gap_scores[gap]
-            # find left peak by iterating backward through gap scores
-            left_peak = gap_score
-            for i in range(gap, -1, -1):
-                # move left until the gap score no longer increases
-                if gap_scores[i] >= left_peak:
-                    left_peak = gap_scores[i]
-                else:
-                    break
-
-            # find right peak by iterating forward through gap scores
-            right_peak = gap_score
-            for i in range(gap, len(gap_scores), 1):
-                # move right until the gap score no longer increases
-                if gap_scores[i] >= right_peak:
-                    right_peak = gap_scores[i]
-                else:
-                    break
-
-            # calculate depth score
-            depth_score = (left_peak - gap_score) + (right_peak - gap_score)
-            depth_scores[gap] = depth_score
+        gap_scores = gap_scores.to(self._device)
+        left_peaks = self._find_left_peaks(gap_scores)
+        # the right peaks are the left peaks of the reversed scores
+        right_peaks = self._find_left_peaks(gap_scores.flip(-1)).flip(-1)
 
+        depth_scores = (left_peaks - gap_scores) + (right_peaks - gap_scores)
         return depth_scores
 
+    def _find_left_peaks(self, scores: torch.Tensor) -> torch.Tensor:
+        """
+        Finds the left peak of every score, i.e. the last score reached when moving
+        left from it for as long as the scores don't decrease.
+
+        The left peak of a score is the nearest score at or before it whose left
+        neighbor is lower (or the first score). A single running max over the indices
+        of those scores finds the left peak of every score at once.
+
+        Parameters
+        ----------
+        scores: torch.Tensor
+            scores to find the left peaks of along the last dimension
+
+        Returns
+        -------
+        torch.Tensor
+            the left peak of each score, the same shape as 'scores'
+        """
+        num_scores = scores.shape[-1]
+        if num_scores == 0:
+            return scores.clone()
+
+        score_idxs = torch.arange(num_scores, device=scores.device)
+        is_peak = torch.ones_like(scores, dtype=torch.bool)
+        is_peak[..., 1:] = scores[..., :-1] < scores[..., 1:]
+        peak_idxs = torch.where(is_peak, score_idxs, torch.zeros_like(score_idxs))
+        peak_idxs = torch.cummax(peak_idxs, dim=-1).values
+        return torch.gather(scores, -1, peak_idxs)
+
     def _identify_boundaries(
         self,
         depth_scores: torch.Tensor,
@@ -289,22 +589,22 @@ class TextTiler:
         Parameters
         ----------
         depth_scores: torch.Tensor
-            vector of depth scores computed between each word embedding
+            vector of depth scores computed between each word embedding. Leading
+            dimensions are batch dimensions, each row has its own cutoff score
         cutoff_policy: str
             the policy used to determine the depth score needed to consider a gap a
             boundary
 
         Returns
         -------
-        list
-            N length list of 0's and 1's where a 1 at index i indicates a boundary
-            after embedding i. The last element in the list is always a 1.
+        torch.Tensor
+            N length vector of 0's and 1's where a 1 at index i indicates a boundary
+            after embedding i. The last element is always a 1.
         """
-        N = len(depth_scores) + 1
-        boundaries = torch.empty((N)).to(self._device)
+        depth_scores = depth_scores.to(self._device)
 
-        avg = torch.mean(depth_scores)
-        stdev = torch.std(depth_scores, unbiased=False)
+        avg = torch.mean(depth_scores, dim=-1, keepdim=True)
+        stdev = torch.std(depth_scores, dim=-1, unbiased=False, keepdim=True)
 
         # set the cutoff policy
         if cutoff_policy == "average":
@@ -321,51 +621,48 @@ class TextTiler:
             logging.error(err)
             raise TextTilerError(err)
 
-        # determine boundaries
-        for i in range(len(depth_scores)):
-            is_boundary = True
-            # depth score must exceed cutoff
-            if depth_scores[i] <= cutoff:
-                is_boundary = False
-            # depth score must exceed depth score of both neighbors
-            left_neighbor = depth_scores[max(0, i - 1)]
-            right_neighbor = depth_scores[min(i + 1, len(depth_scores) - 1)]
-            if depth_scores[i] < left_neighbor:
-                is_boundary = False
-            if depth_scores[i] < right_neighbor:
-                is_boundary = False
-            if depth_scores[i] == left_neighbor and depth_scores[i] == right_neighbor:
-                is_boundary = False
-
-            # mark boundary
-            if is_boundary is True:
-                boundaries[i] = 1
-            else:
-                boundaries[i] = 0
+        # compare every depth score to its neighbors (edges are their own neighbor)
+        left_neighbors = torch.cat((depth_scores[..., :1], depth_scores[..., :-1]), -1)
+        right_neighbors = torch.cat((depth_scores[..., 1:], depth_scores[..., -1:]), -1)
+        # depth score must exceed cutoff and the depth score of both neighbors
+        is_boundary = depth_scores > cutoff
+        is_boundary &= depth_scores >= left_neighbors
+        is_boundary &= depth_scores >= right_neighbors
+        is_boundary &= ~(
+            (depth_scores == left_neighbors) & (depth_scores == right_neighbors)
+        )
 
         # last embedding is always a boundary
-        boundaries[N - 1] = BOUNDARY
+        last_boundary = torch.full(
+            depth_scores.shape[:-1] + (1,),
+            BOUNDARY,
+            dtype=depth_scores.dtype,
+            device=depth_scores.device,
+        )
+        boundaries = torch.cat((is_boundary.to(depth_scores.dtype), last_boundary), -1)
 
         return boundaries
 
     def _pool_embedding_groups(
         self,
         embeddings: torch.Tensor,
-        boundaries: list,
+        boundaries: list or torch.Tensor,
         pool_method: str,
     ) -> torch.Tensor:
         """
         Combines 'embeddings' within the same group, as determined by the boundaries in
-        'boundaries, by pooling the embeddings using the 'pool_method'.
+        'boundaries, by pooling the embeddings using the 'pool_method'. The boundaries
+        are turned into a group index for each embedding and every group is pooled in
+        a single segment reduction.
 
         Parameters
         ----------
         embeddings: torch.Tensor
             tensor of shape (N, E) where N is the number of embeddings and E is
             the dimension of each embedding
-        boundaries: list
-            N length list of 0's and 1's where a 1 at index i indicates a boundary
-            after embedding i
+        boundaries: list or torch.Tensor
+            N length list or tensor of 0's and 1's where a 1 at index i indicates a
+            boundary after embedding i. The last element must be a 1.
         pool_method: str
             the method used to pool embeddings within a group
 
@@ -375,31 +672,19 @@ class TextTiler:
             the pooled embeddings as a tensor of shape (B+1, E) where B is the number
             of boundaries in 'boundaries'
         """
-        # define pooling method
-        pool = self._get_pool_method(pool_method)
+        # validates the pooling method
+        self._get_pool_method(pool_method)
 
-        # Group embeddings using the given boundaries
-        N, E = embeddings.shape
-        pooled_embeddings = []
-        cur_group = []
-
-        for i in range(0, N):
-            # add embedding to the current group of embeddings
-            cur_group.append(embeddings[i, :].reshape(1, E))
-
-            # is a boundary
-            if boundaries[i] == BOUNDARY:
-                # concatenate the list of embeddings in the current group into a tensor
-                # of shape (G, E) where G = number of embeddings in the current group
-                cur_group = torch.concat(tuple(cur_group))
-                # pool the current group of embeddings into a single embedding (1, E)
-                # and add the group to the pooled embedding
-                pooled_embeddings.append(pool(cur_group, dim=0))
-                # reset the current group
-                cur_group = []
-
-        pooled_embeddings = torch.stack(tuple(pooled_embeddings))
-        return pooled_embeddings
+        # embedding i belongs to the group numbered by the boundaries before it
+        if torch.is_tensor(boundaries) is False:
+            boundaries = torch.tensor([float(boundary) for boundary in boundaries])
+        is_boundary = (boundaries == BOUNDARY).to(embeddings.device)
+        group_ids = torch.cumsum(is_boundary, dim=0) - is_boundary.long()
+        num_groups = int(is_boundary.sum())
+
+        if pool_method == "mean":
+            return segment_mean_2d(embeddings, group_ids, num_groups)
+        return segment_max_magnitude_2d(embeddings, group_ids, num_groups)
 
     def _get_pool_method(
         self, pool_method: str
@@ -485,6 +770,74 @@ def smooth(x, window_len=3, window="flat"):
     return y[window_len - 1 : -window_len + 1]
 
 
+def smooth_tensor(x: torch.Tensor, window_len: int = 3, window: str = "flat"):
+    """
+    Smooths the rows of 'x' on its device with the same reflected padding and windows
+    as smooth(), using a 1 dimensional convolution.
+
+    Parameters
+    ----------
+    x: torch.Tensor
+        the input signal. Leading dimensions are batch dimensions, each row along the
+        last dimension is smoothed separately
+    window_len: int
+        the dimension of the smoothing window; should be an odd integer
+    window: str
+        the type of window from 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'
+        flat window will produce a moving average smoothing.
+
+    Returns
+    -------
+    torch.Tensor
+        the smoothed signal, the same shape as 'x' (one value shorter along the last
+        dimension when it's as long as the window, like smooth())
+    """
+    if x.ndim < 1:
+        raise ValueError("smooth_tensor needs at least 1 dimension.")
+
+    if x.shape[-1] < window_len:
+        raise ValueError("Input vector needs to be bigger than window size.")
+
+    if window_len < 3:
+        return x
+
+    windows = {
+        "flat": numpy.ones,
+        "hanning": numpy.hanning,
+        "hamming": numpy.hamming,
+        "bartlett": numpy.bartlett,
+        "blackman": numpy.blackman,
+    }
+    if window not in windows:
+        raise ValueError(
+            "Window is on of 'flat', 'hanning', 'hamming', 'bartlett', 'blackman'"
+        )
+
+    # same padding as smooth(): reflections of the signal about its first and last
+    # values, the left one skipping x[1] and the right one starting at x[-1]
+    left = 2 * x[..., :1] - x[..., 2 : window_len + 1].flip(-1)
+    right = 2 * x[..., -1:] - x[..., -window_len + 1 :].flip(-1)
+    s = torch.cat((left, x, right), dim=-1)
+
+    # smooth() convolves in double precision
+    conv_dtype = torch.float64
+    if x.device.type == "mps":
+        conv_dtype = torch.float32
+    w = torch.from_numpy(windows[window](window_len).astype(numpy.float64))
+    w = (w / w.sum()).to(device=x.device, dtype=conv_dtype)
+
+    # smooth() keeps the center of numpy.convolve(..., mode="same") minus
+    # window_len - 1 values at each end, which is a valid cross-correlation with the
+    # flipped window starting (window_len - 1) // 2 values into the padded signal.
+    # The left padding is one value short when the signal is as long as the window,
+    # so the result is too
+    offset = (window_len - 1) // 2
+    num_smoothed = s.shape[-1] - 2 * (window_len - 1)
+    s = s[..., offset : offset + num_smoothed + window_len - 1]
+    y = F.conv1d(s.reshape(-1, 1, s.shape[-1]).to(conv_dtype), w.flip(0).view(1, 1, -1))
+    return y.reshape(x.shape[:-1] + (num_smoothed,)).to(x.dtype)
+
+
 class TextTilerConfigManager(ConfigManager):
     """
     A class for getting information about and validating TextTiler configuration
@@ -0,0 +1,197 @@
+"""
+Read-only list views of columnar transcription info.
+
+Notes
+-----
+- Transcription stores its character, word and sentence info as parallel columns
+(NumPy arrays and strings) instead of one dictionary per element. A 3 hour transcript
+has about 150k characters, and a dictionary per character costs hundreds of MB.
+- InfoView presents the columns as the list of dictionaries get_char_info(),
+get_word_info() and get_sentence_info() always returned. Dictionaries are only built
+for the elements that are accessed, and slicing a view doesn't copy the columns.
+- Missing values are NaN in float columns and -1 in integer columns, and are None in
+the dictionaries.
+- ElementView does the same for the Character, Word and Sentence objects of the
+characters, words and sentences properties.
+"""
+# standard library imports
+from collections.abc import Callable, Iterator, Sequence
+
+# 3rd party imports
+import numpy as np
+
+
+class InfoView(Sequence):
+    """
+    A read-only sequence of info dictionaries built on access from parallel columns.
+    """
+
+    __slots__ = ("_columns", "_start", "_stop")
+
+    def __init__(
+        self,
+        columns: dict[str, Sequence],
+        start: int = 0,
+        stop: int = None,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        columns: dict[str, Sequence]
+            maps each dictionary key to a column with one value per element, in the
+            key order of the dictionaries. Columns are NumPy arrays, lists or strings
+            and all have the same length
+        start: int
+            index of the first element of the view in the columns
+        stop: int
+            index after the last element of the view in the columns. Default is None
+            (the end of the columns)
+        """
+        self._columns = columns
+        self._start = start
+        if stop is None:
+            stop = len(next(iter(columns.values()))) if len(columns) > 0 else 0
+        self._stop = max(stop, start)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: int or slice) -> dict or "InfoView":
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return InfoView(self._columns, self._start + start, self._start + stop)
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("InfoView index out of range")
+        row = self._start + index
+        return {key: _to_python(column[row]) for key, column in self._columns.items()}
+
+    def __iter__(self) -> Iterator[dict]:
+        # converting whole columns at once is much faster than one value at a time
+        keys = list(self._columns.keys())
+        columns = [
+            _column_to_list(column[self._start : self._stop])
+            for column in self._columns.values()
+        ]
+        for values in zip(*columns):
+            yield dict(zip(keys, values))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (InfoView, list)) is False:
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return "InfoView({} elements)".format(len(self))
+
+
+class ElementView(Sequence):
+    """
+    A read-only sequence of transcription elements created on access.
+    """
+
+    __slots__ = ("_create_element", "_start", "_stop")
+
+    def __init__(
+        self,
+        create_element: Callable[[int], object],
+        start: int,
+        stop: int,
+    ) -> None:
+        """
+        Parameters
+        ----------
+        create_element: Callable[[int], object]
+            creates the element at an index of the transcription's elements
+        start: int
+            index of the first element of the view
+        stop: int
+            index after the last element of the view
+        """
+        self._create_element = create_element
+        self._start = start
+        self._stop = max(stop, start)
+
+    def __len__(self) -> int:
+        return self._stop - self._start
+
+    def __getitem__(self, index: int or slice) -> object or "ElementView":
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return [self[i] for i in range(start, stop, step)]
+            return ElementView(
+                self._create_element, self._start + start, self._start + stop
+            )
+
+        if index < 0:
+            index += len(self)
+        if index < 0 or index >= len(self):
+            raise IndexError("ElementView index out of range")
+        return self._create_element(self._start + index)
+
+    def __iter__(self) -> Iterator[object]:
+        for index in range(self._start, self._stop):
+            yield self._create_element(index)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, (ElementView, list)) is False:
+            return NotImplemented
+        return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+
+    def __repr__(self) -> str:
+        return "ElementView({} elements)".format(len(self))
+
+
+def _to_python(value: object) -> object:
+    """
+    Converts a column value to the value of an info dictionary.
+
+    Parameters
+    ----------
+    value: object
+        the column value
+
+    Returns
+    -------
+    object
+        a float, an int, None for missing values, or the value unchanged
+    """
+    if isinstance(value, np.floating):
+        return None if np.isnan(value) else float(value)
+    if isinstance(value, np.integer):
+        return None if value < 0 else int(value)
+    return value
+
+
+def _column_to_list(column: Sequence) -> list:
+    """
+    Converts a column, or a slice of a column, to a list of info dictionary values.
+
+    Parameters
+    ----------
+    column: Sequence
+        the column
+
+    Returns
+    -------
+    list
+        the values of the column
+    """
+    if isinstance(column, np.ndarray) is False:
+        return list(column)
+
+    values = column.tolist()
+    if np.issubdtype(column.dtype, np.floating):
+        missing = np.flatnonzero(np.isnan(column))
+    elif np.issubdtype(column.dtype, np.integer):
+        missing = np.flatnonzero(column < 0)
+    else:
+        return values
+    for i in missing.tolist():
+        values[i] = None
+    return values
@@ -0,0 +1,198 @@
+"""
+Lazily loaded NLTK Punkt sentence tokenizers.
+
+Notes
+-----
+- Nothing is loaded or downloaded when clipsai is imported. The Punkt parameters of a
+language are loaded on the first sentence split in that language and cached for the
+rest of the process, so pools of worker processes only pay for the languages they
+split.
+- Resources are searched in the directory given to configure_punkt() and then in
+NLTK's usual locations (including the NLTK_DATA environment variable). Missing
+resources are downloaded to that directory unless downloads are disabled, e.g. on
+air-gapped workers.
+- NLTK 3.8.2 and newer store the Punkt parameters as the 'punkt_tab' resource, older
+versions as the pickled 'punkt' resource.
+"""
+# standard library imports
+import logging
+import os
+import threading
+
+# current package imports
+from .exceptions import TranscriptionError
+
+# 3rd party imports
+import nltk
+from nltk.tokenize import punkt
+
+# Punkt parameters stored as tab separated files since NLTK 3.8.2
+HAS_PUNKT_TAB = hasattr(punkt, "PunktTokenizer")
+
+_lock = threading.Lock()
+_tokenizers = {}
+_data_dir = None
+_allow_download = True
+
+
+def configure_punkt(data_dir: str = None, allow_download: bool = True) -> None:
+    """
+    Sets where the Punkt resources are searched for and whether missing resources are
+    downloaded. Tokenizers that were already loaded are kept.
+
+    Parameters
+    ----------
+    data_dir: str
+        absolute path of an NLTK data directory containing the Punkt resources, and
+        that missing resources are downloaded to. Default is None (NLTK's usual
+        locations)
+    allow_download: bool
+        whether missing resources are downloaded on first use
+
+    Returns
+    -------
+    None
+    """
+    global _data_dir, _allow_download
+    with _lock:
+        if data_dir is not None and data_dir not in nltk.data.path:
+            nltk.data.path.insert(0, data_dir)
+        _data_dir = data_dir
+        _allow_download = allow_download
+
+
+def get_sentence_tokenizer(language: str = "english") -> punkt.PunktSentenceTokenizer:
+    """
+    Returns the Punkt sentence tokenizer of 'language', loading it on first use.
+
+    Parameters
+    ----------
+    language: str
+        the language of the Punkt model, e.g. 'english'
+
+    Returns
+    -------
+    punkt.PunktSentenceTokenizer
+        the tokenizer, shared by the whole process
+    """
+    tokenizer = _tokenizers.get(language)
+    if tokenizer is not None:
+        return tokenizer
+
+    with _lock:
+        if language not in _tokenizers:
+            _tokenizers[language] = _load_tokenizer(language)
+        return _tokenizers[language]
+
+
+def split_sentences(text: str, language: str = "english") -> list[str]:
+    """
+    Splits 'text' into sentences with the Punkt tokenizer of 'language', like
+    nltk.tokenize.sent_tokenize().
+
+    Parameters
+    ----------
+    text: str
+        the text to split
+    language: str
+        the language of the Punkt model, e.g. 'english'
+
+    Returns
+    -------
+    list[str]
+        the sentences of the text
+    """
+    return get_sentence_tokenizer(language).tokenize(text)
+
+
+def split_sentence_spans(text: str, language: str = "english") -> list[tuple[int]]:
+    """
+    Finds the character spans of the sentences of 'text' with the Punkt tokenizer of
+    'language'. The sentences are the same as the ones of split_sentences().
+
+    Parameters
+    ----------
+    text: str
+        the text to split
+    language: str
+        the language of the Punkt model, e.g. 'english'
+
+    Returns
+    -------
+    list[tuple[int]]
+        the (start, end) character offsets of the sentences in the text, end excluded
+    """
+    return list(get_sentence_tokenizer(language).span_tokenize(text))
+
+
+def _load_tokenizer(language: str) -> punkt.PunktSentenceTokenizer:
+    """
+    Loads the Punkt tokenizer of 'language', downloading its resource if it's missing
+    and downloads are allowed. Must be called while holding _lock.
+
+    Parameters
+    ----------
+    language: str
+        the language of the Punkt model
+
+    Returns
+    -------
+    punkt.PunktSentenceTokenizer
+        the tokenizer
+    """
+    resource = "punkt_tab" if HAS_PUNKT_TAB else "punkt"
+    try:
+        return _read_tokenizer(language)
+    except LookupError:
+        if _allow_download is False:
+            err = (
+                "The NLTK '{}' resource for '{}' isn't in any of the NLTK data "
+                "directories {} and downloads are disabled. Download it with "
+                "nltk.download('{}') or pass its directory to configure_punkt()."
+                "".format(resource, language, nltk.data.path, resource)
+            )
+            logging.error(err)
+            raise TranscriptionError(err)
+
+    logging.info("Downloading the NLTK '{}' resource".format(resource))
+    if _data_dir is not None:
+        os.makedirs(_data_dir, exist_ok=True)
+    downloaded = nltk.download(resource, download_dir=_data_dir, quiet=True)
+    try:
+        return _read_tokenizer(language)
+    except LookupError:
+        err = (
+            "The NLTK '{}' resource for '{}' couldn't be {}. Download it with "
+            "nltk.download('{}') or pass its directory to configure_punkt()."
+            "".format(
+                resource,
+                language,
+                "found after downloading it" if downloaded else "downloaded",
+                resource,
+            )
+        )
+        logging.error(err)
+        raise TranscriptionError(err)
+
+
+def _read_tokenizer(language: str) -> punkt.PunktSentenceTokenizer:
+    """
+    Reads the Punkt tokenizer of 'language' from the NLTK data directories.
+
+    Parameters
+    ----------
+    language: str
+        the language of the Punkt model
+
+    Returns
+    -------
+    punkt.PunktSentenceTokenizer
+        the tokenizer
+
+    Raises
+    ------
+    LookupError: the resource isn't in any NLTK data directory
+    """
+    if HAS_PUNKT_TAB:
+        return punkt.PunktTokenizer(language)
+    return nltk.data.load("tokenizers/punkt/{}.pickle".format(language))
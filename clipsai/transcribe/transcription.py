@@ -5,6 +5,10 @@ Notes
 -----
 - Character, word, and sentence level time stamps are available
 - NLTK used for tokenizing sentences
+- Character, word, and sentence info are stored as parallel NumPy columns and are
+returned as read-only InfoViews that build each info dictionary on access. The
+characters, words, and sentences properties are ElementViews that likewise create
+each Character, Word, and Sentence on access
 - WhisperX GitHub: https://github.com/m-bain/whisperX
 """
 # standard library imports
@@ -14,6 +18,8 @@ import logging
 
 # current package imports
 from .exceptions import TranscriptionError
+from .info_view import ElementView, InfoView
+from .sentence_tokenizer import split_sentence_spans
 from .transcription_element import Sentence, Word, Character
 
 # local imports
@@ -22,10 +28,7 @@ from clipsai.filesys.manager import FileSystemManager
 from clipsai.utils.type_checker import TypeChecker
 
 # 3rd party imports
-import nltk
-from nltk.tokenize import sent_tokenize
-
-nltk.download("punkt")
+import numpy as np
 
 
 class Transcription:
@@ -57,9 +60,21 @@ class Transcription:
         self._created_time = None
         self._language = None
         self._num_speakers = None
-        self._char_info = None
-        # derived from char_info data
+        # character columns, the characters themselves are the characters of _text
         self._text = None
+        self._char_start_times = None
+        self._char_end_times = None
+        self._char_speakers = None
+        # derived from the character columns
+        self._end_time = None
+        self._char_search_start_times = None
+        self._char_search_end_times = None
+        self._char_word_indices = None
+        self._char_sentence_indices = None
+        self._word_columns = None
+        self._sentence_columns = None
+        # read-only views of the columns
+        self._char_info = None
         self._word_info = None
         self._sentence_info = None
 
@@ -104,12 +119,7 @@ class Transcription:
         """
         The end time of the transcript in seconds.
         """
-        char_info = self.get_char_info()
-        for i in range(len(char_info) - 1, -1, -1):
-            if char_info[i]["end_time"] is not None:
-                return char_info[i]["end_time"]
-            if char_info[i]["start_time"] is not None:
-                return char_info[i]["start_time"]
+        return self._end_time
 
     @property
     def text(self) -> str:
@@ -119,64 +129,34 @@ class Transcription:
         return self._text
 
     @property
-    def characters(self) -> list[Character]:
-        """
-        A list of characters from the text as Character objects and ordered by start
-        time.
-        """
-        chars = []
-        for char_info in self.get_char_info():
-            chars.append(
-                Character(
-                    start_time=char_info["start_time"],
-                    end_time=char_info["end_time"],
-                    word_index=char_info["work_index"],
-                    sentence_index=char_info["sentence_index"],
-                    text=char_info["char"],
-                )
-            )
-        return chars
+    def characters(self) -> ElementView:
+        """
+        A read-only sequence of the characters from the text as Character objects,
+        ordered by start time. Characters are created when they are accessed.
+        """
+        return ElementView(self._create_character, 0, len(self._char_info))
 
     @property
-    def words(self) -> list[Word]:
-        """
-        A list of words from the text as Word objects and ordered by start time.
-        """
-        words = []
-        for word_info in self.get_word_info():
-            words.append(
-                Word(
-                    start_time=word_info["start_time"],
-                    end_time=word_info["end_time"],
-                    start_char=word_info["start_char"],
-                    end_char=word_info["end_char"],
-                    text=word_info["word"],
-                )
-            )
-        return words
+    def words(self) -> ElementView:
+        """
+        A read-only sequence of the words from the text as Word objects, ordered by
+        start time. Words are created when they are accessed.
+        """
+        return ElementView(self._create_word, 0, len(self._word_info))
 
     @property
-    def sentences(self) -> list[Sentence]:
-        """
-        A list of sentences from the text as Sentence objects and ordered by start time.
-        """
-        sentences = []
-        for sentence_info in self.get_sentence_info():
-            sentences.append(
-                Sentence(
-                    start_time=sentence_info["start_time"],
-                    end_time=sentence_info["end_time"],
-                    start_char=sentence_info["start_char"],
-                    end_char=sentence_info["end_char"],
-                )
-            )
-        return sentences
+    def sentences(self) -> ElementView:
+        """
+        A read-only sequence of the sentences from the text as Sentence objects,
+        ordered by start time. Sentences are created when they are accessed.
+        """
+        return ElementView(self._create_sentence, 0, len(self._sentence_info))
 
     def get_char_info(
         self,
         start_time: float = None,
         end_time: float = None,
-    ) -> list:
+    ) -> InfoView:
         """
         Returns the character info of the transcription
 
@@ -191,8 +171,8 @@ class Transcription:
 
         Returns
         -------
-        list[dict]
-            list of dictionaries where each dictionary contains
+        InfoView
+            read-only list of dictionaries where each dictionary contains
             info about a single character in the text
         """
         self._assert_valid_times(start_time, end_time)
@@ -211,7 +191,7 @@ class Transcription:
         self,
         start_time: float = None,
         end_time: float = None,
-    ) -> list:
+    ) -> InfoView:
         """
         Returns the word info of the text
 
@@ -226,8 +206,8 @@ class Transcription:
 
         Returns
         -------
-        list[dict]
-            list of dictionaries where each dictionary contains
+        InfoView
+            read-only list of dictionaries where each dictionary contains
             info about a single word in the text
         """
         self._assert_valid_times(start_time, end_time)
@@ -248,7 +228,7 @@ class Transcription:
         self,
         start_time: float = None,
         end_time: float = None,
-    ) -> list:
+    ) -> InfoView:
         """
         Returns the sentence information of the text.
 
@@ -261,9 +241,9 @@ class Transcription:
 
         Returns
         -------
-        list[dict]
-            list of dictionaries where each dictionary contains info about a single
-            sentence in the text
+        InfoView
+            read-only list of dictionaries where each dictionary contains info about a
+            single sentence in the text
         """
         self._assert_valid_times(start_time, end_time)
         sentence_info = self._sentence_info
@@ -298,7 +278,7 @@ class Transcription:
         int
             The index of char_info that is closest to 'target_time'
         """
-        return self._find_index(self.get_char_info(), target_time, type_of_time)
+        return int(self.find_char_indices([target_time], type_of_time)[0])
 
     def find_word_index(self, target_time: float, type_of_time: str) -> int:
         """
@@ -320,7 +300,7 @@ class Transcription:
         int
             The index of word_info that is closest to 'target_time'.
         """
-        return self._find_index(self.get_word_info(), target_time, type_of_time)
+        return int(self.find_word_indices([target_time], type_of_time)[0])
 
     def find_sentence_index(self, target_time: float, type_of_time: str) -> int:
         """
@@ -342,7 +322,99 @@ class Transcription:
         int
             The index of word_info that is closest to 'target_time'
         """
-        return self._find_index(self.get_sentence_info(), target_time, type_of_time)
+        return int(self.find_sentence_indices([target_time], type_of_time)[0])
+
+    def find_char_indices(
+        self, target_times: list[float] or np.ndarray, type_of_time: str
+    ) -> np.ndarray:
+        """
+        Finds the index in the transcript's character info who's start or end time is
+        closest to each time in 'target_times' (seconds), like find_char_index().
+        Characters without a start or end time use the last time recorded before them.
+
+        Parameters
+        ----------
+        target_times: list[float] or np.ndarray
+            The times in seconds to search for.
+        type_of_time: start | end
+            start: returns the index of each character with the closest start time
+            before the target time.
+            end: returns the index of each character with the closest end time after
+            the target time.
+
+        Returns
+        -------
+        np.ndarray
+            int64 array with the index of char_info closest to each target time
+        """
+        return self._find_indices(
+            self._char_search_start_times,
+            self._char_search_end_times,
+            target_times,
+            type_of_time,
+        )
+
+    def find_word_indices(
+        self, target_times: list[float] or np.ndarray, type_of_time: str
+    ) -> np.ndarray:
+        """
+        Finds the index in the transcript's word info who's start or end time is
+        closest to each time in 'target_times' (seconds), like find_word_index().
+
+        Parameters
+        ----------
+        target_times: list[float] or np.ndarray
+            The times in seconds to search for.
+        type_of_time: start | end
+            start: returns the index of each word with the closest start time before
+            the target time.
+            end: returns the index of each word with the closest end time after the
+            target time.
+
+        Returns
+        -------
+        np.ndarray
+            int64 array with the index of word_info closest to each target time
+        """
+        # the spaces at the end of the text aren't a word that can be found
+        num_words = len(self._word_columns["word"])
+        if num_words > 0 and self._word_columns["start_char"][-1] < 0:
+            num_words -= 1
+        return self._find_indices(
+            self._word_columns["start_time"][:num_words],
+            self._word_columns["end_time"][:num_words],
+            target_times,
+            type_of_time,
+        )
+
+    def find_sentence_indices(
+        self, target_times: list[float] or np.ndarray, type_of_time: str
+    ) -> np.ndarray:
+        """
+        Finds the index in the transcript's sentence info who's start or end time is
+        closest to each time in 'target_times' (seconds), like find_sentence_index().
+
+        Parameters
+        ----------
+        target_times: list[float] or np.ndarray
+            The times in seconds to search for.
+        type_of_time: start | end
+            start: returns the index of each sentence with the closest start time
+            before the target time.
+            end: returns the index of each sentence with the closest end time after
+            the target time.
+
+        Returns
+        -------
+        np.ndarray
+            int64 array with the index of sentence_info closest to each target time
+        """
+        return self._find_indices(
+            self._sentence_columns["start_time"],
+            self._sentence_columns["end_time"],
+            target_times,
+            type_of_time,
+        )
 
     def store_as_json_file(self, file_path: str) -> JSONFile:
         """
@@ -366,16 +438,16 @@ class Transcription:
         json_file.delete()
 
         # only store necessary data
-        char_info_needed_for_storage = []
-        for char_info in self._char_info:
-            char_info_needed_for_storage.append(
+        char_info_needed_for_storage = list(
+            InfoView(
                 {
-                    "char": char_info["char"],
-                    "start_time": char_info["start_time"],
-                    "end_time": char_info["end_time"],
-                    "speaker": char_info["speaker"],
+                    "char": self._text,
+                    "start_time": self._char_start_times,
+                    "end_time": self._char_end_times,
+                    "speaker": self._char_speakers,
                 }
             )
+        )
 
         transcription_dict = {
             "source_software": self._source_software,
@@ -458,59 +530,151 @@ class Transcription:
             print("start_time: {}".format(sentence_info["start_time"]), end=" | ")
             print("end_time: {}\n".format(sentence_info["end_time"]))
 
-    def _find_index(
-        self, transcript_info: list[dict], target_time: float, type_of_time: str
-    ) -> int:
+    def _create_character(self, index: int) -> Character:
+        """
+        Creates the Character at 'index' of the character info.
+
+        Parameters
+        ----------
+        index: int
+            index of the character
+
+        Returns
+        -------
+        Character
+            the character
+        """
+        char_info = self._char_info[index]
+        return Character(
+            start_time=char_info["start_time"],
+            end_time=char_info["end_time"],
+            word_index=char_info["work_index"],
+            sentence_index=char_info["sentence_index"],
+            text=char_info["char"],
+        )
+
+    def _create_word(self, index: int) -> Word:
+        """
+        Creates the Word at 'index' of the word info.
+
+        Parameters
+        ----------
+        index: int
+            index of the word
+
+        Returns
+        -------
+        Word
+            the word
+        """
+        word_info = self._word_info[index]
+        return Word(
+            start_time=word_info["start_time"],
+            end_time=word_info["end_time"],
+            start_char=word_info["start_char"],
+            end_char=word_info["end_char"],
+            text=word_info["word"],
+        )
+
+    def _create_sentence(self, index: int) -> Sentence:
+        """
+        Creates the Sentence at 'index' of the sentence info.
+
+        Parameters
+        ----------
+        index: int
+            index of the sentence
+
+        Returns
+        -------
+        Sentence
+            the sentence
+        """
+        sentence_info = self._sentence_info[index]
+        return Sentence(
+            start_time=sentence_info["start_time"],
+            end_time=sentence_info["end_time"],
+            start_char=sentence_info["start_char"],
+            end_char=sentence_info["end_char"],
+            text=sentence_info["sentence"],
+        )
+
+    def _find_indices(
+        self,
+        start_times: np.ndarray,
+        end_times: np.ndarray,
+        target_times: list[float] or np.ndarray,
+        type_of_time: str,
+    ) -> np.ndarray:
         """
         Finds the index in some transcript info who's start or end time is closest to
-        'target_time' (seconds).
+        each time in 'target_times' (seconds) with binary searches of the start and end
+        times.
 
         Parameters
         ----------
-        transcript_info: list[dict]
-            list of dictionaries where each dictionary contains info about a single
-            character, word, or sentence in the text
-        target_time: float
-            The time in seconds to search for.
+        start_times: np.ndarray
+            non-decreasing start time of each character, word, or sentence in the text
+        end_times: np.ndarray
+            non-decreasing end time of each character, word, or sentence in the text
+        target_times: list[float] or np.ndarray
+            The times in seconds to search for.
         type_of_time: str
             A string that specifies the type of time we're searching for.
-            If 'start', the function returns the index with the closest start time
-            before 'target_time'.
-            If 'end', the function returns the index with the closest end time after
-            target time.
+            If 'start', returns the index of the first element starting at each target
+            time, or else of the element starting before it and containing it, or else
+            of the first element starting after it.
+            If 'end', returns the index of the element containing each target time and
+            ending first, or else the last element ending before it.
 
         Returns
         -------
-        int
-            The index that is closest to 'target_time'
+        np.ndarray
+            int64 array with the index closest to each target time
         """
-        transcript_start = self.start_time
-        transcript_end = self.end_time
-        if (transcript_start <= target_time <= transcript_end) is False:
+        target_times = np.asarray(target_times, dtype=np.float64).reshape(-1)
+        outside = (target_times < self.start_time) | (target_times > self.end_time)
+        if outside.any():
             err = (
                 "target_time '{}' seconds is not within the range of the transcript "
-                "times: {} - {}".format(target_time, self.start_time, self.end_time)
+                "times: {} - {}".format(
+                    target_times[outside][0], self.start_time, self.end_time
+                )
             )
             logging.error(err)
             raise TranscriptionError(err)
 
-        left, right = 0, len(transcript_info) - 1
-        while left <= right:
-            mid = left + (right - left) // 2
-            start_time = transcript_info[mid]["start_time"]
-            end_time = transcript_info[mid]["end_time"]
-
-            if start_time <= target_time <= end_time:
-                return mid
-            elif target_time > end_time:
-                left = mid + 1
-            elif target_time < start_time:
-                right = mid - 1
-
+        num_elements = len(start_times)
         if type_of_time == "start":
-            return left - 1 if left == len(transcript_info) else left
+            # first element starting at or after the target time
+            indices = np.searchsorted(start_times, target_times, side="left")
+            starts_at_target = indices < num_elements
+            starts_at_target[starts_at_target] = (
+                start_times[indices[starts_at_target]] == target_times[starts_at_target]
+            )
+            # else the element starting before the target time, if it contains it
+            prev_contains_target = indices > 0
+            prev_contains_target[prev_contains_target] = (
+                end_times[indices[prev_contains_target] - 1]
+                >= target_times[prev_contains_target]
+            )
+            indices = np.where(
+                ~starts_at_target & prev_contains_target, indices - 1, indices
+            )
+            return np.minimum(indices, num_elements - 1)
+        elif type_of_time == "end":
+            # first element ending at or after the target time
+            indices = np.searchsorted(end_times, target_times, side="left")
+            contains_target = indices < num_elements
+            contains_target[contains_target] = (
+                start_times[indices[contains_target]] <= target_times[contains_target]
+            )
+            indices = np.where(contains_target, indices, indices - 1)
+            return np.maximum(indices, 0)
         else:
-            return right + 1 if right == -1 else right
+            err = "type_of_time must be 'start' or 'end', not '{}'".format(type_of_time)
+            logging.error(err)
+            raise TranscriptionError(err)
 
     def _init_from_json_file(self, json_file: JSONFile) -> None:
         """
@@ -560,11 +724,23 @@ class Transcription:
         self._source_software = transcription["source_software"]
         self._language = transcription["language"]
         self._num_speakers = transcription["num_speakers"]
-        self._char_info = transcription["char_info"]
+        self._build_char_columns(transcription["char_info"])
+        self._build_time_bounds()
         # derived data
-        self._build_text()
         self._build_word_info()
         self._build_sentence_info()
+        self._char_info = InfoView(
+            {
+                "char": self._text,
+                "start_time": self._char_start_times,
+                "end_time": self._char_end_times,
+                "speaker": self._char_speakers,
+                "work_index": self._char_word_indices,
+                "sentence_index": self._char_sentence_indices,
+            }
+        )
+        self._word_info = InfoView(self._word_columns)
+        self._sentence_info = InfoView(self._sentence_columns)
 
     def _assert_valid_transcription_data(self, transcription: dict) -> None:
         """
@@ -609,28 +785,40 @@ class Transcription:
                 char_dict_keys_correct_data_types,
             )
 
-    def _build_text(self) -> str:
+    def _build_char_columns(self, char_info: list[dict]) -> None:
         """
-        Builds the text from the char_info
+        Builds the text and the character time and speaker columns from the char_info
 
         Parameters
         ----------
-        None
+        char_info: list[dict]
+            list of dictionaries with the keys "char", "start_time", "end_time" and
+            "speaker"
 
         Returns
         -------
-        str:
-            the full text built from the char_info
-        """
-        text = ""
-        for char_info in self.get_char_info():
-            text += char_info["char"]
-
-        self._text = text
-
-    def _build_word_info(self) -> list[dict]:
+        None
         """
-        Builds the word_info from the char_info
+        num_chars = len(char_info)
+        self._text = "".join([info["char"] for info in char_info])
+        # None becomes NaN
+        self._char_start_times = np.array(
+            [info["start_time"] for info in char_info], dtype=np.float64
+        ).reshape(num_chars)
+        self._char_end_times = np.array(
+            [info["end_time"] for info in char_info], dtype=np.float64
+        ).reshape(num_chars)
+        speakers = [info.get("speaker") for info in char_info]
+        # None becomes -1
+        self._char_speakers = np.array(
+            [-1 if speaker is None else speaker for speaker in speakers],
+            dtype=np.int64,
+        ).reshape(num_chars)
+
+    def _build_time_bounds(self) -> None:
+        """
+        Computes the transcript's end time and the character times searched by
+        find_char_indices() once from the character time columns
 
         Parameters
         ----------
@@ -638,273 +826,206 @@ class Transcription:
 
         Returns
         -------
-        list[dict]:
-            the word_info built from the char_info
-        """
-        char_info = self.get_char_info()
-
-        # final destination for word_info
-        word_info = []
-
-        # current word
-        cur_word = ""
-        cur_word_start_char_idx = None
-        cur_word_start_time = None
-        cur_word_end_time = None
-
-        # helper variables
-        cur_word_idx = 0
-        prev_char_info = {
-            "char": " ",  # set to space so first char is always a word start
-            "start_time": None,
-            "end_time": None,
-            "speaker": None,
-        }
-        last_recorded_time = 0
-
-        for i, cur_char_info in enumerate(char_info):
-            cur_char = cur_char_info["char"]
-            prev_char = prev_char_info["char"]
-
-            if self._is_word_start(prev_char, cur_char):
-                cur_word = ""
-                cur_word_start_char_idx = i
-                if cur_char_info["start_time"] is not None:
-                    cur_word_start_time = cur_char_info["start_time"]
-                else:
-                    cur_word_start_time = last_recorded_time
-
-            if self._is_word_end(prev_char, cur_char):
-                new_word_info = {
-                    "word": cur_word,
-                    "start_char": cur_word_start_char_idx,
-                    # prev_char is the actual last char of this word but python
-                    # slicing is non-inclusive so we use the index of cur_char (+1)
-                    "end_char": i,
-                    "start_time": cur_word_start_time,
-                    "end_time": cur_word_end_time,
-                    "speaker": None,
-                }
-                word_info.append(new_word_info)
-
-                cur_word_idx += 1
-                # reset word info
-                cur_word_start_char_idx = None
-                cur_word = ""
-
-            # update char info
-            cur_char_info["work_index"] = cur_word_idx
-
-            # update word info
-            if cur_char_info["end_time"] is not None:
-                last_recorded_time = cur_char_info["end_time"]
-            elif cur_char_info["start_time"] is not None:
-                last_recorded_time = cur_char_info["start_time"]
-
-            cur_word_end_time = last_recorded_time
-            cur_word += cur_char
-            prev_char_info = cur_char_info
-
-        # last word
-        new_word_info = {
-            "word": cur_word,
-            "start_char": cur_word_start_char_idx,
-            # i is the actual last char index of this word but python
-            # slicing is non-inclusive so we increment by 1
-            "end_char": i + 1,
-            "start_time": cur_word_start_time,
-            "end_time": cur_word_end_time,
-            "speaker": None,
-        }
-        word_info.append(new_word_info)
-        self._char_info = char_info
-        self._word_info = word_info
+        None
+        """
+        start_times = self._char_start_times
+        end_times = self._char_end_times
+        # the end time, or else the start time, of each character
+        recorded_times = np.where(np.isnan(end_times), start_times, end_times)
+        timed_chars = np.flatnonzero(~np.isnan(recorded_times))
+        if len(timed_chars) > 0:
+            self._end_time = float(recorded_times[timed_chars[-1]])
+
+        # the last time recorded up to each character, 0 before the first time
+        last_recorded_times = self._calc_last_recorded_times()
+        prev_recorded_times = np.concatenate([[0.0], last_recorded_times[:-1]])
+        # times are made non-decreasing so they can be binary searched
+        self._char_search_start_times = np.maximum.accumulate(
+            np.where(np.isnan(start_times), prev_recorded_times, start_times)
+        )
+        self._char_search_end_times = np.maximum.accumulate(last_recorded_times)
 
-    def _is_space(self, char: str) -> bool:
+    def _build_word_info(self) -> None:
         """
-        Returns whether the character is a space
+        Builds the word columns and the word index of each character from the character
+        columns
 
         Parameters
         ----------
-        char: str
-            the character to check
+        None
 
         Returns
         -------
-        bool:
-            whether the character is a space
-        """
-        return char == " "
-
-    def _is_word_start(self, prev_char: str, char: str) -> bool:
-        """
-        Returns whether the character is the start of a word
+        None
 
-        Parameters
-        ----------
-        char: str
-            the character to check
-        prev_char: str
-            the previous character
+        Notes
+        -----
+        - Words are the runs of characters other than spaces, found with array masks.
+        The spaces before a word belong to that word. Spaces at the end of the text make
+        up a last word without a start character.
+        """
+        text = self._text
+        num_chars = len(text)
+        # one code point per character
+        codes = np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32)
+        is_space = codes == ord(" ")
+        # the first character is always preceded by a space
+        prev_is_space = np.ones(num_chars, dtype=bool)
+        prev_is_space[1:] = is_space[:-1]
+        start_chars = np.flatnonzero(prev_is_space & ~is_space)
+        is_word_end = ~prev_is_space & is_space
+        end_chars = np.flatnonzero(is_word_end)
+        # a word's index is the number of words ended before it
+        self._char_word_indices = np.cumsum(is_word_end, dtype=np.int64)
+
+        last_recorded_times = self._calc_last_recorded_times()
+        ends_with_word = num_chars > 0 and bool(is_space[-1]) is False
+        if ends_with_word:
+            end_chars = np.append(end_chars, num_chars)
+        start_times, end_times = self._calc_span_times(
+            start_chars, end_chars, last_recorded_times
+        )
+        words = [
+            text[start:end]
+            for start, end in zip(start_chars.tolist(), end_chars.tolist())
+        ]
+
+        # the spaces at the end of the text, or the empty text
+        if ends_with_word is False:
+            words.append(text[end_chars[-1] if len(end_chars) > 0 else 0 :])
+            start_chars = np.append(start_chars, -1)
+            end_chars = np.append(end_chars, num_chars)
+            start_times = np.append(
+                start_times, start_times[-1] if len(start_times) > 0 else np.nan
+            )
+            end_times = np.append(
+                end_times, last_recorded_times[-1] if num_chars > 0 else np.nan
+            )
 
-        Returns
-        -------
-        bool:
-            whether the character is the start of a word
-        """
-        is_word_start = self._is_space(prev_char) is True
-        is_word_start = is_word_start and (self._is_space(char) is False)
-        return is_word_start
+        self._word_columns = {
+            "word": words,
+            "start_char": start_chars.astype(np.int64),
+            "end_char": end_chars.astype(np.int64),
+            "start_time": start_times,
+            "end_time": end_times,
+            "speaker": np.full(len(words), -1, dtype=np.int64),
+        }
 
-    def _is_word_end(self, char: str, next_char: str) -> bool:
+    def _build_sentence_info(self) -> None:
         """
-        Returns whether the character is the end of a word
+        Builds the sentence columns and the sentence index of each character from the
+        character columns
 
         Parameters
         ----------
-        char: str
-            the character to check
-        next_char: str
-            the prev character
+        None
 
         Returns
         -------
-        bool:
-            whether the character is the end of a word
-        """
-        is_word_end = self._is_space(char) is False
-        is_word_end = is_word_end and (self._is_space(next_char) is True)
-        return is_word_end
+        None
 
-    def _build_sentence_info(self) -> None:
+        Notes
+        -----
+        - Sentences are the character spans found by the sentence tokenizer. The
+        characters between two sentences belong to the later one, and the characters
+        after the last sentence belong to no sentence.
+        - Only the times of the characters of the sentences are used.
+        """
+        text = self._text
+        num_chars = len(text)
+        spans = np.array(split_sentence_spans(text), dtype=np.int64).reshape(-1, 2)
+        start_chars = spans[:, 0]
+        end_chars = spans[:, 1]
+
+        # a sentence's index is the number of sentences ended before it
+        char_sentence_indices = np.searchsorted(
+            end_chars, np.arange(num_chars), side="right"
+        )
+        char_sentence_indices[char_sentence_indices == len(spans)] = -1
+        self._char_sentence_indices = char_sentence_indices.astype(np.int64)
+
+        # spans don't overlap, so each start and each end is a unique index
+        span_bounds = np.zeros(num_chars + 1, dtype=np.int64)
+        span_bounds[start_chars] += 1
+        span_bounds[end_chars] -= 1
+        is_in_sentence = np.cumsum(span_bounds[:-1]) > 0
+        start_times, end_times = self._calc_span_times(
+            start_chars, end_chars, self._calc_last_recorded_times(is_in_sentence)
+        )
+
+        self._sentence_columns = {
+            "sentence": [
+                text[start:end]
+                for start, end in zip(start_chars.tolist(), end_chars.tolist())
+            ],
+            "start_char": start_chars,
+            "start_time": start_times,
+            "end_char": end_chars,
+            "end_time": end_times,
+        }
+
+    def _calc_last_recorded_times(self, char_mask: np.ndarray = None) -> np.ndarray:
         """
-        Builds the sentence_info from the char_info
+        Finds the last time recorded up to each character. A character's recorded time
+        is its end time, or else its start time.
 
         Parameters
         ----------
-        None
+        char_mask: np.ndarray
+            boolean array of the characters whose times are used. Default is None (all
+            characters)
 
         Returns
         -------
-        None
-        """
-        char_info = self.get_char_info()
-        sentences = sent_tokenize(self.text)
-
-        # final destination for sentence_info
-        sentence_info = []
-
-        # current sentence
-        cur_sentence_start_char_idx = None
-        cur_sentence_start_time = None
-
-        # helper variables
-        cur_char_idx = 0
-        last_recorded_time = 0.0
-
-        for i, cur_sentence in enumerate(sentences):
-            # nltk tokenizer doesn't include spaces in between sentences
-            # need increment the char_idx by 1 for each sentence to account for this
-            if char_info[cur_char_idx]["char"] == " ":
-                char_info[cur_char_idx]["sentence_index"] = i
-                cur_char_idx += 1
-
-            for j, sentence_char in enumerate(cur_sentence):
-                cur_char_info = char_info[cur_char_idx]
-                # realign cur_char_idx with sentence if needed
-                if cur_sentence[j] != cur_char_info["char"]:
-                    cur_char_idx = self._realign_char_idx_with_sentence(
-                        char_info, cur_char_idx, cur_sentence[j], 3
-                    )
-
-                # sentence start time and start index
-                if j == 0:
-                    cur_sentence_start_char_idx = cur_char_idx
-                    if cur_char_info["start_time"] is not None:
-                        cur_sentence_start_time = cur_char_info["start_time"]
-                    else:
-                        cur_sentence_start_time = last_recorded_time
-
-                if cur_char_info["end_time"] is not None:
-                    last_recorded_time = cur_char_info["end_time"]
-                elif cur_char_info["start_time"] is not None:
-                    last_recorded_time = cur_char_info["start_time"]
-
-                # update char_info
-                cur_char_info["sentence_index"] = i
-
-                cur_char_idx += 1
-
-            new_sentence_info = {
-                "sentence": cur_sentence,
-                "start_char": cur_sentence_start_char_idx,
-                "start_time": cur_sentence_start_time,
-                "end_char": cur_char_idx,
-                "end_time": last_recorded_time,
-            }
-            sentence_info.append(new_sentence_info)
-
-        self._char_info = char_info
-        self._sentence_info = sentence_info
-
-        return sentence_info
-
-    def _realign_char_idx_with_sentence(
+        np.ndarray
+            the last recorded time up to and including each character, 0 before the
+            first recorded time
+        """
+        start_times = self._char_start_times
+        end_times = self._char_end_times
+        recorded_times = np.where(np.isnan(end_times), start_times, end_times)
+        if char_mask is not None:
+            recorded_times = np.where(char_mask, recorded_times, np.nan)
+
+        timed_chars = np.flatnonzero(~np.isnan(recorded_times))
+        last_timed_chars = np.full(len(recorded_times), -1, dtype=np.int64)
+        last_timed_chars[timed_chars] = timed_chars
+        last_timed_chars = np.maximum.accumulate(last_timed_chars)
+        return np.where(last_timed_chars >= 0, recorded_times[last_timed_chars], 0.0)
+
+    def _calc_span_times(
         self,
-        char_info: list[dict],
-        char_idx: int,
-        correct_char: str,
-        search_window_size: int,
-    ) -> int:
+        start_chars: np.ndarray,
+        end_chars: np.ndarray,
+        last_recorded_times: np.ndarray,
+    ) -> tuple[np.ndarray]:
         """
-        Realigns the char_idx so that char_info[char_idx] == correct_char
+        Finds the start and end times of non-empty character spans. A span starts at
+        the start time of its first character, or else at the last time recorded
+        before it, and ends at the last time recorded up to its last character.
 
         Parameters
         ----------
-        char_info: list[dict]
-            char_info list
-        char_idx: int
-            index of character to start searching from
-        correct_char: str
-            the character that should be at char_info[char_idx]
-        search_window_size: int
-            the number of characters to search in each direction
+        start_chars: np.ndarray
+            index of the first character of each span
+        end_chars: np.ndarray
+            index after the last character of each span
+        last_recorded_times: np.ndarray
+            the last recorded time up to each character, see
+            _calc_last_recorded_times()
 
         Returns
         -------
-        correct_char_idx: int or None
-            the char_idx scuh that char_info[char_idx] == correct_char
+        tuple[np.ndarray]
+            the start times and the end times of the spans
         """
-        logging.debug(
-            "Realigning char_idx '{}' with the correct starting character "
-            "'{}' for the sentence.".format(char_idx, correct_char)
-        )
-
-        if char_idx < 0 or char_idx >= len(char_info):
-            err_msg = (
-                "char_idx must be between 0 and {} (length of char_info), not '{}'"
-                "".format(len(char_info), char_idx)
-            )
-            logging.error(err_msg)
-            raise ValueError(err_msg)
-        if search_window_size <= 1:
-            err_msg = "search_window_size must be greater than 0, not '{}'" "".format(
-                search_window_size
-            )
-            logging.error(err_msg)
-            raise ValueError(err_msg)
-
-        for offset in range(1, search_window_size * 2):
-            offset *= -1
-            if char_info[char_idx + offset]["char"] == correct_char:
-                return char_idx + offset
-
-        # realignment failed
-        err_msg = (
-            "Realigning char_idx '{}' with the correct starting character '{}' for the "
-            "sentence failed.".format(char_idx, correct_char)
+        prev_recorded_times = np.concatenate([[0.0], last_recorded_times[:-1]])
+        start_times = self._char_start_times[start_chars]
+        start_times = np.where(
+            np.isnan(start_times), prev_recorded_times[start_chars], start_times
         )
-        raise TranscriptionError(err_msg)
+        end_times = last_recorded_times[end_chars - 1]
+        return start_times, end_times
 
     def _assert_valid_times(self, start_time: float, end_time: float) -> None:
         """
@@ -16,6 +16,8 @@ class TranscriptionElement:
     text (str): The text of the element.
     """
 
+    __slots__ = ("_start_time", "_end_time", "_start_char", "_end_char", "_text")
+
     def __init__(
         self,
         start_time: float,
@@ -156,6 +158,8 @@ class Sentence(TranscriptionElement):
     text (str): The text of the sentence.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         start_time: float,
@@ -196,6 +200,8 @@ class Word(TranscriptionElement):
     text (str): The text of the word.
     """
 
+    __slots__ = ()
+
     def __init__(
         self,
         start_time: float,
@@ -237,6 +243,14 @@ class Character:
     text (str): The text of the character.
     """
 
+    __slots__ = (
+        "_start_time",
+        "_end_time",
+        "_word_index",
+        "_sentence_index",
+        "_text",
+    )
+
     def __init__(
         self,
         start_time: float,
@@ -247,6 +247,215 @@ def max_magnitude_2d(tensor: torch.tensor, dim: int) -> torch.tensor:
     return max_tensor
 
 
+def sliding_window_max_magnitude_2d(
+    tensor: torch.tensor, window_size: int
+) -> torch.tensor:
+    """
+    Returns the maximum magnitude value of each column within every window of
+    'window_size' consecutive rows. Row i of the output pools rows i to
+    i + window_size - 1 of 'tensor'.
+
+    The windowed maxima are found by repeatedly doubling the window width, so the
+    cost is O(N * E * log(window_size)) rather than O(N * E * window_size).
+
+    Parameters
+    ----------
+    tensor: torch.tensor
+        2 dimensional tensor of shape (N, E)
+    window_size: int
+        number of consecutive rows in each window; must be between 1 and N
+
+    Returns
+    -------
+    max_tensor: torch.tensor
+        tensor of shape (N - window_size + 1, E). If a positive and a negative value
+        share the maximum magnitude within a window, the positive value is returned.
+    """
+    if torch.is_tensor(tensor) is False:
+        msg = "tensor must be of type 'torch.Tensor' not {}".format(type(tensor))
+        logging.error(msg)
+        raise TypeError(msg)
+    if isinstance(window_size, int) is False:
+        msg = "window_size must be of type 'int' not {}".format(type(window_size))
+        logging.error(msg)
+        raise TypeError(msg)
+    if window_size < 1 or window_size > tensor.shape[0]:
+        raise ValueError(
+            "window_size must be between 1 and {}, not {}"
+            "".format(tensor.shape[0], window_size)
+        )
+
+    def sliding_window_max(values: torch.tensor) -> torch.tensor:
+        # window_max[i] = max(values[i : i + width])
+        window_max = values
+        width = 1
+        while width * 2 <= window_size:
+            window_max = torch.maximum(window_max[:-width], window_max[width:])
+            width *= 2
+        # combine two overlapping windows of 'width' to cover 'window_size' rows
+        remainder = window_size - width
+        if remainder > 0:
+            window_max = torch.maximum(window_max[:-remainder], window_max[remainder:])
+        return window_max
+
+    max_magnitudes = sliding_window_max(torch.abs(tensor))
+    max_values = sliding_window_max(tensor)
+    # the max magnitude comes from a positive value iff it equals the max value
+    return torch.where(max_values == max_magnitudes, max_magnitudes, -max_magnitudes)
+
+
+def prefix_sums_2d(
+    tensor: torch.tensor, prefix_sums: torch.tensor = None
+) -> torch.tensor:
+    """
+    Returns the prefix sums of the rows of 'tensor', accumulated in double precision
+    (single precision on mps, which has no double precision support).
+
+    If the prefix sums of the first M rows of 'tensor' are given, only the sums of the
+    remaining rows are computed. The running sum is continued from the last given
+    sum, so the result is identical to computing every sum again.
+
+    Parameters
+    ----------
+    tensor: torch.tensor
+        2 dimensional tensor of shape (N, E)
+    prefix_sums: torch.tensor
+        prefix sums of shape (M+1, E) of the first M rows of 'tensor', as returned by
+        this function. Default is None (every sum is computed)
+
+    Returns
+    -------
+    prefix_sums: torch.tensor
+        tensor of shape (N+1, E) where row i is the sum of the first i rows of 'tensor'
+    """
+    accumulate_dtype = torch.float64
+    if tensor.device.type == "mps":
+        accumulate_dtype = torch.float32
+
+    if prefix_sums is None:
+        prefix_sums = torch.zeros(
+            (1, tensor.shape[1]), dtype=accumulate_dtype, device=tensor.device
+        )
+    num_summed = len(prefix_sums) - 1
+    if num_summed > len(tensor):
+        err = "prefix_sums sums {} rows but 'tensor' only has {} rows".format(
+            num_summed, len(tensor)
+        )
+        logging.error(err)
+        raise ValueError(err)
+
+    new_sums = torch.cumsum(
+        torch.cat((prefix_sums[-1:], tensor[num_summed:].to(accumulate_dtype))), dim=0
+    )
+    return torch.cat((prefix_sums, new_sums[1:]))
+
+
+def _check_segment_inputs(
+    tensor: torch.tensor, segment_ids: torch.tensor, num_segments: int
+) -> None:
+    """
+    Raises an error if the inputs of a segment reduction are invalid.
+
+    Parameters
+    ----------
+    tensor: torch.tensor
+        2 dimensional tensor of shape (N, E)
+    segment_ids: torch.tensor
+        1 dimensional integer tensor of shape (N)
+    num_segments: int
+        number of segments
+
+    Returns
+    -------
+    None
+    """
+    if torch.is_tensor(tensor) is False:
+        msg = "tensor must be of type 'torch.Tensor' not {}".format(type(tensor))
+        logging.error(msg)
+        raise TypeError(msg)
+    if torch.is_tensor(segment_ids) is False:
+        msg = "segment_ids must be of type 'torch.Tensor' not {}".format(
+            type(segment_ids)
+        )
+        logging.error(msg)
+        raise TypeError(msg)
+    if isinstance(num_segments, int) is False:
+        msg = "num_segments must be of type 'int' not {}".format(type(num_segments))
+        logging.error(msg)
+        raise TypeError(msg)
+    if tensor.dim() != 2 or segment_ids.shape != (tensor.shape[0],):
+        raise ValueError(
+            "segment_ids must have shape ({},), not {}"
+            "".format(tensor.shape[0], tuple(segment_ids.shape))
+        )
+
+
+def segment_mean_2d(
+    tensor: torch.tensor, segment_ids: torch.tensor, num_segments: int
+) -> torch.tensor:
+    """
+    Returns the mean of the rows of 'tensor' within each segment.
+
+    Parameters
+    ----------
+    tensor: torch.tensor
+        2 dimensional tensor of shape (N, E)
+    segment_ids: torch.tensor
+        1 dimensional integer tensor of shape (N) where segment_ids[i] is the segment
+        of row i; every segment in [0, num_segments) must contain at least one row
+    num_segments: int
+        number of segments
+
+    Returns
+    -------
+    mean_tensor: torch.tensor
+        tensor of shape (num_segments, E) containing the mean of each segment
+    """
+    _check_segment_inputs(tensor, segment_ids, num_segments)
+
+    sums = tensor.new_zeros((num_segments, tensor.shape[1]))
+    sums.index_add_(0, segment_ids, tensor)
+    sizes = torch.bincount(segment_ids, minlength=num_segments)
+    return sums / sizes.unsqueeze(1).to(tensor.dtype)
+
+
+def segment_max_magnitude_2d(
+    tensor: torch.tensor, segment_ids: torch.tensor, num_segments: int
+) -> torch.tensor:
+    """
+    Returns the maximum magnitude value of each column within each segment of rows,
+    i.e. max_magnitude_2d(tensor[segment_ids == s], dim=0) for every segment s.
+
+    Parameters
+    ----------
+    tensor: torch.tensor
+        2 dimensional tensor of shape (N, E)
+    segment_ids: torch.tensor
+        1 dimensional integer tensor of shape (N) where segment_ids[i] is the segment
+        of row i; every segment in [0, num_segments) must contain at least one row
+    num_segments: int
+        number of segments
+
+    Returns
+    -------
+    max_tensor: torch.tensor
+        tensor of shape (num_segments, E). If a positive and a negative value share
+        the maximum magnitude within a segment, the positive value is returned.
+    """
+    _check_segment_inputs(tensor, segment_ids, num_segments)
+
+    index = segment_ids.unsqueeze(1).expand_as(tensor)
+    empty = tensor.new_zeros((num_segments, tensor.shape[1]))
+    max_magnitudes = empty.scatter_reduce(
+        0, index, torch.abs(tensor), reduce="amax", include_self=False
+    )
+    max_values = empty.scatter_reduce(
+        0, index, tensor, reduce="amax", include_self=False
+    )
+    # the max magnitude comes from a positive value iff it equals the max value
+    return torch.where(max_values == max_magnitudes, max_magnitudes, -max_magnitudes)
+
+
 def reset_seed(number):
     """
     Reset random seed to the specific number
@@ -14,7 +14,7 @@ setup(
     author_email="support@clipsai.com",
     url="https://clipsai.com/",
     license="MIT",
-    packages=find_packages(exclude=["tests*"]),
+    packages=find_packages(exclude=["benchmarks*", "tests*"]),
     install_requires=[
         "av",
         "facenet-pytorch",
@@ -60,5 +60,8 @@ setup(
             "pytest",
             "twine",
         ],
+        "onnx": [
+            "sentence-transformers[onnx]",
+        ],
     },
 )
@@ -1,8 +1,37 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+import numpy
 import pytest
+import torch
 from unittest.mock import MagicMock
-from clipsai.clip.clipfinder import ClipFinderConfigManager
-from clipsai.clip.texttiler import TextTilerConfigManager
+from clipsai.clip.agglomerative import AgglomerativeSegmenter
+from clipsai.clip.clip import Clip
+from clipsai.clip.clip_index import ClipIndex
+from clipsai.clip.clip_search_index import ClipSearchIndex
+from clipsai.clip.clip_set import ClipSet
+from clipsai.clip.clipfinder import ClipFinder, ClipFinderConfigManager
+from clipsai.clip.embedding_cache import EmbeddingCache
+from clipsai.clip.embedding_reducer import EmbeddingReducer
+from clipsai.clip.exceptions import (
+    ClipFinderError,
+    ClipSearchIndexError,
+    TextEmbedderError,
+)
+from clipsai.clip.incremental_clipfinder import IncrementalClipFinder
+from clipsai.clip.model_registry import ModelRegistry
+from clipsai.clip.sentence_spans import merge_sentences
+from clipsai.clip.text_embedder import BaseTextEmbedder, TextEmbedder
+from clipsai.clip.texttiler import (
+    TextTiler,
+    TextTilerConfigManager,
+    smooth,
+    smooth_tensor,
+)
 from clipsai.transcribe.transcription import Transcription
+from clipsai.utils.exceptions import ConfigError
+from clipsai.utils.pytorch import max_magnitude_2d
 
 
 @pytest.fixture
@@ -15,6 +44,17 @@ def texttiler_config_manager():
     return TextTilerConfigManager()
 
 
+@pytest.fixture
+def texttiler():
+    return TextTiler(device="cpu")
+
+
+@pytest.fixture
+def embeddings():
+    torch.manual_seed(0)
+    return torch.randn(60, 16)
+
+
 @pytest.fixture
 def valid_transcription():
     transcription = MagicMock(spec=Transcription)
@@ -77,3 +117,940 @@ def test_texttiler_config_manager_invalid_config(
         "window_compare_pool_method": "invalid_method",
     }
     assert isinstance(texttiler_config_manager.check_valid_config(config), str)
+
+
+# Testing TextTiler
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+@pytest.mark.parametrize("k", [2, 5, 7, 59])
+def test_calc_gap_scores_matches_reference(
+    texttiler: TextTiler, embeddings: torch.Tensor, pool_method: str, k: int
+):
+    gap_scores = texttiler._calc_gap_scores(embeddings, k, pool_method)
+    reference_gap_scores = texttiler._calc_gap_scores_reference(
+        embeddings, k, pool_method
+    )
+    assert gap_scores.shape == (len(embeddings) - 1,)
+    assert torch.allclose(gap_scores, reference_gap_scores, atol=1e-6)
+
+
+def _naive_depth_scores(gap_scores: list) -> list:
+    depth_scores = []
+    for gap, gap_score in enumerate(gap_scores):
+        left_peak = gap_score
+        for i in range(gap, -1, -1):
+            if gap_scores[i] < left_peak:
+                break
+            left_peak = gap_scores[i]
+        right_peak = gap_score
+        for i in range(gap, len(gap_scores)):
+            if gap_scores[i] < right_peak:
+                break
+            right_peak = gap_scores[i]
+        depth_scores.append((left_peak - gap_score) + (right_peak - gap_score))
+    return depth_scores
+
+
+def test_calc_depth_scores_matches_naive_walk(texttiler: TextTiler):
+    torch.manual_seed(0)
+    # rounded scores so that runs of equal scores are exercised
+    gap_scores = torch.round(torch.rand(200) * 10) / 10
+    depth_scores = texttiler._calc_depth_scores(gap_scores)
+    expected = torch.tensor(_naive_depth_scores(gap_scores.tolist()))
+    assert torch.allclose(depth_scores, expected, atol=1e-6)
+
+
+def test_identify_boundaries(texttiler: TextTiler):
+    depth_scores = torch.tensor([0.0, 0.9, 0.1, 0.1, 0.1, 0.8, 0.8, 0.0, 0.2])
+    boundaries = texttiler._identify_boundaries(depth_scores, "average")
+    assert boundaries.tolist() == [0, 1, 0, 0, 0, 1, 1, 0, 0, 1]
+
+
+@pytest.mark.parametrize(
+    "window", ["flat", "hanning", "hamming", "bartlett", "blackman"]
+)
+@pytest.mark.parametrize("window_len", [3, 4, 7])
+@pytest.mark.parametrize("num_scores", [7, 8, 50])
+def test_smooth_tensor_matches_smooth(window: str, window_len: int, num_scores: int):
+    torch.manual_seed(0)
+    scores = torch.rand(3, num_scores)
+    smoothed = smooth_tensor(scores, window_len, window)
+    for row, smoothed_row in zip(scores, smoothed):
+        expected = torch.Tensor(list(smooth(row.numpy(), window_len, window)))
+        assert smoothed_row.shape == expected.shape
+        assert torch.allclose(smoothed_row, expected, atol=1e-6)
+
+
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+def test_pool_embedding_groups(
+    texttiler: TextTiler, embeddings: torch.Tensor, pool_method: str
+):
+    boundaries = torch.zeros(len(embeddings))
+    boundaries[[0, 4, 5, 30, len(embeddings) - 1]] = 1
+    pooled_embeddings = texttiler._pool_embedding_groups(
+        embeddings, boundaries, pool_method
+    )
+
+    pool = torch.mean if pool_method == "mean" else max_magnitude_2d
+    groups = [(0, 1), (1, 5), (5, 6), (6, 31), (31, len(embeddings))]
+    expected = torch.stack(
+        [pool(embeddings[start:end], dim=0) for start, end in groups]
+    )
+    assert torch.allclose(pooled_embeddings, expected, atol=1e-6)
+    # boundaries given as a list are pooled the same way
+    assert torch.equal(
+        texttiler._pool_embedding_groups(embeddings, list(boundaries), pool_method),
+        pooled_embeddings,
+    )
+
+
+# Testing ModelRegistry
+def test_model_registry_loads_each_model_once():
+    loads = []
+
+    def loader(model_name, device, precision, backend):
+        time.sleep(0.01)
+        loads.append((model_name, device, precision, backend))
+        return object()
+
+    registry = ModelRegistry(max_resident_models=2, loader=loader)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        models = list(executor.map(lambda _: registry.get("model-a"), range(16)))
+
+    assert loads == [("model-a", None, "float32", "torch")]
+    assert all(model is models[0] for model in models)
+
+
+def test_model_registry_evicts_least_recently_used_model():
+    registry = ModelRegistry(max_resident_models=2, loader=lambda *args: args[0])
+    registry.warmup("model-a")
+    registry.warmup("model-b")
+    registry.get("model-a")
+    registry.warmup("model-c")
+    assert registry.loaded_models == [
+        ("model-a", None, "float32", "torch"),
+        ("model-c", None, "float32", "torch"),
+    ]
+
+    registry.max_resident_models = 1
+    assert registry.loaded_models == [("model-c", None, "float32", "torch")]
+
+    registry.unload("model-c")
+    assert registry.is_loaded("model-c") is False
+
+
+def test_model_registry_invalid_max_resident_models():
+    with pytest.raises(TextEmbedderError):
+        ModelRegistry(max_resident_models=0)
+
+
+def test_text_embedders_share_model_registry():
+    loads = []
+
+    def loader(model_name, device, precision, backend):
+        loads.append(model_name)
+        model = MagicMock()
+        model.encode.side_effect = lambda sentences, **kwargs: numpy.ones(
+            (len(sentences), 4)
+        )
+        return model
+
+    registry = ModelRegistry(loader=loader)
+    for _ in range(3):
+        embedder = TextEmbedder(model_registry=registry)
+        assert embedder.embed_sentences(["a", "b"]).shape == (2, 4)
+    assert loads == ["all-roberta-large-v1"]
+
+
+# Testing EmbeddingCache
+def _fake_model_registry(loads: list) -> ModelRegistry:
+    def loader(model_name, device, precision, backend):
+        loads.append(model_name)
+        model = MagicMock()
+        model.tokenizer.side_effect = lambda sentences: {
+            "input_ids": [s.split() for s in sentences]
+        }
+        model.encode.side_effect = lambda sentences, **kwargs: numpy.array(
+            [[len(s.split()), len("".join(s.split()))] for s in sentences],
+            dtype=numpy.float32,
+        )
+        return model
+
+    return ModelRegistry(loader=loader)
+
+
+def test_embedding_cache_second_pass_skips_model(tmp_path):
+    loads = []
+    cache = EmbeddingCache(str(tmp_path))
+    embedder = TextEmbedder(
+        model_registry=_fake_model_registry(loads), embedding_cache=cache
+    )
+    sentences = ["Hello there.", "How are you?", "Hello  there. "]
+
+    first_pass = embedder.embed_sentences(sentences)
+    assert cache.get_stats()["misses"] == 3
+    # normalized text shares an entry
+    assert cache.num_entries(embedder.model_name) == 2
+
+    # a new process sees the persisted cache and never loads the model
+    loads.clear()
+    cache = EmbeddingCache(str(tmp_path))
+    embedder = TextEmbedder(
+        model_registry=_fake_model_registry(loads), embedding_cache=cache
+    )
+    second_pass = embedder.embed_sentences(sentences)
+    assert loads == []
+    assert cache.hits == 3 and cache.misses == 0
+    assert torch.equal(second_pass, first_pass)
+
+
+def test_embedding_cache_evicts_least_recently_used(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_entries=2)
+    cache.store("model", ["a", "b"], numpy.eye(2, 3))
+    cache.lookup("model", ["a"])
+    cache.store("model", ["c"], numpy.ones((1, 3)))
+
+    found, missing = cache.lookup("model", ["a", "b", "c"])
+    assert missing == [1]
+    assert numpy.array_equal(found[0], [1, 0, 0])
+    assert numpy.array_equal(found[2], [1, 1, 1])
+
+
+def test_embedding_cache_shared_between_processes(tmp_path):
+    # two caches on the same directory behave like two worker processes
+    first = EmbeddingCache(str(tmp_path), max_entries=3)
+    second = EmbeddingCache(str(tmp_path), max_entries=3)
+    first.store("model", ["a", "b"], numpy.eye(2, 4))
+    index_path = first._get_path("model", ".index")
+    index_mtime = os.stat(index_path).st_mtime_ns
+
+    # stores append to the log instead of rewriting the index
+    second.store("model", ["c", "d"], 2 * numpy.ones((2, 4)))
+    first.store("model", ["e"], 3 * numpy.ones((1, 4)))
+    assert os.stat(index_path).st_mtime_ns == index_mtime
+    # the matrix grows with the cache instead of holding max_entries rows up front
+    matrix_path = first._get_path("model", ".f32")
+    assert os.path.getsize(matrix_path) == 3 * 4 * 4
+
+    # each cache sees the other's stores and evictions
+    for cache in (first, second):
+        found, missing = cache.lookup("model", ["a", "b", "c", "d", "e"])
+        assert missing == [0, 1]
+        assert numpy.array_equal(found[2], [2, 2, 2, 2])
+        assert numpy.array_equal(found[4], [3, 3, 3, 3])
+
+    # flush() atomically replaces the snapshot, which the other cache reloads
+    first.flush()
+    assert os.stat(index_path).st_mtime_ns != index_mtime
+    assert not os.path.exists(index_path + ".tmp")
+    second.store("model", ["f"], 4 * numpy.ones((1, 4)))
+    assert EmbeddingCache(str(tmp_path)).num_entries("model") == 3
+    found, missing = first.lookup("model", ["c", "d", "e", "f"])
+    assert missing == [0] and numpy.array_equal(found[3], [4, 4, 4, 4])
+
+
+def test_text_embedder_encodes_sentences_in_one_call():
+    sentences = ["a b c", "a", "a b c d e", "a b", "a b c d"]
+    registry = _fake_model_registry([])
+    embeddings = TextEmbedder(model_registry=registry, batch_size=2).embed_sentences(
+        sentences
+    )
+    model = registry.get("all-roberta-large-v1", None, "float32", "torch")
+    model.encode.assert_called_once_with(sentences, batch_size=2)
+    assert embeddings[:, 0].tolist() == [3, 1, 5, 2, 4]
+
+
+def test_text_embedder_invalid_config():
+    with pytest.raises(ConfigError):
+        TextEmbedder(precision="float8")
+    with pytest.raises(ConfigError):
+        TextEmbedder(precision="int8", device="cuda")
+    with pytest.raises(ConfigError):
+        TextEmbedder(batch_size=0)
+    with pytest.raises(ConfigError):
+        TextEmbedder(backend="tensorrt")
+    with pytest.raises(ConfigError):
+        TextEmbedder(backend="onnx", precision="float16")
+
+
+# Testing pluggable embedders
+class _WordCountEmbedder(BaseTextEmbedder):
+    @property
+    def model_name(self) -> str:
+        return "word-count"
+
+    def _encode(self, sentences: list) -> numpy.ndarray:
+        return numpy.array([[len(s.split()), 1.0] for s in sentences], numpy.float32)
+
+
+def test_clip_finder_accepts_custom_embedder(tmp_path):
+    embedder = _WordCountEmbedder(embedding_cache=EmbeddingCache(str(tmp_path)))
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    assert clip_finder.embedder is embedder
+
+    embeddings = clip_finder.embedder.embed_sentences(["a b", "a"])
+    assert embeddings.tolist() == [[2.0, 1.0], [1.0, 1.0]]
+    assert embedder.embedding_cache.num_entries("word-count") == 2
+
+
+def test_clip_finder_embedder_presets():
+    clip_finder = ClipFinder(device="cpu", embedder="minilm")
+    assert clip_finder.embedder.model_name == "all-MiniLM-L6-v2"
+    assert TextEmbedder(backend="onnx").cache_name == "all-roberta-large-v1:onnx"
+    with pytest.raises(TypeError):
+        ClipFinder(device="cpu", embedder=3)
+
+
+# Testing multi-scale TextTiling
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+def test_text_tile_multi_scale_matches_text_tile(
+    texttiler: TextTiler, embeddings: torch.Tensor, pool_method: str
+):
+    k_values = [5, 7, 11, 17, 37, 53]
+    results = texttiler.text_tile_multi_scale(embeddings, k_values, pool_method)
+    for k, (boundaries, pooled_embeddings) in zip(k_values, results):
+        expected_boundaries, expected_embeddings = texttiler.text_tile(
+            embeddings, k, pool_method
+        )
+        assert torch.equal(torch.stack(boundaries), torch.stack(expected_boundaries))
+        assert torch.equal(pooled_embeddings, expected_embeddings)
+
+
+def _synthetic_document(num_sentences: int, seed: int = 0) -> tuple:
+    """
+    Returns a mock transcription, its sentence info and topical sentence embeddings.
+    """
+    generator = torch.Generator().manual_seed(seed)
+    topics = torch.randn(num_sentences // 20 + 1, 16, generator=generator)
+    embeddings = topics[torch.arange(num_sentences) // 20]
+    embeddings = embeddings + 0.8 * torch.randn(num_sentences, 16, generator=generator)
+    durations = torch.rand(num_sentences, generator=generator) * 8 + 1
+    end_times = torch.cumsum(durations, dim=0).tolist()
+    sentences_info = []
+    for i in range(num_sentences):
+        sentences_info.append(
+            {
+                "sentence": "Document {} sentence {}.".format(seed, i),
+                "start_char": i * 13,
+                "end_char": i * 13 + 12,
+                "start_time": end_times[i - 1] if i > 0 else 0.0,
+                "end_time": end_times[i],
+            }
+        )
+    transcription = MagicMock(spec=Transcription)
+    transcription.end_time = end_times[-1]
+    transcription.get_char_info.return_value = [None] * (num_sentences * 13)
+    transcription.get_sentence_info.return_value = sentences_info
+    return transcription, sentences_info, embeddings
+
+
+def _clip_tuples(clips: list) -> list[tuple]:
+    return [(c.start_time, c.end_time, c.start_char, c.end_char) for c in clips]
+
+
+@pytest.mark.parametrize("num_sentences", [9, 120, 700])
+def test_clip_finder_multi_scale_tiling_matches_sequential(num_sentences: int):
+    transcription, sentences_info, embeddings = _synthetic_document(num_sentences)
+    embedder = _WordCountEmbedder()
+    sequential = ClipFinder(device="cpu", embedder=embedder)
+    multi_scale = ClipFinder(device="cpu", embedder=embedder, multi_scale_tiling=True)
+
+    expected = sequential._find_clips_from_embeddings(
+        transcription, sentences_info, embeddings
+    )
+    clips = multi_scale._find_clips_from_embeddings(
+        transcription, sentences_info, embeddings
+    )
+    assert len(expected) > 0
+    assert _clip_tuples(clips) == _clip_tuples(expected)
+
+
+# Testing ClipIndex
+def test_clip_index_matches_brute_force_duplicate_check():
+    rng = numpy.random.default_rng(0)
+    starts = rng.uniform(0, 600, size=400)
+    clips = [
+        {"start_time": start, "end_time": start + duration}
+        for start, duration in zip(starts, rng.uniform(1, 120, size=400))
+    ]
+    accepted, candidates = clips[:200], clips[200:]
+    clip_index = ClipIndex(accepted)
+    assert clip_index.clips == accepted
+
+    for candidate in candidates:
+        expected = any(
+            abs(candidate["start_time"] - clip["start_time"])
+            + abs(candidate["end_time"] - clip["end_time"])
+            < 15
+            for clip in accepted
+        )
+        assert clip_index.has_duplicate(candidate) is expected
+
+
+# Testing find_clips_many
+class _LookupEmbedder(BaseTextEmbedder):
+    def __init__(self, embeddings: dict) -> None:
+        super().__init__()
+        self.calls = []
+        self._embeddings = embeddings
+
+    @property
+    def model_name(self) -> str:
+        return "lookup"
+
+    def _encode(self, sentences: list) -> numpy.ndarray:
+        self.calls.append(len(sentences))
+        return torch.stack([self._embeddings[s] for s in sentences]).numpy()
+
+
+def test_clip_finder_find_clips_many_matches_find_clips():
+    documents = [_synthetic_document(n, seed) for seed, n in enumerate([300, 9, 80])]
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for _, sentences_info, embeddings in documents
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    results = clip_finder.find_clips_many(
+        [transcription for transcription, _, _ in documents], num_workers=2
+    )
+    # every sentence is embedded in a single call
+    assert embedder.calls == [389]
+
+    assert [result["num_sentences"] for result in results] == [300, 9, 80]
+    for result, (transcription, _, _) in zip(results, documents):
+        expected = clip_finder.find_clips(transcription)
+        assert _clip_tuples(result["clips"]) == _clip_tuples(expected)
+        assert result["tiling_time"] >= 0 and result["embedding_time"] >= 0
+
+
+# Testing IncrementalClipFinder
+@pytest.mark.parametrize("pool_method", ["mean", "max"])
+def test_incremental_clip_finder_matches_full_run(pool_method: str):
+    transcription, sentences_info, embeddings = _synthetic_document(400)
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    embedder._embeddings["Still speaking"] = torch.ones(16)
+    clip_finder = ClipFinder(
+        device="cpu", embedder=embedder, window_compare_pool_method=pool_method
+    )
+    incremental_clip_finder = IncrementalClipFinder(
+        device="cpu", embedder=embedder, window_compare_pool_method=pool_method
+    )
+
+    for num_sentences in [5, 40, 41, 120, 250, 400]:
+        chunk = MagicMock(spec=Transcription)
+        chunk.end_time = sentences_info[num_sentences - 1]["end_time"]
+        chunk.get_char_info.return_value = [None] * (num_sentences * 13)
+        # the last sentence of a chunk may still change in the next chunk
+        chunk.get_sentence_info.return_value = sentences_info[:num_sentences] + [
+            dict(sentences_info[num_sentences - 1], sentence="Still speaking")
+        ]
+        incremental_clip_finder.find_clips(chunk)
+
+        chunk.get_sentence_info.return_value = sentences_info[:num_sentences]
+        embedder.calls.clear()
+        clips = incremental_clip_finder.find_clips(chunk)
+        # the changed sentence is dropped and nothing is embedded again
+        assert embedder.calls == []
+        assert _clip_tuples(clips) == _clip_tuples(clip_finder.find_clips(chunk))
+
+
+# Testing iter_clips
+def test_clip_finder_iter_clips_yields_clips_as_they_are_chosen():
+    transcription, sentences_info, embeddings = _synthetic_document(700)
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    clip_finder = ClipFinder(device="cpu", embedder=embedder, max_clip_duration=9000)
+    clip_finder._text_tile = MagicMock(side_effect=clip_finder._text_tile)
+
+    clips = clip_finder.iter_clips(transcription)
+    # the full media clip is yielded before any tiling
+    first_clip, k, text_tile_round = next(clips)
+    assert (k, text_tile_round) == (None, 0)
+    assert clip_finder._text_tile.call_count == 0
+
+    # the first clip of k=5 is yielded after its first round
+    second_clip, k, text_tile_round = next(clips)
+    assert (k, text_tile_round) == (5, 1)
+    assert clip_finder._text_tile.call_count == 1
+
+    remaining = list(clips)
+    schedule = [k for k, _ in clip_finder._get_tiling_schedule()]
+    schedule_positions = [schedule.index(k) for _, k, _ in remaining]
+    assert schedule_positions == sorted(schedule_positions)
+    all_clips = [first_clip, second_clip] + [clip for clip, _, _ in remaining]
+    assert _clip_tuples(all_clips) == _clip_tuples(
+        clip_finder.find_clips(transcription)
+    )
+
+
+# Testing ClipSet
+def test_clip_set_queries_match_clip_lists():
+    clips = [
+        Clip(30.0, 95.5, 300, 950),
+        Clip(0.0, 20.0, 0, 200),
+        Clip(10.0, 200.0, 100, 2000),
+        Clip(95.5, 120.0, 950, 1200),
+    ]
+    clip_set = ClipSet.from_clips(clips)
+    assert len(clip_set) == 4
+    assert list(clip_set) == clips
+    assert clip_set[2] == clips[2]
+    assert isinstance(clip_set[2].start_char, int)
+    assert clip_set[1:3].to_list() == clips[1:3]
+
+    assert clip_set.filter_by_duration(20, 60).to_list() == [clips[1], clips[3]]
+    assert clip_set.sort().to_list() == sorted(clips, key=lambda c: c.start_time)
+    assert clip_set.sort("duration", descending=True).to_list() == [
+        clips[2],
+        clips[0],
+        clips[3],
+        clips[1],
+    ]
+    # clips ending at the start of the range don't overlap it
+    assert clip_set.overlapping(95.5, 100).to_list() == [clips[2], clips[3]]
+    assert clip_set.to_dicts() == [clip.to_dict() for clip in clips]
+    assert ClipSet.from_dicts(clip_set.to_dicts()) == clip_set
+
+
+def test_clip_set_columns_are_shared_and_read_only():
+    start_times = numpy.array([0.0, 10.0, 20.0])
+    clip_set = ClipSet(start_times, start_times + 5, [0, 10, 20], [5, 15, 25])
+    columns = clip_set.columns()
+    assert numpy.shares_memory(columns["start_time"], start_times)
+    assert numpy.shares_memory(clip_set[1:].start_times, start_times)
+    with pytest.raises(ValueError):
+        columns["start_time"][0] = 1.0
+    # the caller's array stays writeable
+    start_times[0] = 1.0
+
+    with pytest.raises(ClipFinderError):
+        clip_set.sort("norm")
+    with pytest.raises(ClipFinderError):
+        ClipSet([0.0], [1.0, 2.0], [0], [1])
+
+
+def test_clip_finder_find_clip_set_matches_find_clips():
+    transcription, sentences_info, embeddings = _synthetic_document(300)
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    clip_set = clip_finder.find_clip_set(transcription)
+    assert _clip_tuples(clip_set) == _clip_tuples(clip_finder.find_clips(transcription))
+
+
+# Testing EmbeddingReducer
+def test_embedding_reducer_pca_keeps_dot_products():
+    torch.manual_seed(0)
+    # embeddings of rank 8 keep their dot products when reduced to 8 dimensions
+    embeddings = torch.randn(100, 8) @ torch.randn(8, 32)
+    reducer = EmbeddingReducer("pca", dim=8, device="cpu")
+    reduced = reducer.reduce(embeddings)
+    assert reduced.shape == (100, 8)
+    assert torch.allclose(
+        reduced @ reduced.T, embeddings @ embeddings.T, rtol=1e-4, atol=1e-3
+    )
+
+
+def test_embedding_reducer_random_projection_and_precision():
+    torch.manual_seed(0)
+    embeddings = torch.randn(50, 64)
+    reducer = EmbeddingReducer(
+        "random_projection", dim=16, precision="float16", device="cpu"
+    )
+    reduced = reducer.reduce(embeddings)
+    assert reduced.shape == (50, 16)
+    assert reduced.dtype == torch.float16
+    # the projection is fixed
+    assert torch.equal(reducer.reduce(embeddings), reduced)
+    # embeddings with at most 'dim' dimensions only change precision
+    small_embeddings = torch.randn(50, 8)
+    assert torch.equal(reducer.reduce(small_embeddings), small_embeddings.half())
+
+    with pytest.raises(ConfigError):
+        EmbeddingReducer("svd", device="cpu")
+    with pytest.raises(ConfigError):
+        EmbeddingReducer("pca", precision="bfloat16", device="cpu")
+
+
+def test_clip_finder_reduced_embeddings():
+    transcription, sentences_info, embeddings = _synthetic_document(300)
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    reduced_clip_finder = ClipFinder(
+        device="cpu",
+        embedder=embedder,
+        embedding_reduction="random_projection",
+        reduced_embedding_dim=8,
+        tiling_precision="float16",
+    )
+    # clips are found from the reduced embeddings
+    reducer = EmbeddingReducer(
+        "random_projection", dim=8, precision="float16", device="cpu"
+    )
+    expected = clip_finder._find_clips_from_embeddings(
+        transcription, sentences_info, reducer.reduce(embeddings)
+    )
+    clips = reduced_clip_finder.find_clips(transcription)
+    assert len(clips) > 0
+    assert _clip_tuples(clips) == _clip_tuples(expected)
+
+
+# Testing sentence spans
+def test_merge_sentences_respects_budgets():
+    sentences_info = [
+        {"sentence": text, "start_char": i * 10, "end_char": i * 10 + 9}
+        for i, text in enumerate(["Yeah.", "Right.", "A b c d.", "Okay.", "So."])
+    ]
+    for i, sentence_info in enumerate(sentences_info):
+        sentence_info["start_time"] = float(i)
+        sentence_info["end_time"] = i + 1.0
+
+    spans = merge_sentences(sentences_info, max_span_words=3)
+    assert [span["sentence"] for span in spans] == [
+        "Yeah. Right.",
+        "A b c d.",
+        "Okay. So.",
+    ]
+    assert [(span["start_char"], span["end_char"]) for span in spans] == [
+        (0, 19),
+        (20, 29),
+        (30, 49),
+    ]
+    assert [(span["start_time"], span["end_time"]) for span in spans] == [
+        (0.0, 2.0),
+        (2.0, 3.0),
+        (3.0, 5.0),
+    ]
+    spans = merge_sentences(sentences_info, max_span_duration=2.5)
+    assert [span["end_time"] for span in spans] == [2.0, 4.0, 5.0]
+    # the sentence info isn't modified
+    assert sentences_info[0]["sentence"] == "Yeah."
+    assert merge_sentences(sentences_info) is sentences_info
+
+
+def test_clip_finder_embeds_spans():
+    transcription, sentences_info, _ = _synthetic_document(600)
+    embedder = MagicMock(spec=BaseTextEmbedder)
+    generator = torch.Generator().manual_seed(0)
+    embedder.embed_sentences.side_effect = lambda sentences: torch.randn(
+        len(sentences), 16, generator=generator
+    )
+    clip_finder = ClipFinder(device="cpu", embedder=embedder, max_span_words=12)
+    clips = clip_finder.find_clips(transcription)
+
+    # every span holds 3 sentences of 4 words
+    spans = merge_sentences(sentences_info, max_span_words=12)
+    assert len(spans) == 200
+    assert embedder.embed_sentences.call_args[0][0] == [
+        span["sentence"] for span in spans
+    ]
+    span_start_chars = {span["start_char"] for span in spans}
+    span_end_chars = {span["end_char"] for span in spans}
+    for clip in clips:
+        assert clip.start_char in span_start_chars
+        assert clip.end_char in span_end_chars
+
+    with pytest.raises(ConfigError):
+        ClipFinder(device="cpu", embedder=embedder, max_span_words=0)
+    with pytest.raises(ConfigError):
+        ClipFinder(device="cpu", embedder=embedder, max_span_duration=-1.0)
+
+
+# Testing find_clips_in_range
+def test_clip_finder_find_clips_in_range():
+    transcription, sentences_info, embeddings = _synthetic_document(600)
+    transcription.find_sentence_index.side_effect = lambda time, _: next(
+        i for i, info in enumerate(sentences_info) if info["end_time"] >= time
+    )
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    start_time = sentences_info[100]["start_time"] + 0.5
+    end_time = sentences_info[250]["end_time"] - 0.5
+    clips = clip_finder.find_clips_in_range(transcription, start_time, end_time)
+
+    # only the sentences of the range are embedded
+    range_info = sentences_info[100:251]
+    assert embedder.calls == [len(range_info)]
+    # the range is the first clip
+    assert _clip_tuples(clips[:1]) == [
+        (
+            range_info[0]["start_time"],
+            range_info[-1]["end_time"],
+            range_info[0]["start_char"],
+            range_info[-1]["end_char"],
+        )
+    ]
+    for clip in clips:
+        assert range_info[0]["start_char"] <= clip.start_char
+        assert clip.end_char <= range_info[-1]["end_char"]
+
+    # the incremental clip finder reuses the embeddings of the full transcription
+    incremental_clip_finder = IncrementalClipFinder(device="cpu", embedder=embedder)
+    incremental_clip_finder.find_clips(transcription)
+    embedder.calls.clear()
+    incremental_clips = incremental_clip_finder.find_clips_in_range(
+        transcription, start_time, end_time
+    )
+    assert embedder.calls == []
+    assert incremental_clip_finder.num_sentences == 600
+    assert _clip_tuples(incremental_clips) == _clip_tuples(clips)
+
+    with pytest.raises(ClipFinderError):
+        clip_finder.find_clips_in_range(transcription, end_time, start_time)
+
+
+def test_incremental_clip_finder_find_clips_in_range_with_spans():
+    transcription, sentences_info, _ = _synthetic_document(600)
+    transcription.find_sentence_index.side_effect = lambda time, _: next(
+        i for i, info in enumerate(sentences_info) if info["end_time"] >= time
+    )
+    embedder = MagicMock(spec=BaseTextEmbedder)
+    generator = torch.Generator().manual_seed(0)
+    embedder.embed_sentences.side_effect = lambda sentences: torch.randn(
+        len(sentences), 16, generator=generator
+    )
+    clip_finder = IncrementalClipFinder(
+        device="cpu", embedder=embedder, max_span_words=12
+    )
+    clip_finder.find_clips(transcription)
+    assert embedder.embed_sentences.call_count == 1
+    start_time = sentences_info[100]["start_time"] + 0.5
+    end_time = sentences_info[250]["end_time"] - 0.5
+    clips = clip_finder.find_clips_in_range(transcription, start_time, end_time)
+
+    # the range maps onto the stored spans of 3 sentences containing sentences
+    # 100 - 250, so nothing is embedded again
+    assert embedder.embed_sentences.call_count == 1
+    assert _clip_tuples(clips[:1]) == [
+        (
+            sentences_info[99]["start_time"],
+            sentences_info[251]["end_time"],
+            sentences_info[99]["start_char"],
+            sentences_info[251]["end_char"],
+        )
+    ]
+    spans = merge_sentences(sentences_info, max_span_words=12)
+    span_start_chars = {span["start_char"] for span in spans}
+    for clip in clips:
+        assert clip.start_char in span_start_chars
+
+    # without stored embeddings the range is merged and embedded on its own
+    clip_finder.reset()
+    clip_finder.find_clips_in_range(transcription, start_time, end_time)
+    assert embedder.embed_sentences.call_count == 2
+
+
+# Testing agglomerative segmentation
+def _naive_ward_merges(embeddings: torch.Tensor) -> list[tuple[int, int]]:
+    """
+    Returns the (first sentence, last sentence) of each merged segment, merging the
+    adjacent segments with the lowest Ward cost by scanning every pair.
+    """
+    unit = embeddings.double() / torch.linalg.norm(embeddings.double(), dim=1)[:, None]
+    segments = [(i, i) for i in range(len(embeddings))]
+    merges = []
+    while len(segments) > 1:
+        costs = []
+        for (ls, le), (rs, re) in zip(segments[:-1], segments[1:]):
+            n_left, n_right = le - ls + 1, re - rs + 1
+            diff = unit[ls : le + 1].mean(0) - unit[rs : re + 1].mean(0)
+            costs.append(n_left * n_right / (n_left + n_right) * torch.dot(diff, diff))
+        i = int(torch.argmin(torch.stack(costs)))
+        merged = (segments[i][0], segments[i + 1][1])
+        segments[i : i + 2] = [merged]
+        merges.append(merged)
+    return merges
+
+
+def test_agglomerative_merge_tree_matches_naive_merges():
+    _, _, embeddings = _synthetic_document(80)
+    tree = AgglomerativeSegmenter().build_merge_tree(embeddings)
+    num_sentences = len(embeddings)
+    merges = [
+        (int(tree.starts[num_sentences + i]), int(tree.ends[num_sentences + i]))
+        for i in range(num_sentences - 1)
+    ]
+    assert merges == _naive_ward_merges(embeddings)
+    assert (tree.starts[tree.root], tree.ends[tree.root]) == (0, num_sentences - 1)
+    for merge, (left, right) in enumerate(tree.children):
+        assert tree.starts[left] == tree.starts[num_sentences + merge]
+        assert tree.ends[left] + 1 == tree.starts[right]
+
+
+def test_clip_finder_agglomerative_mode():
+    transcription, sentences_info, embeddings = _synthetic_document(700)
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    clip_finder = ClipFinder(
+        device="cpu", embedder=embedder, segmentation_mode="agglomerative"
+    )
+    clips = list(clip_finder.iter_clips(transcription))
+    assert len(clips) > 0
+
+    duration_bands = clip_finder._get_duration_bands()
+    assert duration_bands == [(15, 180), (180, 600), (600, 900)]
+    for clip, k, band in clips:
+        assert k is None
+        min_secs, max_secs = duration_bands[band - 1]
+        assert min_secs <= clip.end_time - clip.start_time <= max_secs
+    # the clips of a band don't overlap
+    for band in range(1, len(duration_bands) + 1):
+        band_clips = sorted(
+            (clip.start_char, clip.end_char) for clip, _, b in clips if b == band
+        )
+        for (_, end_char), (start_char, _) in zip(band_clips[:-1], band_clips[1:]):
+            assert end_char <= start_char
+    # no duplicates
+    index = ClipIndex()
+    for clip, _, _ in clips:
+        assert index.has_duplicate(clip.to_dict()) is False
+        index.add([clip.to_dict()])
+
+    with pytest.raises(ConfigError):
+        ClipFinder(device="cpu", embedder=embedder, segmentation_mode="kmeans")
+
+
+def test_clip_finder_find_clips_with_embeddings():
+    transcription, sentences_info, embeddings = _synthetic_document(700)
+    embedder = _LookupEmbedder(
+        {
+            sentence_info["sentence"]: embedding
+            for sentence_info, embedding in zip(sentences_info, embeddings)
+        }
+    )
+    # clips of every mode are pooled from exactly their sentences
+    for segmentation_mode, pool_method in [
+        ("texttiling", "max"),
+        ("texttiling", "mean"),
+        ("agglomerative", "max"),
+    ]:
+        clip_finder = ClipFinder(
+            device="cpu",
+            embedder=embedder,
+            segmentation_mode=segmentation_mode,
+            embedding_aggregation_pool_method=pool_method,
+        )
+        clips, clip_embeddings = clip_finder.find_clips_with_embeddings(transcription)
+        expected_clips = clip_finder.find_clips(transcription)
+        assert _clip_tuples(clips) == _clip_tuples(expected_clips)
+        assert clip_embeddings.shape == (len(clips), 16)
+        for clip, clip_embedding in zip(clips, clip_embeddings):
+            clip_sentences = embeddings[clip.start_char // 13 : clip.end_char // 13 + 1]
+            if pool_method == "max":
+                expected = max_magnitude_2d(clip_sentences, dim=0)
+            else:
+                expected = clip_sentences.mean(dim=0)
+            assert torch.allclose(clip_embedding, expected, atol=1e-6)
+
+    # a transcription without sentences has no clip embeddings
+    empty_transcription = MagicMock(spec=Transcription)
+    empty_transcription.end_time = 60.0
+    empty_transcription.get_char_info.return_value = [None] * 5
+    empty_transcription.get_sentence_info.return_value = []
+    embedder = MagicMock(spec=BaseTextEmbedder)
+    embedder.embed_sentences.return_value = torch.empty(0, 16)
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    clips, clip_embeddings = clip_finder.find_clips_with_embeddings(empty_transcription)
+    assert clips == [] and clip_embeddings.shape == (0, 16)
+
+    embedder = _LookupEmbedder({"query": torch.ones(16)})
+    clip_finder = ClipFinder(device="cpu", embedder=embedder)
+    assert torch.equal(clip_finder.embed_query("query"), torch.ones(16))
+    clip_finder = ClipFinder(
+        device="cpu",
+        embedder=embedder,
+        embedding_reduction="pca",
+        reduced_embedding_dim=4,
+    )
+    with pytest.raises(ClipFinderError):
+        clip_finder.embed_query("query")
+
+
+def _index_clips(num_clips: int) -> list[Clip]:
+    return [
+        Clip(i * 10.0, i * 10.0 + 30, i * 100, i * 100 + 250) for i in range(num_clips)
+    ]
+
+
+def test_clip_search_index_search_and_persistence(tmp_path):
+    generator = torch.Generator().manual_seed(0)
+    vectors = {
+        media_id: torch.randn(num_clips, 24, generator=generator)
+        for media_id, num_clips in [("a", 300), ("b", 50), ("c", 700)]
+    }
+    index = ClipSearchIndex(str(tmp_path), initial_capacity=64)
+    for media_id, media_vectors in vectors.items():
+        index.add(media_id, _index_clips(len(media_vectors)), media_vectors)
+    assert len(index) == 1050 and index.dim == 24
+    assert index.get_media_ids() == ["a", "b", "c"]
+    # adding nothing, e.g. the clips of a transcription without sentences, is a no-op
+    index.add("d", [], torch.empty(0))
+    assert len(index) == 1050 and index.get_media_ids() == ["a", "b", "c"]
+    # the json metadata doesn't grow with the number of clips
+    assert os.path.getsize(os.path.join(str(tmp_path), "clip_index.json")) < 200
+
+    all_vectors = torch.nn.functional.normalize(torch.cat(list(vectors.values())))
+    query = torch.randn(24, generator=generator)
+    expected_scores = all_vectors @ torch.nn.functional.normalize(query, dim=0)
+    results = index.search(query, k=5)
+    assert [r["score"] for r in results] == pytest.approx(
+        expected_scores.topk(5).values.tolist(), abs=1e-5
+    )
+    best_row = int(expected_scores.argmax())
+    assert results[0]["media_id"] == "c" and best_row >= 350
+    assert results[0]["start_char"] == (best_row - 350) * 100
+
+    # an index reopened from disk returns the same clips
+    reopened = ClipSearchIndex(str(tmp_path))
+    assert reopened.search(query, k=5) == results
+
+    # probing every list is exact, probing fewer lists only misses clips
+    reopened.build_ivf(num_lists=16, seed=1)
+    assert reopened.num_lists == 16
+    assert reopened.search(query, k=5, nprobe=16) == results
+    approximate = reopened.search(query, k=5, nprobe=2)
+    assert len(approximate) == 5
+    for result, exact in zip(approximate, results):
+        assert result["score"] <= exact["score"] + 1e-6
+
+    # re-adding a media file replaces its clips, removing it drops them
+    reopened.add("a", _index_clips(3), vectors["a"][:3])
+    assert len(reopened) == 753
+    assert reopened.remove("c") == 700 and reopened.remove("c") == 0
+    assert ClipSearchIndex(str(tmp_path)).get_media_ids() == ["b", "a"]
+    results = reopened.search(vectors["a"][1], k=1, nprobe=16)
+    assert results[0]["media_id"] == "a" and results[0]["start_char"] == 100
+
+    with pytest.raises(ClipSearchIndexError):
+        reopened.add("d", _index_clips(2), torch.randn(2, 8))
+    with pytest.raises(ClipSearchIndexError):
+        reopened.search(torch.randn(8))
@@ -1,3 +1,4 @@
+import numpy as np
 import pytest
 from unittest.mock import patch
 from datetime import datetime
@@ -8,8 +9,10 @@ from clipsai.media.audiovideo_file import AudioVideoFile
 from clipsai.media.editor import MediaEditor
 from clipsai.media.exceptions import MediaEditorError
 from clipsai.transcribe.exceptions import TranscriptionError
+from clipsai.transcribe.info_view import ElementView, InfoView
 from clipsai.transcribe.transcriber import TranscriberConfigManager
 from clipsai.transcribe.transcription import Transcription
+from clipsai.transcribe.transcription_element import Character, Sentence, Word
 
 
 @pytest.fixture
@@ -159,3 +162,204 @@ def test_invalid_times_exception():
     transcription = Transcription(valid_transcription_data)
     with pytest.raises(TranscriptionError):
         transcription.get_char_info(start_time=-1, end_time=5)
+
+
+def test_get_info_views_match_char_info():
+    transcription = Transcription(valid_transcription_data)
+    char_info = transcription.get_char_info()
+    assert isinstance(char_info, InfoView)
+    assert char_info[0] == {
+        "char": "H",
+        "start_time": 0.0,
+        "end_time": 0.2,
+        "speaker": 1,
+        "work_index": 0,
+        "sentence_index": 0,
+    }
+    assert transcription.end_time == 0.2
+    assert transcription.get_word_info()[0]["word"] == "H"
+
+
+def _timed_transcription_data(text: str) -> dict:
+    char_info = []
+    for i, char in enumerate(text):
+        timed = char != " "
+        char_info.append(
+            {
+                "char": char,
+                "start_time": i * 0.1 if timed else None,
+                "end_time": (i + 1) * 0.1 if timed else None,
+                "speaker": None,
+            }
+        )
+    return dict(valid_transcription_data, char_info=char_info)
+
+
+def test_find_indices_match_find_index():
+    transcription = Transcription(_timed_transcription_data("Hi there. Bye now."))
+    assert transcription.end_time == pytest.approx(1.8)
+    times = np.linspace(0, transcription.end_time, 37)
+    for type_of_time in ["start", "end"]:
+        for find_indices, find_index in [
+            (transcription.find_char_indices, transcription.find_char_index),
+            (transcription.find_word_indices, transcription.find_word_index),
+            (transcription.find_sentence_indices, transcription.find_sentence_index),
+        ]:
+            indices = find_indices(times, type_of_time)
+            assert indices.dtype == np.int64
+            assert indices.tolist() == [find_index(t, type_of_time) for t in times]
+
+    # a time between two words belongs to the next word's start and the previous
+    # word's end
+    words = transcription.get_word_info()
+    gap = (words[0]["end_time"] + words[1]["start_time"]) / 2
+    assert transcription.find_word_indices([gap], "start").tolist() == [1]
+    assert transcription.find_word_indices([gap], "end").tolist() == [0]
+    with pytest.raises(TranscriptionError):
+        transcription.find_word_indices([0.5, 2.0], "start")
+    with pytest.raises(TranscriptionError):
+        transcription.find_word_indices([0.5], "middle")
+
+
+def test_build_info_from_sentence_spans():
+    # spans of " Hi there.  Bye " as a sentence tokenizer finds them
+    spans = [(1, 10), (12, 15)]
+    with patch(
+        "clipsai.transcribe.transcription.split_sentence_spans", return_value=spans
+    ):
+        transcription = Transcription(_timed_transcription_data(" Hi there.  Bye "))
+
+    sentences = transcription.get_sentence_info()
+    assert [s["sentence"] for s in sentences] == ["Hi there.", "Bye"]
+    assert [(s["start_char"], s["end_char"]) for s in sentences] == spans
+    assert sentences[1]["start_time"] == pytest.approx(1.2)
+    assert sentences[1]["end_time"] == pytest.approx(1.5)
+    # characters between sentences belong to the next one, trailing ones to none
+    char_sentence_indices = [c["sentence_index"] for c in transcription.get_char_info()]
+    assert char_sentence_indices == [0] * 10 + [1] * 5 + [None]
+
+    words = transcription.get_word_info()
+    assert [w["word"] for w in words] == ["Hi", "there.", "Bye", " "]
+    assert [w["start_char"] for w in words] == [1, 4, 12, None]
+    assert [w["end_char"] for w in words] == [3, 10, 15, 16]
+    # the trailing spaces end at the last recorded time
+    assert words[-1]["end_time"] == pytest.approx(1.5)
+    assert words[0]["start_time"] == pytest.approx(0.1)
+    word_indices = [c["work_index"] for c in transcription.get_char_info()]
+    assert word_indices == [0, 0, 0, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2, 2, 2, 3]
+
+
+def test_find_index_ties_and_trailing_spaces():
+    times = [(0.0, 0.5), (0.5, 1.0), None, (1.0, 1.0), (1.0, 1.0), None]
+    times += [(1.0, 1.5), (1.5, 2.0), None]
+    char_info = [
+        {
+            "char": char,
+            "start_time": None if time is None else time[0],
+            "end_time": None if time is None else time[1],
+            "speaker": None,
+        }
+        for char, time in zip("ab cd ef ", times)
+    ]
+    with patch(
+        "clipsai.transcribe.transcription.split_sentence_spans",
+        return_value=[(0, 2), (3, 5), (6, 8)],
+    ):
+        transcription = Transcription(
+            dict(valid_transcription_data, char_info=char_info)
+        )
+    words = transcription.get_word_info()
+    assert [w["word"] for w in words] == ["ab", "cd", "ef", " "]
+
+    # the first of the words starting at the same time
+    assert transcription.find_word_index(1.0, "start") == 1
+    assert transcription.find_sentence_index(1.0, "start") == 1
+    assert transcription.find_word_index(1.0, "end") == 0
+    # never the trailing spaces, which have no start character
+    assert transcription.find_word_index(1.8, "start") == 2
+    assert transcription.find_word_index(2.0, "end") == 2
+    indices = transcription.find_word_indices([0.2, 1.0, 2.0], "start")
+    assert indices.tolist() == [0, 1, 2]
+
+
+def test_element_views_create_elements_on_access():
+    transcription = Transcription(_timed_transcription_data("Hi there. Bye now."))
+    words = transcription.words
+    assert isinstance(words, ElementView) and len(words) == 4
+    assert words[1].to_dict() == pytest.approx(Word(0.3, 0.9, 3, 9, "there.").to_dict())
+    assert words[-1].text == "now." and [w.text for w in words[1:3]] == [
+        "there.",
+        "Bye",
+    ]
+    assert list(words) == [words[i] for i in range(len(words))]
+
+    sentences = transcription.sentences
+    assert [sentence.text for sentence in sentences] == ["Hi there.", "Bye now."]
+    assert isinstance(sentences[0], Sentence)
+    characters = transcription.characters
+    assert len(characters) == len(transcription.text)
+    assert characters[3].to_dict() == pytest.approx(
+        Character(0.3, 0.4, 1, 0, "t").to_dict()
+    )
+    with pytest.raises(IndexError):
+        characters[len(characters)]
+
+    # elements have no per-instance __dict__
+    with pytest.raises(AttributeError):
+        words[0].__dict__
+
+
+# Testing InfoView
+def test_info_view_builds_dicts_from_columns():
+    view = InfoView(
+        {
+            "char": "abcd",
+            "start_time": np.array([0.0, np.nan, 1.0, 1.5]),
+            "speaker": np.array([0, -1, 1, 1]),
+        }
+    )
+    expected = [
+        {"char": "a", "start_time": 0.0, "speaker": 0},
+        {"char": "b", "start_time": None, "speaker": None},
+        {"char": "c", "start_time": 1.0, "speaker": 1},
+        {"char": "d", "start_time": 1.5, "speaker": 1},
+    ]
+    assert len(view) == 4
+    assert list(view) == expected
+    assert view == expected
+    assert [view[i] for i in range(-4, 4)] == expected + expected
+    assert view[1:3] == expected[1:3] and isinstance(view[1:3], InfoView)
+    assert view[1:3][1:] == expected[2:3]
+    assert view[::2] == expected[::2]
+    assert view[3:1] == []
+    with pytest.raises(IndexError):
+        view[4]
+
+
+def test_sentence_tokenizer_is_loaded_once(monkeypatch):
+    from clipsai.transcribe import sentence_tokenizer
+
+    loaded = []
+
+    def read_tokenizer(language):
+        loaded.append(language)
+        return object()
+
+    monkeypatch.setattr(sentence_tokenizer, "_tokenizers", {})
+    monkeypatch.setattr(sentence_tokenizer, "_read_tokenizer", read_tokenizer)
+    tokenizer = sentence_tokenizer.get_sentence_tokenizer()
+    assert sentence_tokenizer.get_sentence_tokenizer() is tokenizer
+    assert loaded == ["english"]
+
+
+def test_sentence_tokenizer_missing_resource_without_download(monkeypatch, tmp_path):
+    from clipsai.transcribe import sentence_tokenizer
+
+    monkeypatch.setattr(sentence_tokenizer, "_tokenizers", {})
+    monkeypatch.setattr(sentence_tokenizer.nltk.data, "path", [])
+    monkeypatch.setattr(sentence_tokenizer, "_data_dir", None)
+    monkeypatch.setattr(sentence_tokenizer, "_allow_download", True)
+    sentence_tokenizer.configure_punkt(str(tmp_path), allow_download=False)
+    assert sentence_tokenizer.nltk.data.path == [str(tmp_path)]
+    with pytest.raises(TranscriptionError):
+        sentence_tokenizer.get_sentence_tokenizer()